@@ -0,0 +1,321 @@
+"""Local stand-ins for the Leonardo and OpenAI HTTP APIs.
+
+Both servers run on a background thread and only implement the endpoints
+the app uses, with configurable latency so benchmarks never spend credits.
+"""
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_png(width, height, seed=0):
+    # Random RGB noise barely compresses, so file size matches a real render
+    rng = random.Random(seed)
+    row_bytes = width * 3
+    noise = bytes(rng.getrandbits(8) for _ in range(row_bytes * 8))
+    raw = b"".join(b"\x00" + noise[(y % 8) * row_bytes:(y % 8 + 1) * row_bytes] for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 1))
+            + chunk(b"IEND", b""))
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Benchmark clients drop keep-alive connections when their process exits
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class _Server:
+    handler = None
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = _QuietHTTPServer((host, port), self.handler)
+        self.httpd.fake = self
+        self.thread = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _LeonardoHandler(_JsonHandler):
+    def do_POST(self):
+        fake = self.fake
+        fake.count()
+        if not self.path.endswith("/generations"):
+            return self.send_json(404, {"error": "not found"})
+        body = self.read_json()
+        if fake.rate_limit and random.random() < fake.rate_limit:
+            return self.send_json(429, {"error": "Too Many Requests"})
+        time.sleep(fake.submit_latency)
+        generation_id = str(uuid.uuid4())
+        with fake._lock:
+            fake.generations[generation_id] = {
+                "created": time.time(),
+                "num_images": int(body.get("num_images", 1)),
+                "prompt": body.get("prompt", ""),
+            }
+        if fake.callback_url:
+            fake.schedule_callback(generation_id)
+        self.send_json(200, {"sdGenerationJob": {"generationId": generation_id, "apiCreditCost": fake.credit_cost}})
+
+    def do_GET(self):
+        fake = self.fake
+        fake.count()
+        if "/images/" in self.path:
+            data = fake.image_bytes
+            start = 0
+            byte_range = self.headers.get("Range", "")
+            if byte_range.startswith("bytes="):
+                # Only the open-ended "bytes=N-" form that resumed downloads send
+                start = int(byte_range[len("bytes="):].split("-")[0])
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+            self.wfile.write(data[start:])
+            return
+        generation_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if fake.rate_limit and random.random() < fake.rate_limit:
+            return self.send_json(429, {"error": "Too Many Requests"})
+        generation = fake.generations.get(generation_id)
+        if generation is None:
+            return self.send_json(404, {"error": "unknown generation"})
+        self.send_json(200, {"generations_by_pk": fake.describe(generation_id)})
+
+
+class FakeLeonardo(_Server):
+    """Mimics POST /generations and the PENDING -> COMPLETE polling state machine.
+
+    complete_after: seconds before a generation flips to COMPLETE
+    rate_limit: fraction of API calls answered with HTTP 429
+    callback_url: if set, a generation-complete webhook is POSTed there
+        when each generation completes, like a dashboard-configured webhook
+    """
+    handler = _LeonardoHandler
+
+    def __init__(self, complete_after=1.0, submit_latency=0.05, rate_limit=0.0, image_size=(1472, 832),
+                 credit_cost=8, callback_url=None, callback_secret=None, **kwargs):
+        super().__init__(**kwargs)
+        self.complete_after = complete_after
+        self.submit_latency = submit_latency
+        self.rate_limit = rate_limit
+        self.credit_cost = credit_cost
+        self.callback_url = callback_url
+        self.callback_secret = callback_secret
+        self.callbacks_sent = 0
+        self.generations = {}
+        self.image_bytes = make_png(*image_size)
+
+    def describe(self, generation_id):
+        generation = self.generations[generation_id]
+        if time.time() - generation["created"] < self.complete_after:
+            return {"id": generation_id, "status": "PENDING", "generated_images": []}
+        images = [
+            {"id": f"{generation_id}-{n}", "url": f"{self.url}/images/{generation_id}_{n}.png"}
+            for n in range(generation["num_images"])
+        ]
+        return {"id": generation_id, "status": "COMPLETE", "prompt": generation["prompt"], "generated_images": images}
+
+    def schedule_callback(self, generation_id):
+        timer = threading.Timer(self.complete_after, self.send_callback, args=(generation_id,))
+        timer.daemon = True
+        timer.start()
+
+    def send_callback(self, generation_id):
+        description = self.describe(generation_id)
+        payload = {
+            "type": "image_generation.complete",
+            "object": "generation",
+            "timestamp": time.time(),
+            "api_version": "v1",
+            "data": {"object": {"id": generation_id, "status": description["status"],
+                                "images": description["generated_images"]}},
+        }
+        headers = {"Content-Type": "application/json"}
+        if self.callback_secret:
+            headers["Authorization"] = f"Bearer {self.callback_secret}"
+        request = urllib.request.Request(self.callback_url, data=json.dumps(payload).encode("utf-8"),
+                                         headers=headers, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+            with self._lock:
+                self.callbacks_sent += 1
+        except OSError:
+            pass  # the app is expected to fall back to polling
+
+
+IMAGE_PROMPTS_DOC = {"prompts": [
+    {"section": "Intro", "prompt": "Wide shot of a sunrise over a modern African city, 35mm lens, golden light, cinematic"},
+    {"section": "Understanding AI", "prompt": "Close-up of glowing neural network hologram, 50mm lens, blue light, photorealistic"},
+    {"section": "Overview", "prompt": "Aerial drone shot of a busy tech hub, 24mm lens, warm colors, cinematic"},
+    {"section": "Success Stories", "prompt": "Farmer checking a tablet in a green field, 85mm lens, soft light, photorealistic"},
+    {"section": "Future", "prompt": "Futuristic skyline at dusk with drones, 16mm lens, neon accents, minimalistic"},
+    {"section": "Outro", "prompt": "Host waving goodbye in a cozy studio, 35mm lens, warm lighting, cinematic"},
+]}
+METADATA_DOC = {
+    "titles": ["AI in Africa: The Quiet Revolution", "How Africa Is Leapfrogging With AI", "5 AI Startups Changing Africa"],
+    "description": "From LifeBank in Nigeria to UjuziKilimo in Kenya, see how AI is transforming healthcare, "
+                   "agriculture and finance across Africa. Subscribe for more!",
+}
+OUTLINE_DOC = {
+    "style_brief": "Friendly and upbeat; the host talks directly to viewers and keeps jargon light.",
+    "sections": [{"heading": heading, "key_points": ["A concrete example", "One surprising number"]} for heading in (
+        "Introduction", "Understanding AI", "AI in Africa: An Overview", "AI Success Stories in Africa",
+        "Future of AI in Africa", "Conclusion")],
+}
+STRUCTURED_DOCS = {"image_prompts": IMAGE_PROMPTS_DOC, "video_metadata": METADATA_DOC, "script_outline": OUTLINE_DOC}
+
+
+class _OpenAIHandler(_JsonHandler):
+    def do_POST(self):
+        fake = self.fake
+        fake.count()
+        if not self.path.endswith("/chat/completions"):
+            return self.send_json(404, {"error": {"message": "not found"}})
+        body = self.read_json()
+        response_format = body.get("response_format", {})
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(STRUCTURED_DOCS[response_format["json_schema"]["name"]])
+        else:
+            content = fake.text(int(body.get("max_tokens") or 300))
+        time.sleep(fake.first_token_latency)
+        if body.get("stream"):
+            return self._stream(body, content)
+
+        usage = {"prompt_tokens": fake.tokens(body), "completion_tokens": len(content) // 4,
+                 "total_tokens": fake.tokens(body) + len(content) // 4}
+        time.sleep(fake.token_latency * (len(content) // 4))
+        self.send_json(200, {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    def _stream(self, body, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(payload):
+            data = f"data: {payload}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model")}
+        step = 16  # ~4 tokens per chunk
+        for i in range(0, len(content), step):
+            time.sleep(self.fake.token_latency * 4)
+            send(json.dumps(dict(base, choices=[{"index": 0, "delta": {"content": content[i:i + step]},
+                                                 "finish_reason": None}])))
+        send(json.dumps(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])))
+        if body.get("stream_options", {}).get("include_usage"):
+            send(json.dumps(dict(base, choices=[], usage={
+                "prompt_tokens": self.fake.tokens(body), "completion_tokens": len(content) // 4,
+                "total_tokens": self.fake.tokens(body) + len(content) // 4})))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class FakeOpenAI(_Server):
+    """Mimics POST /v1/chat/completions, streaming and non-streaming.
+
+    Latency is first_token_latency plus token_latency per generated token
+    (tokens approximated as 4 characters).
+    """
+    handler = _OpenAIHandler
+
+    def __init__(self, first_token_latency=0.2, token_latency=0.002, **kwargs):
+        super().__init__(**kwargs)
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+    @staticmethod
+    def tokens(body):
+        return sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+
+    @staticmethod
+    def text(max_tokens):
+        with open(os.path.join(os.path.dirname(__file__), "..", "generated_content.txt"), encoding="utf-8") as f:
+            sample = f.read()
+        return sample[:max_tokens * 4]
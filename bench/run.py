@@ -0,0 +1,294 @@
+"""Offline benchmarks for the CC4C, testsuite and blueprint flows.
+
+    python -m bench.run                      # every scenario with defaults
+    python -m bench.run cc4c --prompts 30    # one scenario
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --compare bench/baseline.json --tolerance 0.25
+    python -m bench.run cc4c_streamed --webhook   # callbacks instead of polling
+
+Each scenario runs in its own child process against local fake servers
+(bench.fakes), so peak RSS is per scenario and no credits are spent. A
+prompt or submission that fails (e.g. on the 429s of --rate-limit) counts
+in the scenario's "errors" instead of ending the run.
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZipFile
+
+from bench.fakes import FakeLeonardo, FakeOpenAI
+
+SCENARIOS = ["cc4c", "cc4c_streamed", "testsuite", "blueprint"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+_work_dir = None
+
+
+def _download(url):
+    # Same streamed, on-disk path the pages use
+    global _work_dir
+    from ccsuite.downloads import download_to_file, url_filename
+
+    if _work_dir is None:
+        _work_dir = tempfile.mkdtemp(prefix="ccsuite_bench_")
+    return download_to_file(url, os.path.join(_work_dir, url_filename(url)))['path']
+
+
+def scenario_cc4c(args):
+    # Mirrors the pasted-prompts loop in pages/CC4C.py: one prompt at a time
+    from ccsuite.downloads import DownloadError
+    from ccsuite.leonardo import LeonardoError, create_image, wait_for_generation
+
+    images, latencies, errors = [], [], 0
+    for n in range(args.prompts):
+        start_time = time.perf_counter()
+        try:
+            result = create_image(f"benchmark prompt {n}", "bench")
+            urls = wait_for_generation(result['sdGenerationJob']['generationId'], "bench",
+                                       timeout=60, interval=args.poll_interval)
+            images.extend(_download(img['url']) for img in urls)
+        except (LeonardoError, DownloadError):
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start_time)
+    _zip(images)
+    return len(images), latencies, errors
+
+
+def scenario_cc4c_streamed(args, client):
+    # Mirrors the streamed-prompts path: prompts go to the submission queue as they are parsed
+    from ccsuite.downloads import DownloadError
+    from ccsuite.leonardo import LeonardoError, SubmissionQueue
+    from ccsuite.prompts import stream_image_prompts
+
+    images, latencies, started, errors = [], [], {}, 0
+    with SubmissionQueue("bench", max_workers=args.concurrency, interval=args.poll_interval) as queue:
+        for item in stream_image_prompts("benchmark script", client=client):
+            started[queue.submit(item['prompt'])] = time.perf_counter()
+        for future in queue.as_completed():
+            try:
+                images.extend(_download(img['url']) for img in future.result()['images'])
+            except (LeonardoError, DownloadError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started[future])
+    _zip(images)
+    return len(images), latencies, errors
+
+
+def scenario_testsuite(args):
+    # Mirrors ccsuite.image_suite: batches of 10 prompts in flight together, images streamed to disk
+    from ccsuite.downloads import DownloadError
+    from ccsuite.leonardo import LeonardoError, generate_async, submit
+
+    images, latencies, errors = [], [], 0
+    prompts = [f"section text {n // 5}" for n in range(args.prompts)]
+    for start in range(0, len(prompts), 10):
+        batch_start = time.perf_counter()
+        # Each section repeats its prompt per slot; the slot number as variant keeps them separate generations
+        futures = [submit(generate_async(prompt, "bench", timeout=30, interval=args.poll_interval, variant=start + i))
+                   for i, prompt in enumerate(prompts[start:start + 10])]
+        for future in futures:
+            try:
+                images.extend(_download(img['url']) for img in future.result()['images'])
+            except (LeonardoError, DownloadError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - batch_start)
+    _zip(images)
+    return len(images), latencies, errors
+
+
+BLUEPRINT = {
+    "id": "bench-blueprint",
+    "nodes": [
+        {"id": "form1", "type": "trigger",
+         "config": {"fields": [{"name": "Full Name"}, {"name": "Email"}, {"name": "Inquiry"}]}},
+        {"id": "ai1", "type": "openai_api", "config": {"model": "gpt-4-turbo"}},
+        {"id": "email1", "type": "email",
+         "config": {"fromEmail": "bench@example.com", "subject": "Re: {{Inquiry}}",
+                    "body": "Hello {{Full Name}},\n{{AI_Recommendation}}"}},
+    ],
+}
+
+
+def scenario_blueprint(args):
+    # Concurrent form submissions through the blueprint engine, as pages/blueprint.py runs them; every
+    # inquiry is distinct, so each one reaches the (fake) OpenAI server
+    from ccsuite.blueprint import RAN, Blueprint
+
+    engine = Blueprint(BLUEPRINT)
+
+    def submit(n):
+        # The latency of a submission whose nodes all ran, or None
+        start_time = time.perf_counter()
+        form = {"Full Name": f"User {n}", "Email": f"user{n}@example.com", "Inquiry": f"benchmark inquiry {n}"}
+        results = engine.run(form, {"openai_api_key": "bench"})
+        if [result.status for result in results] != [RAN] * len(results):
+            return None
+        return time.perf_counter() - start_time
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(submit, range(args.prompts)))
+    latencies = [latency for latency in outcomes if latency is not None]
+    return len(latencies), latencies, len(outcomes) - len(latencies)
+
+
+def _zip(paths):
+    zip_path = os.path.join(_work_dir or tempfile.mkdtemp(prefix="ccsuite_bench_"), "images.zip")
+    with ZipFile(zip_path, "w") as zip_file:
+        for idx, path in enumerate(paths):
+            zip_file.write(path, f"image_{idx + 1}.png")
+    return zip_path
+
+
+def run_child(args):
+    import openai
+    from ccsuite import leonardo
+
+    leonardo.API_BASE = args.leonardo_url
+    # get_client() builds the pooled clients the app code uses; point them at the fake server too
+    os.environ["OPENAI_BASE_URL"] = args.openai_url
+    os.environ.pop("CCSUITE_QUEUE", None)
+    client = openai.OpenAI(base_url=args.openai_url, api_key="bench")
+
+    start_time = time.perf_counter()
+    if args.child == "cc4c":
+        items, latencies, errors = scenario_cc4c(args)
+    elif args.child == "cc4c_streamed":
+        items, latencies, errors = scenario_cc4c_streamed(args, client)
+    elif args.child == "testsuite":
+        items, latencies, errors = scenario_testsuite(args)
+    else:
+        items, latencies, errors = scenario_blueprint(args)
+    wall = time.perf_counter() - start_time
+
+    print(json.dumps({
+        "scenario": args.child,
+        "items": items,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(items / wall, 3) if wall else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p99_s": round(percentile(latencies, 99), 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_scenario(name, args, leonardo_url, openai_url, env=None):
+    command = [
+        sys.executable, "-m", "bench.run", "--child", name,
+        "--leonardo-url", leonardo_url, "--openai-url", openai_url,
+        "--prompts", str(args.prompts), "--concurrency", str(args.concurrency),
+        "--poll-interval", str(args.poll_interval),
+    ]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(command, cwd=root, check=True, capture_output=True, text=True,
+                            env=dict(os.environ, **(env or {}))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    # Lower throughput, or higher latency / memory, beyond tolerance is a regression
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput_per_s']} < {base['throughput_per_s']}")
+        for key in ("p50_s", "p99_s", "peak_rss_mb"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {result[key]} > {base[key]}")
+        if result.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{name}: errors {result['errors']} > {base.get('errors', 0)}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generation flows against local fake APIs.")
+    parser.add_argument("scenarios", nargs="*", default=[], help=f"Any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--prompts", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="Seconds between status polls")
+    parser.add_argument("--complete-after", type=float, default=1.0, help="Fake Leonardo render time")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of Leonardo calls returning 429")
+    parser.add_argument("--openai-latency", type=float, default=0.2, help="Fake OpenAI time to first token")
+    parser.add_argument("--webhook", action="store_true",
+                        help="Deliver completions by webhook callback, polling only as a fallback")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Fail if results regress against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--leonardo-url", help=argparse.SUPPRESS)
+    parser.add_argument("--openai-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    if args.child:
+        return run_child(args)
+
+    results = {}
+    env = {}
+    callback_url = None
+    if args.webhook:
+        port = free_port()
+        env = {"CCSUITE_WEBHOOK_PORT": str(port), "CCSUITE_WEBHOOK_SECRET": "bench"}
+        callback_url = f"http://127.0.0.1:{port}/leonardo/callback"
+
+    with FakeLeonardo(complete_after=args.complete_after, rate_limit=args.rate_limit,
+                      callback_url=callback_url, callback_secret="bench") as leonardo_fake, \
+            FakeOpenAI(first_token_latency=args.openai_latency) as openai_fake:
+        for name in args.scenarios or SCENARIOS:
+            before = leonardo_fake.requests + openai_fake.requests
+            result = run_scenario(name, args, leonardo_fake.url, openai_fake.base_url, env)
+            result["api_requests"] = leonardo_fake.requests + openai_fake.requests - before
+            results[name] = result
+            print(f"{name:<14} {result['items']:>4} items  {result['errors']:>3} errors  "
+                  f"{result['throughput_per_s']:>7.2f}/s  "
+                  f"p50 {result['p50_s']:.3f}s  p99 {result['p99_s']:.3f}s  "
+                  f"rss {result['peak_rss_mb']:.0f}MB  requests {result['api_requests']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Shared generation helpers used by the Streamlit pages.
@@ -0,0 +1,241 @@
+"""Persistent memory-palace association store for the Toolbox app.
+
+Each association links an item to remember with the image or story that
+stands for it and, optionally, the locus (place in the palace) it is put:
+
+    associations   one row per (item, association) pair; item_key is the
+                   lower-cased item with a B-tree index, so lookup() of an
+                   item prefix is an index range scan
+    search         FTS5 index over item, association and locus with prefix
+                   indexes for 1-3 characters, kept in step by triggers, so
+                   search() of a half-typed word does not scan the terms
+
+Both answer in a few milliseconds at tens of thousands of rows. Import and
+export stream JSONL line by line ({"item", "association", "locus"} per
+line), so a large file is never held in memory, and imports commit in
+batches of IMPORT_BATCH rows. Pairs already stored are skipped. The
+indented one-item {"association": ...} downloads from before the store are
+plain JSON documents; import_json() reads those, and import_jsonl() falls
+back to it when no line parses on its own.
+
+The file is CCSUITE_ASSOCIATIONS if set, otherwise
+~/.ccsuite/associations.db.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ccsuite.library import match_query
+from ccsuite.workspace import atomic_write
+
+IMPORT_BATCH = 1000
+RANK_WINDOW = 2000
+FIELDS = ("item", "association", "locus")
+
+
+def _key(text):
+    return " ".join(text.split()).lower()
+
+
+def _prefix_bounds(prefix):
+    # item_key >= low AND item_key < high matches every key starting with prefix
+    low = _key(prefix)
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+class AssociationStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS associations (
+                id INTEGER PRIMARY KEY,
+                item TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                association TEXT NOT NULL DEFAULT '',
+                locus TEXT NOT NULL DEFAULT '',
+                created REAL NOT NULL,
+                UNIQUE (item_key, association)
+            );
+            CREATE INDEX IF NOT EXISTS associations_locus ON associations (locus);
+            CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+                item, association, locus, content = 'associations', content_rowid = 'id',
+                tokenize = 'unicode61', prefix = '1 2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS associations_ai AFTER INSERT ON associations BEGIN
+                INSERT INTO search (rowid, item, association, locus)
+                VALUES (new.id, new.item, new.association, new.locus);
+            END;
+            CREATE TRIGGER IF NOT EXISTS associations_ad AFTER DELETE ON associations BEGIN
+                INSERT INTO search (search, rowid, item, association, locus)
+                VALUES ('delete', old.id, old.item, old.association, old.locus);
+            END;
+        """)
+
+    def _conn(self):
+        # Connections are per thread, as in jobqueue.SQLiteQueue
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, conn, rows):
+        # How many rows were new (rowcount leaves out the index rows the triggers write)
+        return conn.executemany(
+            "INSERT OR IGNORE INTO associations (item, item_key, association, locus, created) VALUES (?, ?, ?, ?, ?)",
+            rows).rowcount
+
+    def add(self, item, association="", locus=""):
+        """Stores one association; returns False if the same pair is already stored."""
+        item = item.strip()
+        if not item:
+            raise ValueError("An association needs an item")
+        row = (item, _key(item), association.strip(), locus.strip(), time.time())
+        return self._insert(self._conn(), [row]) == 1
+
+    def delete(self, association_id):
+        self._conn().execute("DELETE FROM associations WHERE id = ?", (association_id,))
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM associations").fetchone()[0]
+
+    def lookup(self, prefix, limit=10):
+        """Associations whose item starts with prefix (case-insensitive), alphabetically."""
+        if not prefix.strip():
+            return []
+        low, high = _prefix_bounds(prefix)
+        rows = self._conn().execute(
+            "SELECT id, item, association, locus FROM associations WHERE item_key >= ? AND item_key < ? "
+            "ORDER BY item_key LIMIT ?", (low, high, limit))
+        return [dict(row) for row in rows]
+
+    def search(self, text, limit=20):
+        """Best matches for free text in any field (item words weigh most); the last word may be half typed."""
+        query = match_query(text)
+        if query is None:
+            return []
+        # Only the first RANK_WINDOW matches are ranked: a one- or two-letter prefix can match most of the
+        # store, and scoring every match would cost tens of milliseconds per keystroke
+        rows = self._conn().execute(
+            "SELECT a.id, a.item, a.association, a.locus FROM ("
+            "SELECT rowid, bm25(search, 3.0, 1.0, 1.0) AS score FROM search WHERE search MATCH ? LIMIT ?"
+            ") m JOIN associations a ON a.id = m.rowid ORDER BY m.score LIMIT ?", (query, RANK_WINDOW, limit))
+        return [dict(row) for row in rows]
+
+    def _import(self, records):
+        # records yields parsed JSON values, or None for input that could not be read
+        conn = self._conn()
+        added = skipped = 0
+        batch = []
+
+        def flush():
+            nonlocal added, skipped
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                new = self._insert(conn, batch)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            added += new
+            skipped += len(batch) - new
+            batch.clear()
+
+        now = time.time()
+        for record in records:
+            if not isinstance(record, dict):
+                skipped += 1
+                continue
+            # Downloads from before the store only carry {"association": item}
+            item = str(record.get("item") or record.get("association") or "").strip()
+            if not item:
+                skipped += 1
+                continue
+            association = str(record.get("association") or "").strip() if "item" in record else ""
+            batch.append((item, _key(item), association, str(record.get("locus") or "").strip(), now))
+            if len(batch) >= IMPORT_BATCH:
+                flush()
+        if batch:
+            flush()
+        return added, skipped
+
+    def import_json(self, f):
+        """Adds associations from one JSON document (an object or a list of them); returns (added, skipped)."""
+        data = json.load(f)
+        return self._import(data if isinstance(data, list) else [data])
+
+    def import_jsonl(self, lines):
+        """Adds associations from an iterable of JSONL lines; returns (added, skipped).
+
+        Lines that are blank, not JSON or have no item are skipped along with duplicates. If no line
+        reads as JSON on its own, the input is taken as one JSON document instead, which is how the
+        indented downloads from before the store were written.
+        """
+        unread = []
+        readable = False
+
+        def records():
+            nonlocal readable
+            for line in lines:
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8-sig")
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if not readable:
+                        # Kept only until some line parses, for the whole-document fallback
+                        unread.append(line if line.endswith("\n") else line + "\n")
+                    yield None
+                    continue
+                readable = True
+                unread.clear()
+                yield record
+
+        added, skipped = self._import(records())
+        if readable or not unread:
+            return added, skipped
+        try:
+            data = json.loads("".join(unread))
+        except ValueError:
+            return added, skipped
+        return self._import(data if isinstance(data, list) else [data])
+
+    def export_jsonl(self, f):
+        """Writes every association to the text file f, one JSON object per line; returns the count."""
+        count = 0
+        # The cursor is iterated, not fetched, so rows never pile up in memory
+        for row in self._conn().execute("SELECT item, association, locus FROM associations ORDER BY id"):
+            f.write(json.dumps({field: row[field] for field in FIELDS}, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+
+    def export_file(self, path):
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            return self.export_jsonl(f)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def default_path():
+    return os.environ.get("CCSUITE_ASSOCIATIONS") or os.path.join(os.path.expanduser("~"), ".ccsuite", "associations.db")
+
+
+def open_store(path=None):
+    """The store at path (default CCSUITE_ASSOCIATIONS or ~/.ccsuite/associations.db), one per path per process."""
+    path = path or default_path()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = AssociationStore(path)
+        return _stores[path]
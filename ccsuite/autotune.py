@@ -0,0 +1,235 @@
+"""AIMD auto-tuning of Leonardo concurrency, batch size and poll interval.
+
+Fixed settings are wrong in both directions: ten generations at once with
+2s polls leaves throughput unused on a quiet account, and the same settings
+get HTTP 429s when several sessions share a key. One Tuner per Leonardo key
+watches every generation that key runs in this process (time spent waiting
+for a slot, create-to-complete latency, errors and throttling) and adjusts
+after each round of `concurrency` completions, the way TCP sizes its window:
+
+    throttled (429) or error rate above MAX_ERROR_RATE
+        concurrency and batch size are halved, the poll interval doubled
+        (at most once per COOLDOWN_SECONDS, so one burst counts once)
+    clean round
+        batch size grows by BATCH_STEP, the poll interval shrinks by
+        POLL_STEP (never below a 20th of the typical generation latency),
+        and concurrency grows by one when generations queued for a slot;
+        if the round before was a growth step and completed images per
+        minute fell, that step is undone instead
+
+Generations take a slot in _generate_async on the shared event loop, so the
+limit holds across every page, SubmissionQueue and pipeline in the process.
+Every 429 is counted once, by throttled(), whichever call got it; a
+throttled create gives its slot back and is retried after backoff(). The limits
+can be set with CCSUITE_LEONARDO_CONCURRENCY (starting point) and
+CCSUITE_LEONARDO_MAX_CONCURRENCY.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from ccsuite import metrics
+
+START_CONCURRENCY = int(os.environ.get("CCSUITE_LEONARDO_CONCURRENCY", "4"))
+MAX_CONCURRENCY = int(os.environ.get("CCSUITE_LEONARDO_MAX_CONCURRENCY", "16"))
+MIN_BATCH, START_BATCH, MAX_BATCH, BATCH_STEP = 2, 10, 40, 2
+MIN_POLL, START_POLL, MAX_POLL, POLL_STEP = 0.5, 2.0, 15.0, 0.25
+MAX_ERROR_RATE = 0.2
+# Upper bound on the wait before a throttled create is retried
+MAX_BACKOFF = 30.0
+COOLDOWN_SECONDS = 10
+# A round grows concurrency when slot waits exceed this share of generation latency
+QUEUE_SHARE = 0.1
+# Completed-images-per-minute window for throughput and for the UI
+RATE_WINDOW = 60
+
+_lock = threading.Lock()
+_tuners = {}
+
+
+def _reset_after_fork():
+    # Slots and futures belong to the parent's event loop
+    global _lock
+    _lock = threading.Lock()
+    _tuners.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _Round:
+    def __init__(self, now):
+        self.start = now
+        self.count = 0
+        self.images = 0
+        self.errors = 0
+        self.throttled = 0
+        self.queue_s = 0.0
+        self.latency_s = 0.0
+
+
+class Tuner:
+    """Live settings for one Leonardo key; acquire()/release() run on the event loop thread."""
+
+    def __init__(self, name, concurrency=START_CONCURRENCY, batch_size=START_BATCH, poll_interval=START_POLL):
+        self.name = name
+        self.concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.in_flight = 0
+        self._waiters = deque()
+        self._state = threading.Lock()
+        self._round = _Round(time.monotonic())
+        self._completions = deque()
+        self._last_rate = None
+        self._grew = False
+        self._last_decrease = float("-inf")
+        self._latency = None
+
+    async def acquire(self):
+        """Waits for a generation slot; returns the seconds spent waiting."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        while self.in_flight >= self.concurrency:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up this waiter can no longer use on to the next one
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        queued = time.monotonic() - start
+        if queued > 0.001:
+            metrics.observe("leonardo.slot_wait", queued)
+        return queued
+
+    def release(self, queued, latency=None, images=0, error=None):
+        """Frees the slot and, unless latency is None (cancelled or throttled), records the outcome.
+
+        error is None or "error"; throttling is recorded by throttled() instead.
+        """
+        self.in_flight -= 1
+        if latency is not None:
+            self._record(queued, latency, images, error)
+        self._wake()
+
+    def throttled(self):
+        """Counts an HTTP 429 from any Leonardo call made with this key."""
+        metrics.inc("ccsuite_leonardo_throttled_total")
+        with self._state:
+            self._round.throttled += 1
+            self._adjust(time.monotonic())
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number attempt (1, 2, ...) of a throttled call, with jitter."""
+        return min(MAX_BACKOFF, self.poll_interval * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def _wake(self):
+        free = self.concurrency - self.in_flight
+        for waiter in list(self._waiters):
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _record(self, queued, latency, images, error):
+        now = time.monotonic()
+        with self._state:
+            current = self._round
+            current.count += 1
+            current.queue_s += queued
+            current.latency_s += latency
+            if error:
+                current.errors += 1
+            else:
+                current.images += images
+                self._completions.append((now, images))
+                # Smoothed latency sets the floor for the poll interval
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            self._adjust(now)
+
+    def _adjust(self, now):
+        current = self._round
+        overloaded = current.throttled or (current.count >= 3 and current.errors / current.count > MAX_ERROR_RATE)
+        if overloaded:
+            if now - self._last_decrease >= COOLDOWN_SECONDS:
+                self._last_decrease = now
+                self.concurrency = max(1, self.concurrency // 2)
+                self.batch_size = max(MIN_BATCH, self.batch_size // 2)
+                self.poll_interval = min(MAX_POLL, self.poll_interval * 2)
+                metrics.inc("ccsuite_autotune_adjustments_total", direction="down")
+            self._next_round(now, rate=None, grew=False)
+            return
+        if current.count < self.concurrency:
+            return
+
+        rate = current.images * 60 / max(now - current.start, 1e-6)
+        grew = False
+        if self._grew and self._last_rate and rate < self._last_rate * 0.9:
+            # The last extra slot did not pay off: the provider is the bottleneck now
+            self.concurrency = max(1, self.concurrency - 1)
+            metrics.inc("ccsuite_autotune_adjustments_total", direction="back")
+        elif current.queue_s > QUEUE_SHARE * current.latency_s and self.concurrency < MAX_CONCURRENCY:
+            self.concurrency += 1
+            grew = True
+            metrics.inc("ccsuite_autotune_adjustments_total", direction="up")
+        self.batch_size = min(MAX_BATCH, self.batch_size + BATCH_STEP)
+        floor = max(MIN_POLL, (self._latency or 0) / 20)
+        self.poll_interval = max(floor, self.poll_interval - POLL_STEP)
+        self._next_round(now, rate=rate, grew=grew)
+
+    def _next_round(self, now, rate, grew):
+        self._round = _Round(now)
+        self._last_rate = rate
+        self._grew = grew
+
+    def images_per_minute(self):
+        now = time.monotonic()
+        with self._state:
+            while self._completions and now - self._completions[0][0] > RATE_WINDOW:
+                self._completions.popleft()
+            return sum(images for _, images in self._completions) * 60 / RATE_WINDOW
+
+    def summary(self):
+        """Current settings and live measurements, for the UI."""
+        with self._state:
+            current = self._round
+            row = {
+                "key": self.name,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "batch_size": self.batch_size,
+                "poll_interval_s": round(self.poll_interval, 2),
+                "latency_s": round(self._latency, 2) if self._latency is not None else None,
+                "round_errors": current.errors + current.throttled,
+            }
+        row["images_per_min"] = round(self.images_per_minute(), 1)
+        return row
+
+
+def tuner_for(api_key):
+    """The process-wide tuner for a Leonardo key, created on first use."""
+    digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    with _lock:
+        tuner = _tuners.get(digest)
+        if tuner is None:
+            tuner = _tuners[digest] = Tuner(digest[:8])
+        return tuner
+
+
+def summaries():
+    with _lock:
+        tuners = list(_tuners.values())
+    return [tuner.summary() for tuner in tuners]
@@ -0,0 +1,275 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from ccsuite import metrics
+from ccsuite.clients import get_client
+from ccsuite.content import format_results, generate_all
+from ccsuite.jobqueue import DONE, FAILED
+from ccsuite.workspace import atomic_write
+
+logger = logging.getLogger("ccsuite.batch")
+
+DEFAULT_DURATION = 5
+DEFAULT_STYLE = "Educational"
+
+
+class JsonLogFormatter(logging.Formatter):
+    # One JSON object per line so worker logs can be grepped or shipped as-is
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def log_event(event, level=logging.INFO, **fields):
+    logger.log(level, event, extra={"fields": fields})
+
+
+def configure_logging(stream=None, level=logging.INFO):
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonLogFormatter())
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def load_topics(path):
+    """Reads topics from a .txt (one per line), .csv or .jsonl file.
+
+    CSV and JSONL rows may carry "duration" and "style" alongside "topic".
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if ext == ".csv":
+            rows = list(csv.DictReader(f))
+        elif ext in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = [{"topic": line.strip()} for line in f if line.strip()]
+    return parse_topic_rows(rows)
+
+
+def parse_topics_text(text, duration=DEFAULT_DURATION, style=DEFAULT_STYLE):
+    # Pasted CSV with a "topic" header, or plain text with one topic per line
+    lines = [line for line in text.splitlines() if line.strip()]
+    if lines and "topic" in lines[0].lower() and "," in lines[0]:
+        return parse_topic_rows(csv.DictReader(lines), duration, style)
+    return parse_topic_rows(({"topic": line} for line in lines), duration, style)
+
+
+def _duration(value, default, topic):
+    # A duration that is not a positive number ("5 min", "n/a") falls back to the default for that row
+    if value is None or not str(value).strip():
+        return default
+    try:
+        minutes = int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        minutes = 0
+    if minutes <= 0:
+        log_event("topic_bad_duration", logging.WARNING, topic=topic, duration=value, used=default)
+        return default
+    return minutes
+
+
+def parse_topic_rows(rows, duration=DEFAULT_DURATION, style=DEFAULT_STYLE):
+    jobs = []
+    for row in rows:
+        row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+        topic = str(row.get("topic") or "").strip()
+        if not topic:
+            continue
+        jobs.append({
+            "topic": topic,
+            "duration": _duration(row.get("duration"), duration, topic),
+            "style": str(row.get("style") or style).strip(),
+        })
+    return jobs
+
+
+def topic_slug(index, topic):
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:60]
+    return f"{index + 1:03d}_{slug or 'topic'}"
+
+
+def run_topic(job, out_dir, client=None):
+    # Runs every text stage for one topic and writes results.txt / result.json
+    os.makedirs(out_dir, exist_ok=True)
+    start_time = time.time()
+    with metrics.span("batch.topic"):
+        result = generate_all(job["topic"], job["duration"], job["style"], client=client)
+    result["elapsed"] = round(time.time() - start_time, 2)
+
+    with atomic_write(os.path.join(out_dir, "results.txt"), "w", encoding="utf-8") as f:
+        f.write(format_results(result))
+    # result.json marks the topic done for skip_existing, so it is only ever seen complete
+    with atomic_write(os.path.join(out_dir, "result.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def _run_within_budget(job, out_dir, deadline, api_key):
+    # Topics that have not started by the deadline are skipped rather than queued forever
+    if deadline is not None and time.time() > deadline:
+        raise BudgetExceeded(f"Time budget exhausted before '{job['topic']}' started")
+    # Looked up per topic, in whichever process runs it; every topic shares the key's pooled client
+    return run_topic(job, out_dir, client=get_client(api_key) if api_key else None)
+
+
+def run_batch(jobs, out_root, workers=4, use_processes=False, skip_existing=True, budget_seconds=None,
+              api_key=None):
+    """Runs jobs on a thread or process pool and yields (job, result, error) as each finishes.
+
+    workers caps how many topics are generated concurrently; budget_seconds,
+    if set, stops starting new topics once that much time has passed.
+    api_key selects the OpenAI credential (default: OPENAI_API_KEY).
+    """
+    deadline = time.time() + budget_seconds if budget_seconds else None
+    pending = []
+    for index, job in enumerate(jobs):
+        out_dir = os.path.join(out_root, topic_slug(index, job["topic"]))
+        if skip_existing and os.path.exists(os.path.join(out_dir, "result.json")):
+            log_event("topic_skipped", topic=job["topic"], out_dir=out_dir)
+            continue
+        pending.append((job, out_dir))
+
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="topic")
+
+    with executor:
+        futures = {}
+        for job, out_dir in pending:
+            futures[executor.submit(_run_within_budget, job, out_dir, deadline, api_key)] = (job, out_dir)
+            log_event("topic_queued", topic=job["topic"], out_dir=out_dir)
+
+        for future in as_completed(futures):
+            job, out_dir = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                log_event("topic_failed", logging.ERROR, topic=job["topic"], error=str(e))
+                yield job, None, e
+                continue
+            log_event("topic_completed", topic=job["topic"], out_dir=out_dir, elapsed=result["elapsed"])
+            yield job, result, None
+
+
+def run_batch_queued(job_queue, jobs, api_key=None, interval=1.0, budget_seconds=None):
+    """Like run_batch, but each topic becomes a content.generate_all job for ccsuite.worker processes.
+
+    Topics still waiting for a worker when the budget runs out are cancelled.
+    """
+    deadline = time.time() + budget_seconds if budget_seconds else None
+    secrets = {"openai_api_key": api_key} if api_key else None
+    pending = {}
+    for job in jobs:
+        payload = {"topic": job["topic"], "duration": job["duration"], "style": job["style"]}
+        pending[job_queue.enqueue("content.generate_all", payload, secrets=secrets)] = job
+        log_event("topic_queued", topic=job["topic"])
+
+    while pending:
+        if deadline is not None and time.time() > deadline:
+            for job_id in pending:
+                job_queue.cancel(job_id)
+            deadline = None
+        for job_id, job in list(pending.items()):
+            state = job_queue.get(job_id)
+            if state["status"] == DONE:
+                del pending[job_id]
+                log_event("topic_completed", topic=job["topic"], job=job_id)
+                yield job, state["result"], None
+            elif state["status"] == FAILED:
+                del pending[job_id]
+                log_event("topic_failed", logging.ERROR, topic=job["topic"], job=job_id, error=state["error"])
+                yield job, None, RuntimeError(state["error"])
+        if pending:
+            time.sleep(interval)
+
+
+def export_zip(results):
+    # One folder per topic with the same results.txt the single-topic page offers
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for index, result in enumerate(results):
+            folder = topic_slug(index, result["topic"])
+            zip_file.writestr(f"{folder}/results.txt", format_results(result))
+        zip_file.writestr("results.csv", export_csv(results))
+    buffer.seek(0)
+    return buffer
+
+
+EXPORT_COLUMNS = ["topic", "duration", "style", "script", "image_prompts", "thumbnails", "titles", "description"]
+
+
+def export_csv(results):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(results)
+    return buffer.getvalue()
+
+
+def export_parquet(results):
+    # Needs pandas with pyarrow or fastparquet installed
+    import pandas as pd
+
+    buffer = io.BytesIO()
+    pd.DataFrame(results, columns=EXPORT_COLUMNS).to_parquet(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate content for every topic in a file without Streamlit.")
+    parser.add_argument("topics", help="Topics file (.txt, .csv or .jsonl)")
+    parser.add_argument("--out", default="batch_output")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    parser.add_argument("--force", action="store_true", help="Regenerate topics that already have output")
+    parser.add_argument("--budget-minutes", type=float, help="Stop starting new topics after this many minutes")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        parser.error("OPENAI_API_KEY must be set in the environment")
+
+    jobs = load_topics(args.topics)
+    log_event("batch_started", topics=len(jobs), workers=args.workers, out=args.out)
+    start_time = time.time()
+    failed = 0
+    completed = 0
+    for job, result, error in run_batch(jobs, args.out, workers=args.workers,
+                                        use_processes=args.processes, skip_existing=not args.force,
+                                        budget_seconds=args.budget_minutes * 60 if args.budget_minutes else None,
+                                        api_key=api_key):
+        if error:
+            failed += 1
+        else:
+            completed += 1
+    log_event("batch_finished", completed=completed, failed=failed, elapsed=round(time.time() - start_time, 2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""The Batch tab shared by the content pages.
+
+Both content pages offer the same batch runner: topics pasted or uploaded as
+CSV, generated in-process or on the worker queue, exported as ZIP/CSV/Parquet
+into the session's workspace and recorded in the library.
+"""
+import os
+import pandas as pd
+import streamlit as st
+from ccsuite.batch import (
+    DEFAULT_STYLE, export_csv, export_parquet, export_zip, parse_topics_text, run_batch, run_batch_queued
+)
+from ccsuite.content import artifact_models
+from ccsuite.fileserver import file_link
+from ccsuite.jobqueue import open_queue
+from ccsuite.library import remember_runs
+from ccsuite.workspace import session_run
+
+
+def write_exports(results, run):
+    # Built once when the batch finishes; the page only links to the files afterwards
+    exports = {"zip": run.file("batch_results.zip"), "csv": run.file("batch_results.csv"), "parquet": None}
+    with run.atomic_write("batch_results.zip") as f:
+        f.write(export_zip(results).getvalue())
+    with run.atomic_write("batch_results.csv", "w", encoding="utf-8", newline="") as f:
+        f.write(export_csv(results))
+    try:
+        parquet = export_parquet(results)
+    except ImportError:
+        return exports
+    with run.atomic_write("batch_results.parquet") as f:
+        f.write(parquet.getvalue())
+    exports["parquet"] = run.file("batch_results.parquet")
+    return exports
+
+
+def render_batch_tab(api_key, library, source):
+    # `source` tags the library records and keeps each page's workspace and exports apart
+    st.write("Generate script, prompts, thumbnails, titles and description for many topics at once.")
+    uploaded = st.file_uploader("Upload topics CSV (columns: topic, duration, style)", type=["csv"])
+    pasted = st.text_area("...or paste topics (one per line, or CSV with a header row):", height=150)
+    default_duration = st.selectbox("Default duration (minutes):", [3, 5, 7, 10], index=1)
+    default_style = st.text_input("Default style:", "Educational")
+    max_workers = st.slider("Topics to generate concurrently:", min_value=1, max_value=16, value=4)
+    budget_minutes = st.number_input("Time budget in minutes (0 = no limit):", min_value=0, value=0)
+
+    topics_text = uploaded.getvalue().decode("utf-8-sig") if uploaded is not None else pasted
+    jobs = parse_topics_text(topics_text, duration=default_duration, style=default_style or DEFAULT_STYLE)
+
+    if jobs:
+        st.dataframe(pd.DataFrame(jobs), use_container_width=True)
+
+    exports_key = f"{source}_batch_exports"
+    if st.button("Generate Batch"):
+        if not api_key:
+            st.error("Please enter your OpenAI API key before proceeding.")
+        elif not jobs:
+            st.error("Please add at least one topic.")
+        else:
+            job_queue = open_queue()
+            budget_seconds = budget_minutes * 60 or None
+            batch_run = session_run(f"{source}_batch_run", new=True)
+            if job_queue is not None:
+                # Topics are spread over the worker processes; concurrency is theirs to decide
+                outcomes = run_batch_queued(job_queue, jobs, api_key=api_key, budget_seconds=budget_seconds)
+            else:
+                outcomes = run_batch(jobs, batch_run.path, workers=max_workers,
+                                     skip_existing=False, budget_seconds=budget_seconds, api_key=api_key)
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            results = []
+            failed = []
+            job_index = {id(job): index for index, job in enumerate(jobs)}
+
+            for done, (job, result, error) in enumerate(outcomes, start=1):
+                if error:
+                    failed.append((job["topic"], str(error)))
+                else:
+                    results.append((job_index[id(job)], result))
+                progress_bar.progress(done / len(jobs))
+                status_text.write(f"Finished {done}/{len(jobs)}: {job['topic']}")
+
+            # Keep the export in the order the topics were entered
+            results = [result for _, result in sorted(results, key=lambda pair: pair[0])]
+            st.session_state[exports_key] = write_exports(results, batch_run)
+            if library is not None and results:
+                remember_runs(library.record_many(
+                    [dict(result, models=artifact_models(result["duration"])) for result in results],
+                    source=f"{source} batch"))
+
+            st.success(f"Generated content for {len(results)} of {len(jobs)} topics")
+            for failed_topic, message in failed:
+                st.warning(f"{failed_topic}: {message}")
+
+    exports = st.session_state.get(exports_key)
+    if exports and os.path.exists(exports["zip"]):
+        file_link("Download All Results (ZIP)", exports["zip"], "batch_results.zip", "application/zip")
+        file_link("Download All Results (CSV)", exports["csv"], "batch_results.csv", "text/csv")
+        if exports["parquet"]:
+            file_link("Download All Results (Parquet)", exports["parquet"], "batch_results.parquet",
+                      "application/octet-stream")
+        else:
+            st.caption("Install pyarrow to enable Parquet export.")
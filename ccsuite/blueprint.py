@@ -0,0 +1,319 @@
+"""Node types and the execution engine behind pages/blueprint.py.
+
+A blueprint is a list of nodes ({"id", "type", "name", "config"}). Each
+node type is a class registered with @node_type, declaring the values it
+reads (inputs, optional_inputs), the values it produces (outputs), whether
+it is pure (cacheable) and a rough cost hint ("free", "low", "high") the
+page shows next to it. Values flow by name: the trigger's form fields, then
+whatever earlier nodes output, so a node runs once everything it reads is
+available.
+
+Two things keep repeated work away from the providers:
+
+    memo       outputs of cacheable nodes, keyed by node type, config and
+               inputs (an openai_api recommendation for the same inquiry
+               text), shared by every submission for CACHE_TTL seconds
+    journal    outputs of every node of a submission, keyed by the form
+               data; a retry or a duplicate submission within RETRY_TTL
+               seconds reuses them, so a sheet row is not appended twice
+               and nothing is called again
+
+Failed nodes are never remembered, so retrying after an error runs them
+again. CCSUITE_BLUEPRINT_CACHE_TTL and CCSUITE_BLUEPRINT_RETRY_TTL set the
+two lifetimes.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+
+from ccsuite import metrics
+from ccsuite.singleflight import make_key, normalize
+
+CACHE_TTL = int(os.environ.get("CCSUITE_BLUEPRINT_CACHE_TTL", str(24 * 3600)))
+RETRY_TTL = int(os.environ.get("CCSUITE_BLUEPRINT_RETRY_TTL", "3600"))
+CACHE_SIZE = 1024
+
+# Node run states, as shown by the page
+RAN, CACHED, REUSED, FAILED, SKIPPED = "ran", "cached", "reused", "failed", "skipped"
+
+NODE_TYPES = {}
+
+
+class BlueprintError(Exception):
+    pass
+
+
+class NodeError(Exception):
+    pass
+
+
+def node_type(name):
+    def register(cls):
+        cls.type = name
+        NODE_TYPES[name] = cls
+        return cls
+    return register
+
+
+class _TTLCache:
+    """Small thread-safe LRU whose entries expire after ttl seconds."""
+
+    def __init__(self, ttl, maxsize=CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key, now=None):
+        now = now or time.time()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if now - item[0] > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, value, now=None):
+        with self._lock:
+            self._items[key] = (now or time.time(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+memo = _TTLCache(CACHE_TTL)
+journal = _TTLCache(RETRY_TTL)
+
+
+class Node(ABC):
+    inputs = ()
+    optional_inputs = ()
+    outputs = ()
+    cacheable = False
+    cost = "free"
+
+    def __init__(self, spec):
+        self.id = spec.get("id") or spec["type"]
+        self.name = spec.get("name") or self.id
+        self.config = spec.get("config") or {}
+
+    def key_inputs(self, values):
+        # Text inputs compared without whitespace differences, as for coalesced OpenAI calls
+        return {name: normalize(values.get(name)) for name in self.inputs + self.optional_inputs}
+
+    def cache_key(self, values):
+        # Config keys holding credentials never become part of a key
+        config = {k: v for k, v in self.config.items() if "key" not in k.lower() and "password" not in k.lower()}
+        return make_key(self.type, config, self.key_inputs(values))
+
+    @abstractmethod
+    def run(self, values, context):
+        """Returns a dict with this node's outputs; raises NodeError when it cannot."""
+
+
+@node_type("trigger")
+class FormTrigger(Node):
+    """The form; its fields are the values every other node reads."""
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.fields = self.config.get("fields", [])
+        self.outputs = tuple(field.get("name", "Unknown") for field in self.fields)
+
+    def run(self, values, context):
+        return {name: values.get(name, "") for name in self.outputs}
+
+
+@node_type("google_sheets")
+class GoogleSheetsAppend(Node):
+    inputs = ("Full Name", "Email", "Inquiry")
+    outputs = ("sheet_row",)
+    cost = "low"
+
+    _sheets = {}
+    _sheets_lock = threading.Lock()
+
+    def _sheet(self, credentials_file):
+        # Authorizing takes a round trip per call; the worksheet handle is reused while the key file is unchanged
+        if not os.path.exists(credentials_file):
+            raise NodeError(f"Google Sheets credentials file not found: {credentials_file}")
+        key = (os.path.abspath(credentials_file), os.path.getmtime(credentials_file), self.config["sheetName"])
+        with self._sheets_lock:
+            sheet = self._sheets.get(key)
+        if sheet is None:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+
+            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            with metrics.span("google_sheets.auth"):
+                try:
+                    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
+                    sheet = gspread.authorize(creds).open(self.config["sheetName"]).sheet1
+                except Exception as e:
+                    raise NodeError(f"Google Sheets authentication failed: {e}") from e
+            with self._sheets_lock:
+                self._sheets[key] = sheet
+        return sheet
+
+    def run(self, values, context):
+        sheet = self._sheet(context.get("credentials_file", "credentials.json"))
+        row = [values[name] for name in self.inputs]
+        with metrics.span("google_sheets.append"):
+            try:
+                sheet.append_row(row)
+            except Exception as e:
+                raise NodeError(f"Failed to save to Google Sheets: {e}") from e
+        return {"sheet_row": row}
+
+
+@node_type("openai_api")
+class OpenAIRecommendation(Node):
+    inputs = ("Inquiry",)
+    outputs = ("AI_Recommendation",)
+    cacheable = True
+    cost = "high"
+
+    def run(self, values, context):
+        from ccsuite.clients import get_client
+        from ccsuite.content import generate_recommendation
+        from ccsuite.jobqueue import DONE, open_queue
+
+        api_key = context.get("openai_api_key")
+        if not api_key:
+            raise NodeError("Missing OpenAI API key")
+        inquiry = values["Inquiry"]
+        job_queue = open_queue()
+        if job_queue is not None:
+            # A worker process makes the call; the submission just waits for its result
+            job_id = job_queue.enqueue("blueprint.recommendation", {"inquiry": inquiry},
+                                       secrets={"openai_api_key": api_key})
+            job = job_queue.wait(job_id, timeout=120)
+            if job["status"] != DONE:
+                raise NodeError(job["error"] or "no worker picked up the job in time")
+            return {"AI_Recommendation": job["result"]}
+        try:
+            return {"AI_Recommendation": generate_recommendation(inquiry, client=get_client(api_key))}
+        except Exception as e:
+            raise NodeError(f"Failed to generate AI recommendation: {e}") from e
+
+
+@node_type("email")
+class EmailDraft(Node):
+    """Builds the confirmation email; drafts only, nothing is sent."""
+
+    optional_inputs = ("Full Name", "Email", "Inquiry", "AI_Recommendation")
+    outputs = ("email_draft",)
+
+    def run(self, values, context):
+        body = self.config.get("body", "")
+        for name in self.optional_inputs:
+            body = body.replace("{{" + name + "}}", values.get(name) or "")
+        to_email = (values.get("Email") or "").strip() or context.get("fallback_email")
+        if not to_email:
+            raise NodeError("No recipient email address found")
+        return {"email_draft": {
+            "from": self.config.get("fromEmail", ""),
+            "to": to_email,
+            "subject": self.config.get("subject", ""),
+            "body": body,
+        }}
+
+
+class NodeResult:
+    def __init__(self, node, status, outputs=None, error=None, seconds=0.0):
+        self.node = node
+        self.status = status
+        self.outputs = outputs or {}
+        self.error = error
+        self.seconds = seconds
+
+
+class Blueprint:
+    def __init__(self, spec):
+        self.id = spec.get("id", "blueprint")
+        self.nodes = []
+        for node_spec in spec.get("nodes", []):
+            cls = NODE_TYPES.get(node_spec.get("type"))
+            if cls is None:
+                raise BlueprintError(f"Unknown node type: {node_spec.get('type')}")
+            self.nodes.append(cls(node_spec))
+
+    def find(self, type_name):
+        return next((node for node in self.nodes if node.type == type_name), None)
+
+    def _order(self):
+        # Blueprint order, except that a node waits for the nodes producing what it reads
+        produced_by = {}
+        for node in self.nodes:
+            for name in node.outputs:
+                produced_by.setdefault(name, node)
+        ordered, placed = [], set()
+
+        def place(node, visiting):
+            if node.id in placed:
+                return
+            if node.id in visiting:
+                raise BlueprintError(f"Cycle through node {node.id}")
+            visiting.add(node.id)
+            for name in node.inputs + node.optional_inputs:
+                producer = produced_by.get(name)
+                if producer is not None and producer is not node:
+                    place(producer, visiting)
+            placed.add(node.id)
+            ordered.append(node)
+
+        for node in self.nodes:
+            place(node, set())
+        return ordered
+
+    def run(self, form_data, context=None):
+        """Runs every node for one form submission; returns a NodeResult per node in execution order."""
+        context = context or {}
+        submission = make_key(self.id, {k: normalize(v) for k, v in form_data.items()})
+        done = journal.get(submission) or {}
+        values = dict(form_data)
+        results = []
+        for node in self._order():
+            start = time.perf_counter()
+            # Only values nothing provided count as missing; a form field left empty is still appended
+            missing = [name for name in node.inputs if name not in values]
+            if missing:
+                results.append(NodeResult(node, SKIPPED, error=f"Missing {', '.join(missing)}"))
+                metrics.inc("ccsuite_blueprint_nodes_total", node=node.type, status=SKIPPED)
+                continue
+
+            key = node.cache_key(values)
+            status, outputs = REUSED, done.get(node.id, {}).get(key)
+            if outputs is None and node.cacheable:
+                status, outputs = CACHED, memo.get(key)
+                metrics.record_cache(f"blueprint.{node.type}", hit=outputs is not None)
+            if outputs is None:
+                status = RAN
+                try:
+                    with metrics.span("blueprint.node", node=node.type):
+                        outputs = node.run(values, context)
+                except NodeError as e:
+                    results.append(NodeResult(node, FAILED, error=str(e), seconds=time.perf_counter() - start))
+                    metrics.inc("ccsuite_blueprint_nodes_total", node=node.type, status=FAILED)
+                    continue
+                if node.cacheable:
+                    memo.put(key, outputs)
+            # Recorded per submission as each node finishes, so a retry after a later failure skips it
+            done = dict(done, **{node.id: {key: outputs}})
+            journal.put(submission, done)
+            values.update(outputs)
+            results.append(NodeResult(node, status, outputs, seconds=time.perf_counter() - start))
+            metrics.inc("ccsuite_blueprint_nodes_total", node=node.type, status=status)
+        return results
@@ -0,0 +1,117 @@
+"""One pooled OpenAI client per credential, shared by every session in the process.
+
+Setting the module-global openai.api_key from a page races with every other
+session using a different key, and builds no connection reuse. Instead,
+pages and workers call get_client(api_key) and pass the result to the
+generation functions as `client`.
+
+Clients are created on first use and kept while they are used; one left
+idle for IDLE_SECONDS is closed on a later lookup. Each credential allows at
+most MAX_CONCURRENCY completions at once (streamed ones hold their slot
+until the stream is consumed), so one busy tenant cannot exhaust its own
+rate limit with hundreds of parallel calls. Both can be set with
+CCSUITE_OPENAI_IDLE_SECONDS and CCSUITE_OPENAI_CONCURRENCY.
+
+Look clients up per use rather than keeping them for the life of a
+session: an evicted client is closed.
+"""
+import hashlib
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from ccsuite import metrics
+
+IDLE_SECONDS = int(os.environ.get("CCSUITE_OPENAI_IDLE_SECONDS", "600"))
+MAX_CONCURRENCY = int(os.environ.get("CCSUITE_OPENAI_CONCURRENCY", "8"))
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def _reset_after_fork():
+    # A forked child (e.g. batch --processes) must not reuse the parent's pooled sockets
+    global _lock
+    _lock = threading.Lock()
+    _clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class PooledClient:
+    """Duck-types the parts of openai.OpenAI the app uses: .api_key and .chat.completions.create()."""
+
+    def __init__(self, api_key, base_url=None, max_concurrency=MAX_CONCURRENCY):
+        self.api_key = api_key
+        self.openai = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=openai.DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=max_concurrency * 2, max_keepalive_connections=max_concurrency)
+            )
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.last_used = time.time()
+        self.in_use = 0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._state = threading.Lock()
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with metrics.span("openai.slot_wait"):
+                self._slots.acquire()
+        with self._state:
+            self.in_use += 1
+
+    def _release(self):
+        with self._state:
+            self.in_use -= 1
+            self.last_used = time.time()
+        self._slots.release()
+
+    def _create(self, **kwargs):
+        self._acquire()
+        try:
+            response = self.openai.chat.completions.create(**kwargs)
+        except BaseException:
+            self._release()
+            raise
+        if kwargs.get("stream"):
+            return self._streamed(response)
+        self._release()
+        return response
+
+    def _streamed(self, stream):
+        try:
+            yield from stream
+        finally:
+            stream.close()
+            self._release()
+
+    def close(self):
+        self.openai.close()
+
+
+def get_client(api_key, base_url=None):
+    """The shared client for api_key, created on first use; also closes clients idle for IDLE_SECONDS."""
+    key = (hashlib.sha256(api_key.encode("utf-8")).hexdigest(), base_url)
+    now = time.time()
+    with _lock:
+        idle = [k for k, client in _clients.items()
+                if k != key and client.in_use == 0 and now - client.last_used > IDLE_SECONDS]
+        evicted = [_clients.pop(k) for k in idle]
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = PooledClient(api_key, base_url)
+            metrics.inc("ccsuite_openai_clients_created_total")
+        client.last_used = now
+    for stale in evicted:
+        stale.close()
+        metrics.inc("ccsuite_openai_clients_evicted_total")
+    return client
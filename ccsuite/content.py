@@ -0,0 +1,126 @@
+import json
+
+import openai
+
+from ccsuite.context import script_digest
+from ccsuite.llm import chat
+from ccsuite.longform import LONG_FORM_MINUTES, WORDS_PER_MINUTE, generate_long_script
+from ccsuite.prompts import join_prompts, stream_image_prompts
+
+METADATA_SCHEMA = {
+    "name": "video_metadata",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "titles": {"type": "array", "items": {"type": "string"}},
+            "description": {"type": "string"}
+        },
+        "required": ["titles", "description"],
+        "additionalProperties": False
+    }
+}
+
+
+def generate_script(topic, duration, style, client=None, on_section=None):
+    # Long videos are outlined and written section by section in parallel (see ccsuite.longform)
+    if duration >= LONG_FORM_MINUTES:
+        return generate_long_script(topic, duration, style, client=client, on_section=on_section)
+    client = client or openai
+    prompt = (
+        f"You are a professional scriptwriter for YouTube videos. Based on the following inputs, generate a {duration}-minute script at a normal speaking pace (~{duration * WORDS_PER_MINUTE} words).\n"
+        f"The tone and style must match the provided description. Break the script into sections with appropriate headings for clarity.\n"
+        f"- Topic: {topic}\n"
+        f"- Style: {style}\n"
+        f"Ensure the script flows smoothly, keeping viewers engaged from start to finish."
+    )
+    return chat(client, "script", "gpt-4", prompt, 1500)
+
+
+def generate_image_prompts(script, on_prompt=None, client=None):
+    # Structured prompts are streamed so each one can be shown (or queued) as soon as it is complete
+    prompts = []
+    for item in stream_image_prompts(script, client=client):
+        prompts.append(item)
+        if on_prompt:
+            on_prompt(item)
+    return join_prompts(prompts)
+
+
+def generate_thumbnail_ideas(topic, script, client=None):
+    client = client or openai
+    prompt = (
+        "You are an expert in creating catchy YouTube thumbnails. Based on the provided topic and script outline, suggest 3-5 thumbnail ideas that are engaging, visually appealing, and optimized for clicks.\n"
+        "- Use a few bold words (e.g., 'MUST SEE,' 'SHOCKING FACTS').\n"
+        "- Include emojis if relevant.\n"
+        "- Suggest a brief visual description (e.g., 'A polar bear on thin ice with dramatic lighting').\n"
+        f"Topic: {topic}\n"
+        f"Script outline:\n{script_digest(script, 'thumbnails')}\n"
+        "Output each idea on a new line."
+    )
+    return chat(client, "thumbnails", "gpt-4o", prompt, 500)
+
+
+def generate_video_metadata(topic, script, client=None):
+    # Titles and description come from one structured call over the script digest
+    client = client or openai
+    prompt = (
+        "You are a YouTube SEO expert. Based on the following topic and script outline:\n"
+        "- Suggest 3 click-worthy titles that are concise, engaging, and optimized for SEO.\n"
+        "- Write a compelling description as one paragraph, with a summary of the video, keywords related to the topic "
+        "and a call to action (e.g., 'Subscribe for more!').\n"
+        f"Topic: {topic}\n"
+        f"Script outline:\n{script_digest(script, 'metadata')}"
+    )
+    content = chat(client, "metadata", "gpt-4o", prompt, 500,
+                   response_format={"type": "json_schema", "json_schema": METADATA_SCHEMA})
+    metadata = json.loads(content)
+    titles = "\n".join(f"{i}. {title}" for i, title in enumerate(metadata["titles"], start=1))
+    return titles, metadata["description"]
+
+
+def generate_recommendation(inquiry, client=None):
+    # Blueprint form follow-up; shared by pages/blueprint.py and queue workers
+    client = client or openai
+    return chat(client, "recommendation", "gpt-4-turbo",
+                f"User Inquiry: {inquiry}. Generate a short, personalized recommendation.", 300,
+                system="You are a helpful assistant.")
+
+
+def artifact_models(duration):
+    # Which model wrote each field of a generate_all() result, as recorded in the content library
+    return {
+        "script": "gpt-4o" if duration >= LONG_FORM_MINUTES else "gpt-4",
+        "image_prompts": "gpt-4o",
+        "thumbnails": "gpt-4o",
+        "titles": "gpt-4o",
+        "description": "gpt-4o",
+    }
+
+
+def generate_all(topic, duration, style, client=None, on_prompt=None):
+    # Every text artifact for one topic, in the order the page shows them
+    script = generate_script(topic, duration, style, client=client)
+    image_prompts = generate_image_prompts(script, on_prompt=on_prompt, client=client)
+    thumbnails = generate_thumbnail_ideas(topic, script, client=client)
+    titles, description = generate_video_metadata(topic, script, client=client)
+    return {
+        "topic": topic,
+        "duration": duration,
+        "style": style,
+        "script": script,
+        "image_prompts": image_prompts,
+        "thumbnails": thumbnails,
+        "titles": titles,
+        "description": description,
+    }
+
+
+def format_results(result):
+    return (
+        f"Generated Script:\n{result['script']}\n\n"
+        f"Image Prompts:\n{result['image_prompts']}\n\n"
+        f"Thumbnail Ideas:\n{result['thumbnails']}\n\n"
+        f"Video Titles:\n{result['titles']}\n\n"
+        f"Video Description:\n{result['description']}"
+    )
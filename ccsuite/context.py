@@ -0,0 +1,103 @@
+"""Compact script digests for the LLM stages that follow script generation.
+
+Image prompts, thumbnail ideas and video metadata only need the shape of a
+script (title, section headings, timings) and its key facts, not every
+word. script_digest() builds that summary once from the cached section
+index and trims it to the token budget of the stage asking for it, so a
+~1500 token script is not re-sent in full to every follow-up call.
+
+Sentences are ranked by how much concrete information they carry (numbers,
+names) per token and added round-robin across sections until the budget is
+spent, so every section keeps its best facts before any section gets a
+second one. A script that already fits the budget is passed through as is.
+"""
+import functools
+import re
+
+from ccsuite import metrics
+from ccsuite.script_index import parse_script
+
+# Approximate input budget (tokens) for the script context of each stage
+STAGE_BUDGETS = {
+    "image_prompts": 700,
+    "thumbnails": 300,
+    "metadata": 400,
+}
+# Stages that also get the visual cues, e.g. "(Host on Screen)"
+VISUAL_STAGES = ("image_prompts", "thumbnails")
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[\w'’-]+")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English with the GPT tokenizers; close enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def _score(sentence):
+    words = _WORD.findall(sentence)
+    facts = sum(3 for word in words if any(c.isdigit() for c in word))
+    facts += sum(1 for word in words[1:] if word[:1].isupper())
+    return (facts + 1) / max(estimate_tokens(sentence), 1) ** 0.5
+
+
+def _candidates(section, cues):
+    sentences = [s.strip() for s in _SENTENCE.split(section["narration"]) if s.strip()]
+    ranked = sorted(enumerate(sentences), key=lambda item: _score(item[1]), reverse=True)
+    if cues and section["cues"]:
+        # The first cue describes the shot; it goes ahead of the narration
+        ranked.insert(0, (-1, f"({section['cues'][0]})"))
+    return ranked
+
+
+def _heading(section):
+    if section["start"] and section["end"]:
+        return f"- [{section['start']}-{section['end']}] {section['heading']}:"
+    return f"- {section['heading']}:"
+
+
+@functools.lru_cache(maxsize=64)
+def build_digest(script, budget, cues=False):
+    """Title, headings and the highest-value sentences of script within about budget tokens."""
+    if estimate_tokens(script) <= budget:
+        return script
+    index = parse_script(script)
+    if not index.sections:
+        return script[:budget * 4]
+
+    lines = [f"Title: {index.title}"] if index.title else []
+    headings = [_heading(section) for section in index.sections]
+    used = estimate_tokens("\n".join(lines + headings))
+    if used >= budget:
+        return "\n".join(lines + headings)[:budget * 4]
+
+    ranked = [_candidates(section, cues) for section in index.sections]
+    chosen = [[] for _ in index.sections]
+    for rank in range(max(len(r) for r in ranked)):
+        added = False
+        for i, candidates in enumerate(ranked):
+            if rank >= len(candidates):
+                continue
+            position, sentence = candidates[rank]
+            cost = estimate_tokens(sentence) + 1
+            if used + cost > budget:
+                continue
+            chosen[i].append((position, sentence))
+            used += cost
+            added = True
+        if not added:
+            break
+
+    for heading, facts in zip(headings, chosen):
+        lines.append(" ".join([heading] + [sentence for _, sentence in sorted(facts)]))
+    return "\n".join(lines)
+
+
+def script_digest(script, stage, budget=None):
+    """The digest of script for one stage, using STAGE_BUDGETS unless budget is given."""
+    budget = budget or STAGE_BUDGETS[stage]
+    digest = build_digest(script, budget, cues=stage in VISUAL_STAGES)
+    metrics.inc("ccsuite_context_tokens_total", estimate_tokens(script), stage=stage, source="script")
+    metrics.inc("ccsuite_context_tokens_total", estimate_tokens(digest), stage=stage, source="digest")
+    return digest
@@ -0,0 +1,42 @@
+import streamlit as st
+from ccsuite import autotune, metrics
+
+
+def render_debug_panel():
+    # Sidebar view of the process-wide metrics; also starts /metrics if CCSUITE_METRICS_PORT is set
+    metrics.start_http_server()
+    with st.sidebar.expander("🛠 Debug: timings & usage", expanded=False):
+        spans = metrics.span_summary()
+        if spans:
+            st.dataframe(
+                [{k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()} for row in spans],
+                use_container_width=True
+            )
+        else:
+            st.caption("No provider calls recorded yet.")
+
+        counters, _ = metrics.snapshot()
+        tokens = {}
+        for (name, labels), value in counters.items():
+            if name.startswith("ccsuite_openai_"):
+                kind = name.replace("ccsuite_openai_", "").replace("_total", "")
+                tokens[kind] = tokens.get(kind, 0) + value
+        credits = sum(v for (name, _), v in counters.items() if name == "ccsuite_leonardo_credits_total")
+        st.write(f"**OpenAI tokens:** {tokens.get('prompt_tokens', 0)} in / {tokens.get('completion_tokens', 0)} out")
+        st.write(f"**Leonardo credits:** {credits}")
+
+        tuners = autotune.summaries()
+        if tuners:
+            # Live AIMD settings per Leonardo key (keys shown as a hash prefix)
+            st.write("**Leonardo autotune**")
+            st.dataframe(tuners, use_container_width=True)
+
+        for cache, (hits, lookups) in sorted(metrics.cache_hit_rates().items()):
+            st.write(f"**Cache {cache}:** {hits}/{lookups} hits ({hits / lookups:.0%})")
+
+        st.download_button(
+            "Download metrics (Prometheus)",
+            metrics.render_prometheus(),
+            file_name="ccsuite_metrics.prom",
+            mime="text/plain"
+        )
@@ -0,0 +1,123 @@
+"""Streaming image downloads that never hold a whole file in memory.
+
+Responses are copied to disk CHUNK_SIZE bytes at a time into a `.part`
+file, hashed as they go, and renamed into place once complete. A dropped
+connection resumes from the bytes already on disk with a Range request
+(Leonardo's CDN honours them); a server that ignores Range just restarts
+the file.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from ccsuite import metrics
+
+CHUNK_SIZE = 16 * 1024
+RETRIES = 3
+
+_local = threading.local()
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _session():
+    # requests.Session is not thread-safe, so each download thread keeps its own connection pool
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
+def url_filename(url, suffix=".png"):
+    # Stable, collision-safe local name for a generated image URL
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + suffix
+
+
+def _hash_existing(path, digest):
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _fetch(url, part_path, timeout):
+    # One attempt: returns (bytes on disk, sha256 digest) once the response is fully written
+    digest = hashlib.sha256()
+    offset = _hash_existing(part_path, digest) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with _session().get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # Range past the end: the part file already holds the whole image
+            return offset, digest
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            # Server ignored the Range header, start the file over
+            digest = hashlib.sha256()
+            offset = 0
+        # With a Content-Encoding, Content-Length counts the encoded bytes while iter_content yields
+        # decoded ones, so the two can only be compared for identity responses
+        encoding = response.headers.get("Content-Encoding", "identity").strip().lower()
+        expected = response.headers.get("Content-Length") if encoding == "identity" else None
+        written = 0
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+        metrics.inc("ccsuite_download_bytes_total", written)
+        if expected is not None and written != int(expected):
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Connection closed after {written} of {expected} bytes")
+        return offset + written, digest
+
+
+def download_to_file(url, path, sha256=None, retries=RETRIES, timeout=30):
+    """Streams url to path and returns {url, path, bytes, sha256, seconds}.
+
+    Interrupted transfers are resumed up to `retries` times. If sha256 is
+    given, a mismatching file is deleted and DownloadError raised.
+    """
+    part_path = path + ".part"
+    start_time = time.time()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with metrics.span("image.download"):
+        for attempt in range(retries + 1):
+            try:
+                size, digest = _fetch(url, part_path, timeout)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as e:
+                metrics.inc("ccsuite_download_retries_total")
+                if attempt == retries:
+                    raise DownloadError(f"Error downloading {url}: {e}") from e
+            except requests.exceptions.RequestException as e:
+                raise DownloadError(f"Error downloading {url}: {e}") from e
+
+        checksum = digest.hexdigest()
+        if sha256 and checksum != sha256.lower():
+            os.remove(part_path)
+            raise DownloadError(f"Checksum mismatch for {url}: expected {sha256}, got {checksum}")
+        os.replace(part_path, path)
+    return {"url": url, "path": path, "bytes": size, "sha256": checksum,
+            "seconds": round(time.time() - start_time, 3)}
+
+
+def download_all(downloads, workers=4, **options):
+    """Fetches (url, path) pairs concurrently; yields (index, result, error) as each finishes."""
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as executor:
+        futures = {executor.submit(download_to_file, url, path, **options): index
+                   for index, (url, path) in enumerate(downloads)}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except DownloadError as e:
+                yield futures[future], None, e
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+_lock = threading.Lock()
+_loop = None
+_thread = None
+
+
+def get_loop():
+    # One asyncio loop per process, shared by every Streamlit session
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="ccsuite-event-loop", daemon=True)
+            _thread.start()
+    return _loop
+
+
+def submit(coro):
+    """Schedules coro on the shared loop and returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro, timeout=None):
+    # Blocking helper for sync callers; never call it from the loop thread itself
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run() would deadlock when called from the event loop thread")
+    return submit(coro).result(timeout)
@@ -0,0 +1,205 @@
+"""Serves finished exports straight from disk over signed, short-lived links.
+
+st.download_button embeds its file in the app: the data is read and handed
+to Streamlit on every rerun, so a ZIP of hundreds of MB is moved again each
+time a widget changes. With CCSUITE_FILES_PORT set, pages render file_link()
+instead, a plain link to a small HTTP server in the same process that
+streams the file with socket.sendfile() and answers byte-range requests, so
+browsers can resume a broken download.
+
+    GET|HEAD /files/<token>/<filename>
+
+The token carries the absolute path and an expiry time, signed with
+HMAC-SHA256 under CCSUITE_FILES_SECRET (a random per-process secret if
+unset; set it when several app processes sit behind one address). A link
+cannot be edited to reach another file and stops working after LINK_TTL
+seconds (CCSUITE_FILES_TTL). Links point at the files port on the host the
+browser used, or at CCSUITE_FILES_URL behind a reverse proxy.
+
+Without CCSUITE_FILES_PORT, file_link() falls back to st.download_button.
+"""
+import base64
+import hashlib
+import hmac
+import mimetypes
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ccsuite import metrics
+
+LINK_TTL = int(os.environ.get("CCSUITE_FILES_TTL", "3600"))
+FILES_PATH = "/files"
+
+mimetypes.add_type("application/jsonl", ".jsonl")
+
+_secret = os.environ.get("CCSUITE_FILES_SECRET", "").encode("utf-8") or os.urandom(32)
+_lock = threading.Lock()
+_server = None
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(payload):
+    return _b64encode(hmac.new(_secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def sign(path, ttl=LINK_TTL, now=None):
+    """Token granting access to path until about ttl seconds from now."""
+    # Rounded up to the minute, so reruns within a minute render the same link
+    expires = -(-int((now or time.time()) + ttl) // 60) * 60
+    payload = f"{_b64encode(os.path.abspath(path).encode('utf-8'))}.{expires}"
+    return f"{payload}.{_signature(payload)}"
+
+
+def verify(token, now=None):
+    """The path a token grants, or None if it is malformed, forged or expired."""
+    try:
+        encoded, expires, signature = token.split(".")
+        if not hmac.compare_digest(signature, _signature(f"{encoded}.{expires}")):
+            return None
+        if int(expires) < (now or time.time()):
+            return None
+        return _b64decode(encoded).decode("utf-8")
+    except (ValueError, UnicodeError):
+        return None
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single "bytes=" range, None to send everything, or ValueError if unsatisfiable."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        # Multipart ranges are answered with the whole file, which the spec allows
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        parts = urllib.parse.urlsplit(self.path).path.split("/")
+        if len(parts) != 4 or "/" + parts[1] != FILES_PATH:
+            self.send_error(404)
+            return
+        path = verify(parts[2])
+        if path is None:
+            self.send_error(403, "Link expired or invalid")
+            return
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(404, "File no longer available")
+            return
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = byte_range or (0, size - 1)
+            filename = urllib.parse.unquote(parts[3]) or os.path.basename(path)
+
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", mimetypes.guess_type(filename)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{urllib.parse.quote(filename)}")
+            self.send_header("Cache-Control", "private, no-store")
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if not send_body or size == 0:
+                return
+            try:
+                # The kernel copies file to socket; nothing passes through Python buffers
+                sent = self.connection.sendfile(f, start, end - start + 1)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+                return
+            metrics.inc("ccsuite_files_served_bytes_total", sent)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=None, host="0.0.0.0"):
+    """Starts the file server once per process; returns None when no port is configured."""
+    global _server
+    port = port or os.environ.get("CCSUITE_FILES_PORT")
+    if not port:
+        return _server
+    with _lock:
+        if _server is None:
+            server = ThreadingHTTPServer((host, int(port)), _FileHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="file-server", daemon=True).start()
+            _server = server
+    return _server
+
+
+def stop_server():
+    global _server
+    with _lock:
+        server, _server = _server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+def base_url():
+    configured = os.environ.get("CCSUITE_FILES_URL")
+    if configured:
+        return configured.rstrip("/")
+    host = "localhost"
+    try:
+        import streamlit as st
+
+        # The host name the browser reached the app on also reaches the files port
+        host = urllib.parse.urlsplit("//" + st.context.headers.get("Host", "")).hostname or host
+    except Exception:
+        pass
+    return f"http://{host}:{_server.server_address[1]}"
+
+
+def file_url(path, file_name=None, ttl=LINK_TTL):
+    return f"{base_url()}{FILES_PATH}/{sign(path, ttl)}/{urllib.parse.quote(file_name or os.path.basename(path))}"
+
+
+def file_link(label, path, file_name=None, mime=None):
+    """Renders a download link for a file on disk (st.download_button without the file server)."""
+    import streamlit as st
+
+    if start_server() is None:
+        with open(path, "rb") as f:
+            st.download_button(label=label, data=f, file_name=file_name or os.path.basename(path), mime=mime)
+        return
+    st.link_button(label, file_url(path, file_name))
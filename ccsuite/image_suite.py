@@ -0,0 +1,378 @@
+"""The script-to-images page shared by pages/testsuite.py and pages/newSuite.py.
+
+render_page() draws the whole page: script generation, image batches sized
+by the Leonardo autotuner, near-duplicate handling, the Canva manifest and
+downloads. Each generated image keeps the prompt slot it was made for
+(intro x2, each middle section x5, outro x2), and its filename and caption
+come from that slot, so images dropped as near-duplicates or several images
+per prompt never shift later names onto the wrong section.
+"""
+import streamlit as st
+from PIL import Image
+import shutil
+from zipfile import ZipFile
+import os
+import time
+from datetime import datetime
+from ccsuite import autotune, metrics
+from ccsuite.clients import get_client
+from ccsuite.debug_panel import render_debug_panel
+from ccsuite.downloads import download_all, url_filename
+from ccsuite.export import export_files
+from ccsuite.fileserver import file_link
+from ccsuite.leonardo import LeonardoError, generate_async, submit
+from ccsuite.llm import chat
+from ccsuite.longform import LONG_FORM_MINUTES, WORDS_PER_MINUTE, generate_long_script
+from ccsuite.manifest import Manifest
+from ccsuite.perceptual import DuplicateIndex, split_duplicates
+from ccsuite.prompts import stream_image_prompts
+from ccsuite.script_index import parse_script
+from ccsuite.sessions import track_session
+from ccsuite.workspace import session_run
+
+
+
+@metrics.cached(st.cache_data(ttl=3600), "generate_script")
+def generate_script(topic, duration, style, _client):
+    # _client is left out of the cache key (leading underscore), so sessions with different keys share scripts
+    # Too long for one completion: outline, then the sections in parallel; the first line is the topic
+    if duration >= LONG_FORM_MINUTES:
+        return generate_long_script(topic, duration, style, client=_client)
+    prompt = (
+        f"You are a professional scriptwriter for YouTube videos. Create a {duration}-minute script using this exact topic title: '{topic}'\n"
+        f"Use a normal speaking pace (~{WORDS_PER_MINUTE} words/minute). Break into sections with clear headings.\n"
+        f"Style: {style}\n"
+        f"The first line must be exactly: '{topic}'\n"
+        f"Ensure the script flows smoothly, keeping viewers engaged from start to finish."
+    )
+    # Concurrent identical requests (same topic in another tab) share one completion
+    return chat(_client, "script", "gpt-4o", prompt, 1500)
+
+
+def written_prompts(items, script):
+    """Maps each script section's heading (lower case) to the image prompt the model wrote for it.
+
+    Items name the section they illustrate, often loosely ("Intro", a shortened heading); when none match
+    but there is exactly one prompt per section, they are matched by position instead.
+    """
+    headings = [heading.lower() for heading in parse_script(script).headings]
+    if not headings:
+        return {}
+    matched = {}
+    for item in items:
+        label = item.get("section", "").strip().lower()
+        if label in headings:
+            heading = label
+        elif label.startswith("intro"):
+            heading = headings[0]
+        elif label.startswith(("outro", "conclusion", "closing")):
+            heading = headings[-1]
+        else:
+            heading = next((h for h in headings if label and (label in h or h in label)), None)
+        if heading is not None and item.get("prompt"):
+            matched.setdefault(heading, item["prompt"])
+    if not matched and len(items) == len(headings):
+        matched = {heading: item["prompt"] for heading, item in zip(headings, items)}
+    return matched
+
+
+def sanitize_prompt(prompt):
+    blocked_words = ['bondage', 'slave', 'slavery', 'enslaved']
+    for word in blocked_words:
+        prompt = prompt.lower().replace(word, 'person')
+    return prompt
+
+
+def save_images_to_disk(images, image_dir):
+    # Streams the batch's images to image_dir concurrently; returns the saved records in the original order
+    downloads = [(image['url'], os.path.join(image_dir, url_filename(image['url']))) for image in images]
+    saved = [None] * len(downloads)
+    for index, result, error in download_all(downloads):
+        if error:
+            st.error(str(error))
+        else:
+            saved[index] = dict(images[index], path=result['path'], sha256=result['sha256'],
+                                download_s=result['seconds'])
+    return [record for record in saved if record]
+
+
+def drop_near_duplicates(records, mode, leonardo_api_key, image_dir):
+    # Near-copies of images already in this run are deleted instead of stored, or regenerated once
+    kept, duplicates = split_duplicates(st.session_state.dup_index, records)
+    if mode == "Keep":
+        return records
+    for record in duplicates:
+        os.remove(record['path'])
+    if mode == "Regenerate once" and duplicates:
+        by_slot = {}
+        for record in duplicates:
+            by_slot.setdefault(record['slot'], []).append(record)
+        futures = {
+            submit(generate_async(slot_records[0]['prompt'], leonardo_api_key, timeout=30,
+                                  variant=f"{slot}-retry")): slot_records
+            for slot, slot_records in by_slot.items()
+        }
+        retry_images = []
+        for future, slot_records in futures.items():
+            try:
+                result = future.result()
+            except LeonardoError as e:
+                st.error(str(e))
+                continue
+            for img in result['images'][:len(slot_records)]:
+                retry_images.append({"url": img['url'], "prompt": result['prompt'], "slot": slot_records[0]['slot'],
+                                     "generation_id": result['generation_id']})
+        retried, duplicates = split_duplicates(st.session_state.dup_index,
+                                               save_images_to_disk(retry_images, image_dir))
+        for record in duplicates:
+            os.remove(record['path'])
+        kept.extend(retried)
+    st.session_state.duplicates_skipped += len(records) - len(kept)
+    return kept
+
+
+def prepare_prompts(script, batch_size=10, image_prompts=None):
+    # Intro x2, each middle section x5, outro x2, from the cached section index; sections without a
+    # written image prompt fall back to their own text
+    all_prompts = parse_script(script).section_prompts(intro=2, per_section=5, outro=2, image_prompts=image_prompts)
+    return [all_prompts[i:i + batch_size] for i in range(0, len(all_prompts), batch_size)]
+
+
+def rebatch(batches, done, batch_size):
+    # Prompts not generated yet are re-split at the batch size the autotuner currently recommends
+    remaining = [prompt for batch in batches[done:] for prompt in batch]
+    return batches[:done] + [remaining[i:i + batch_size] for i in range(0, len(remaining), batch_size)]
+
+
+def image_names(records, script, slot_counts):
+    """[filename, caption] for each saved record, from the prompt slot it was generated for.
+
+    slot_counts holds how many images each slot already has; a slot's second image (and any regenerated
+    one) gets a numbered suffix, e.g. section_2_image_3_2.png.
+    """
+    index = parse_script(script)
+    names = []
+    for record in records:
+        filename, caption = index.image_slot(record['slot'], intro=2, per_section=5)
+        taken = slot_counts.get(record['slot'], 0)
+        slot_counts[record['slot']] = taken + 1
+        if taken:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{taken + 1}{ext}"
+        names.append([filename, caption])
+    return names
+
+
+def render_page(title):
+    st.title(title)
+
+    # Sidebar instructions
+    st.sidebar.title("Quick Start")
+    st.sidebar.markdown("""
+    - Enter both API keys
+    - Input video topic, duration, style
+    - Click 'Generate Content'
+    - Images generate in batches sized to Leonardo's live throughput
+    - Click 'Generate Next Batch'
+    - Download images and CSV
+    """)
+    st.sidebar.info("💡 CSV works with Canva's bulk import")
+    st.sidebar.warning("⏳ Full generation takes ~30-45 minutes")
+    render_debug_panel()
+    # Restores this session's spilled state and accounts its memory before anything reads it
+    track_session()
+
+    # Detailed instructions
+    with st.expander("📚 How to Use This App", expanded=False):
+        st.markdown("""
+        **Step-by-Step Guide:**
+        1. **API Keys**
+            - OpenAI API key: Script generation
+            - Leonardo AI key: Image creation
+
+        2. **Input Details**
+            - Topic: Video's main subject
+            - Duration: Length in minutes
+            - Style: Content tone
+
+        3. **Generation Process**
+            - Script generates first
+            - Images create in batches
+            - Progress tracker included
+
+        4. **Downloads**
+            - CSV for Canva import
+            - ZIP of all images
+            - Image URLs list
+        """)
+
+    # Initialize session state
+    if 'current_batch' not in st.session_state:
+        st.session_state.current_batch = 0
+        st.session_state.all_batches = []
+        st.session_state.generated_images = []
+        st.session_state.generated_urls = []
+        st.session_state.script = None
+        st.session_state.image_data = []
+    if 'dup_index' not in st.session_state:
+        st.session_state.dup_index = DuplicateIndex()
+        st.session_state.duplicates_skipped = 0
+    if 'slot_images' not in st.session_state:
+        st.session_state.slot_images = {}
+
+    # Images live in this session's own workspace directory, never the shared CWD
+    image_run = session_run("image_run")
+    manifest = Manifest(image_run.path)
+
+    # API Keys
+    openai_api_key = st.text_input("Enter OpenAI API Key:", type="password")
+    leonardo_api_key = st.text_input("Enter Leonardo API Key:", type="password")
+
+
+    # User Inputs
+    topic = st.text_input("Enter your video topic:")
+    duration = st.slider("Select video duration (minutes):", min_value=1, max_value=10, value=5)
+    style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous) OR add short sample of your writing")
+    duplicate_mode = st.radio("Near-duplicate images:", ["Skip", "Regenerate once", "Keep"], horizontal=True,
+                              help="Repeated section prompts often return almost identical images")
+
+    if st.button("Generate Content") or ('script_generated' in st.session_state and st.session_state.script_generated):
+        if not openai_api_key or not leonardo_api_key:
+            st.error("Please enter both API keys before proceeding.")
+        else:
+            client = get_client(openai_api_key)
+            tuner = autotune.tuner_for(leonardo_api_key)
+
+            if st.session_state.script is None:
+                with st.spinner("Generating script..."):
+                    st.session_state.script = generate_script(topic, duration, style, client)
+                # Each structured prompt is shown as soon as the stream closes it
+                with st.spinner("Writing image prompts..."):
+                    items = []
+                    try:
+                        for item in stream_image_prompts(st.session_state.script, client=client):
+                            items.append(item)
+                            st.caption(f"{item['section']}: {item['prompt']}")
+                    except Exception as e:
+                        st.warning(f"Image prompts stopped early ({e}); remaining sections use their own text.")
+                    image_prompts = written_prompts(items, st.session_state.script)
+                    st.session_state.all_batches = prepare_prompts(st.session_state.script, tuner.batch_size,
+                                                                   image_prompts)
+                    st.session_state.script_generated = True
+                st.subheader("Generated Script")
+                st.write(st.session_state.script)
+
+            if st.session_state.current_batch < len(st.session_state.all_batches):
+                st.session_state.all_batches = rebatch(st.session_state.all_batches, st.session_state.current_batch,
+                                                       tuner.batch_size)
+                with st.spinner(
+                        f"Generating images (Batch {st.session_state.current_batch + 1}/{len(st.session_state.all_batches)})..."):
+                    current_prompts = st.session_state.all_batches[st.session_state.current_batch]
+
+                    # The whole batch is submitted at once; the key's tuned slot limit paces it. Sections repeat their
+                    # prompt once per image slot, so the slot number keeps those generations distinct; only
+                    # the same slot requested elsewhere at the same time (another tab) is shared.
+                    done_batches = st.session_state.all_batches[:st.session_state.current_batch]
+                    first_slot = sum(len(batch) for batch in done_batches)
+                    futures = [
+                        submit(generate_async(sanitize_prompt(prompt), leonardo_api_key, timeout=30,
+                                              variant=first_slot + i))
+                        for i, prompt in enumerate(current_prompts)
+                    ]
+
+                    batch_start = time.time()
+                    batch_images = []
+                    for i, future in enumerate(futures):
+                        progress_text = st.empty()
+                        progress_text.write(f"Processing image {i + 1} of {len(current_prompts)} in current batch...")
+
+                        try:
+                            result = future.result()
+                        except LeonardoError as e:
+                            st.error(str(e))
+                            continue
+
+                        for img in result['images']:
+                            batch_images.append({"url": img['url'], "prompt": result['prompt'], "slot": first_slot + i,
+                                                 "generation_id": result['generation_id'],
+                                                 "generation_s": round(time.time() - batch_start, 3)})
+
+                    saved = drop_near_duplicates(save_images_to_disk(batch_images, image_run.path), duplicate_mode,
+                                                 leonardo_api_key, image_run.path)
+                    for record in saved:
+                        st.session_state.generated_images.append(record['path'])
+                        st.session_state.generated_urls.append(record['url'])
+
+                    new_image_data = image_names(saved, st.session_state.script, st.session_state.slot_images)
+                    st.session_state.image_data.extend(new_image_data)
+
+                    # Only this batch's rows and ZIP entries are written; earlier ones are already on disk
+                    with metrics.span("zip.build"), ZipFile(image_run.file("images.zip"), "a") as zip_file:
+                        for (filename, caption), record in zip(new_image_data, saved):
+                            manifest.add(filename, caption, **record)
+                            zip_file.write(record['path'], filename)
+
+                    st.session_state.current_batch += 1
+
+                    st.write(f"Completed {st.session_state.current_batch} of "
+                             f"{len(st.session_state.all_batches)} batches")
+                    settings = tuner.summary()
+                    st.caption(f"Leonardo autotune: {settings['concurrency']} generations at once, "
+                               f"next batch {settings['batch_size']} prompts, "
+                               f"polling every {settings['poll_interval_s']}s, "
+                               f"{settings['images_per_min']} images/min")
+                    if st.session_state.duplicates_skipped:
+                        st.caption(f"{st.session_state.duplicates_skipped} near-duplicate images skipped so far")
+
+                    if st.session_state.current_batch < len(st.session_state.all_batches):
+                        st.button("Generate Next Batch", key="next_batch")
+                    else:
+                        st.success("All images generated!")
+
+            if st.session_state.generated_images:
+                # Links to the files on disk; reruns no longer re-send the archive (CCSUITE_FILES_PORT)
+                file_link("Download Canva CSV Template", manifest.csv_path, "canva_bulk_import.csv", "text/csv")
+                file_link("Download All Images", image_run.file("images.zip"), "images.zip", "application/zip")
+                if os.path.exists(manifest.urls_path):
+                    file_link("Download Image URLs", manifest.urls_path, "image_urls.txt", "text/plain")
+                file_link("Download Image Metadata (JSONL)", manifest.jsonl_path, "images.jsonl", "application/jsonl")
+
+                st.subheader("Generated Images")
+                cols = st.columns(3)
+                for idx, path in enumerate(st.session_state.generated_images):
+                    col = cols[idx % 3]
+                    with col:
+                        st.image(path, width=200)
+
+                # Local save option
+                save_path = st.text_input("Save directory path (optional):", "")
+                if save_path and st.button("Save Files Locally"):
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    save_dir = os.path.join(save_path, f"generation_{timestamp}")
+
+                    # Images are linked from the workspace when possible, otherwise copied in parallel
+                    save_progress = st.progress(0)
+                    stats = export_files(
+                        [(path, f"image_{idx + 1}.png") for idx, path in enumerate(st.session_state.generated_images)],
+                        save_dir,
+                        on_progress=lambda done, total: save_progress.progress(done / total)
+                    )
+                    # The manifest keeps growing, so it gets a snapshot copy rather than a link
+                    shutil.copyfile(manifest.csv_path, os.path.join(save_dir, 'canva_bulk_import.csv'))
+
+                    st.success(f"Files saved to {save_dir} ({stats['link']} linked, {stats['reflink'] + stats['copy']} copied "
+                               f"in {stats['seconds']:.2f}s)")
+
+    if st.button("Start Over"):
+        st.session_state.current_batch = 0
+        st.session_state.all_batches = []
+        st.session_state.generated_images = []
+        st.session_state.generated_urls = []
+        st.session_state.script = None
+        st.session_state.image_data = []
+        st.session_state.dup_index = DuplicateIndex()
+        st.session_state.duplicates_skipped = 0
+        st.session_state.slot_images = {}
+        session_run("image_run", new=True)
+        st.session_state.script_generated = False
+        st.rerun()
\ No newline at end of file
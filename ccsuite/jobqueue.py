@@ -0,0 +1,393 @@
+"""Job queue shared between the Streamlit front ends and worker processes.
+
+Pages enqueue() work and observe it with get()/wait(); any number of
+`python -m ccsuite.worker` processes claim and run it. Two backends share
+one interface:
+
+    sqlite:///path/to/jobs.db   durable, safe across processes on one host
+                                (or containers sharing the volume)
+    memory://                   in-process stand-in for tests and local dev
+
+open_queue() picks the backend from a URL, defaulting to CCSUITE_QUEUE.
+Credentials go in `secrets`, which is kept apart from the payload and
+erased as soon as the job finishes.
+
+A worker holds a job while its lease is live and renews it with
+heartbeat(). Once the lease runs out another worker may claim the job, so
+complete() and fail() only apply while the caller still holds it; a late
+result from the earlier worker returns False and is dropped.
+
+Besides jobs, a queue keeps short-lived notices (post_notice/get_notice):
+small JSON values one process leaves for the others, such as the Leonardo
+webhook callbacks only one process can receive (see ccsuite.webhooks).
+They are dropped NOTICE_TTL seconds after they were posted.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+DEFAULT_LEASE = 120
+NOTICE_TTL = 600
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+def _new_job(kind, payload, secrets, max_attempts, priority):
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "payload": payload,
+        "secrets": secrets or {},
+        "status": QUEUED,
+        "priority": priority,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "progress": {},
+        "result": None,
+        "error": None,
+        "worker": None,
+        "lease_until": 0.0,
+        "created": now,
+        "updated": now,
+    }
+
+
+def _public(job):
+    # Jobs handed back to pages never include credentials
+    return {k: v for k, v in job.items() if k != "secrets"}
+
+
+class MemoryQueue:
+    """Thread-safe in-process queue with the same semantics as SQLiteQueue."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._notices = {}
+        self._lock = threading.Condition()
+
+    def enqueue(self, kind, payload, secrets=None, max_attempts=3, priority=0):
+        job = _new_job(kind, payload, secrets, max_attempts, priority)
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._lock.notify_all()
+        return job["id"]
+
+    def claim(self, worker, kinds=None, lease=DEFAULT_LEASE):
+        now = time.time()
+        with self._lock:
+            candidates = [
+                job for job in self._jobs.values()
+                if (job["status"] == QUEUED or (job["status"] == RUNNING and job["lease_until"] < now))
+                and (not kinds or job["kind"] in kinds)
+            ]
+            if not candidates:
+                return None
+            job = min(candidates, key=lambda j: (-j["priority"], j["created"]))
+            job.update(status=RUNNING, worker=worker, lease_until=now + lease,
+                       attempts=job["attempts"] + 1, updated=now)
+            return dict(job)
+
+    def heartbeat(self, job_id, worker, progress=None, lease=DEFAULT_LEASE):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["worker"] != worker or job["status"] != RUNNING:
+                return False
+            job["lease_until"] = time.time() + lease
+            job["updated"] = time.time()
+            if progress is not None:
+                job["progress"] = progress
+            return True
+
+    def _held(self, job_id, worker):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFound(job_id)
+        return job if job["worker"] == worker and job["status"] == RUNNING else None
+
+    def complete(self, job_id, worker, result):
+        with self._lock:
+            job = self._held(job_id, worker)
+            if job is None:
+                return False
+            job.update(status=DONE, result=result, secrets={}, lease_until=0.0, updated=time.time())
+            self._lock.notify_all()
+            return True
+
+    def fail(self, job_id, worker, error, retry=True):
+        with self._lock:
+            job = self._held(job_id, worker)
+            if job is None:
+                return False
+            if retry and job["attempts"] < job["max_attempts"]:
+                job.update(status=QUEUED, error=str(error), worker=None, lease_until=0.0, updated=time.time())
+            else:
+                job.update(status=FAILED, error=str(error), secrets={}, lease_until=0.0, updated=time.time())
+            self._lock.notify_all()
+            return True
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job["status"] == QUEUED:
+                job.update(status=FAILED, error="Cancelled", secrets={}, updated=time.time())
+                self._lock.notify_all()
+
+    def get(self, job_id):
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobNotFound(job_id)
+            return _public(dict(self._jobs[job_id]))
+
+    def list(self, status=None, limit=100):
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if status is None or j["status"] == status]
+        jobs.sort(key=lambda j: j["created"], reverse=True)
+        return [_public(dict(j)) for j in jobs[:limit]]
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def wait(self, job_id, timeout=None, interval=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobNotFound(job_id)
+            while self._jobs[job_id]["status"] not in FINISHED:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+        return self.get(job_id)
+
+    def post_notice(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._notices[key] = (now, value)
+            for stale in [k for k, (ts, _) in self._notices.items() if now - ts > NOTICE_TTL]:
+                del self._notices[stale]
+
+    def get_notice(self, key):
+        with self._lock:
+            notice = self._notices.get(key)
+        return None if notice is None or time.time() - notice[0] > NOTICE_TTL else notice[1]
+
+
+class SQLiteQueue:
+    """Durable queue in a single SQLite file; claims are atomic across processes."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                secrets TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                progress TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created);
+            CREATE TABLE IF NOT EXISTS notices (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+        """)
+
+    def _conn(self):
+        # sqlite3 connections are per thread; autocommit so claims can use BEGIN IMMEDIATE
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(row, include_secrets=False):
+        job = dict(row)
+        for key in ("payload", "progress", "result", "secrets"):
+            if job.get(key) is not None:
+                job[key] = json.loads(job[key])
+        return job if include_secrets else _public(job)
+
+    def enqueue(self, kind, payload, secrets=None, max_attempts=3, priority=0):
+        job = _new_job(kind, payload, secrets, max_attempts, priority)
+        self._conn().execute(
+            "INSERT INTO jobs (id, kind, payload, secrets, status, priority, attempts, max_attempts, "
+            "progress, created, updated) VALUES (?, ?, ?, ?, ?, ?, 0, ?, '{}', ?, ?)",
+            (job["id"], kind, json.dumps(payload), json.dumps(job["secrets"]), QUEUED, priority,
+             max_attempts, job["created"], job["updated"])
+        )
+        return job["id"]
+
+    def claim(self, worker, kinds=None, lease=DEFAULT_LEASE):
+        conn = self._conn()
+        now = time.time()
+        kind_filter = ""
+        params = [QUEUED, RUNNING, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = ? OR (status = ? AND lease_until < ?))"
+                + kind_filter + " ORDER BY priority DESC, created LIMIT 1",
+                params
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+                "WHERE id = ?",
+                (RUNNING, worker, now + lease, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        job = self._row(row, include_secrets=True)
+        job.update(status=RUNNING, worker=worker, lease_until=now + lease, attempts=job["attempts"] + 1)
+        return job
+
+    def heartbeat(self, job_id, worker, progress=None, lease=DEFAULT_LEASE):
+        now = time.time()
+        if progress is None:
+            cursor = self._conn().execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease, now, job_id, worker, RUNNING))
+        else:
+            cursor = self._conn().execute(
+                "UPDATE jobs SET lease_until = ?, updated = ?, progress = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease, now, json.dumps(progress), job_id, worker, RUNNING))
+        return cursor.rowcount == 1
+
+    def _not_held(self, job_id):
+        # The update matched nothing: either the id is unknown or another worker holds the job now
+        if self._conn().execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+            raise JobNotFound(job_id)
+        return False
+
+    def complete(self, job_id, worker, result):
+        """Records the result; returns False (and changes nothing) if worker no longer holds the job."""
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, secrets = '{}', lease_until = 0, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (DONE, json.dumps(result), time.time(), job_id, worker, RUNNING))
+        return cursor.rowcount == 1 or self._not_held(job_id)
+
+    def fail(self, job_id, worker, error, retry=True):
+        """Requeues the job (or fails it for good); returns False if worker no longer holds it."""
+        # One statement, so the retry decision and the fence see the same row
+        cursor = self._conn().execute(
+            "UPDATE jobs SET "
+            "status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END, "
+            "worker = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE worker END, "
+            "secrets = CASE WHEN ? AND attempts < max_attempts THEN secrets ELSE '{}' END, "
+            "error = ?, lease_until = 0, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (retry, QUEUED, FAILED, retry, retry, str(error), time.time(), job_id, worker, RUNNING))
+        return cursor.rowcount == 1 or self._not_held(job_id)
+
+    def cancel(self, job_id):
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, error = 'Cancelled', secrets = '{}', updated = ? WHERE id = ? AND status = ?",
+            (FAILED, time.time(), job_id, QUEUED))
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFound(job_id)
+        return self._row(row)
+
+    def list(self, status=None, limit=100):
+        if status is None:
+            rows = self._conn().execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        else:
+            rows = self._conn().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created DESC LIMIT ?", (status, limit))
+        return [self._row(row) for row in rows]
+
+    def counts(self):
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def wait(self, job_id, timeout=None, interval=0.5):
+        # Other processes finish the job, so this can only poll the file
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job["status"] in FINISHED or (deadline is not None and time.time() >= deadline):
+                return job
+            time.sleep(interval)
+
+    def post_notice(self, key, value):
+        """Leaves value (JSON-serialisable) under key for other processes; replaces an earlier one."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO notices (key, value, created) VALUES (?, ?, ?)",
+                     (key, json.dumps(value), now))
+        conn.execute("DELETE FROM notices WHERE created < ?", (now - NOTICE_TTL,))
+
+    def get_notice(self, key):
+        """The value posted under key, or None if there is none or it expired."""
+        row = self._conn().execute("SELECT value FROM notices WHERE key = ? AND created >= ?",
+                                   (key, time.time() - NOTICE_TTL)).fetchone()
+        return None if row is None else json.loads(row["value"])
+
+
+_memory_queue = None
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def open_queue(url=None):
+    """Returns the queue for url (default CCSUITE_QUEUE), or None when no queue is configured."""
+    global _memory_queue
+    url = url or os.environ.get("CCSUITE_QUEUE")
+    if not url:
+        return None
+    with _queues_lock:
+        if url.startswith("memory://"):
+            if _memory_queue is None:
+                _memory_queue = MemoryQueue()
+            return _memory_queue
+        if url.startswith("sqlite:///"):
+            path = url[len("sqlite:///"):]
+            if path not in _queues:
+                _queues[path] = SQLiteQueue(path)
+            return _queues[path]
+    raise ValueError(f"Unsupported queue URL: {url}")
@@ -0,0 +1,302 @@
+"""Leonardo.ai client.
+
+The implementation is asyncio-native (httpx) and runs on the process-wide
+event loop from ccsuite.event_loop, so hundreds of in-flight generations
+share one thread and one connection pool. Pages can submit() coroutines and
+get futures back; the plain functions (create_image, get_images,
+wait_for_generation, generate) are blocking wrappers for threaded callers.
+
+Generations share one adaptive slot limit and poll interval per key, tuned
+from live latency and throttling by ccsuite.autotune; an explicit interval
+or max_workers still overrides it.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import as_completed
+
+import httpx
+
+from ccsuite import autotune, event_loop, metrics, webhooks
+from ccsuite.singleflight import leonardo_calls, make_key, normalize
+
+API_BASE = os.environ.get("LEONARDO_API_BASE", "https://cloud.leonardo.ai/api/rest/v1")
+MODEL_ID = "6b645e3a-d64f-4341-a6d8-7a3690fbf042"
+STYLE_UUID = "111dc692-d470-4eec-b791-3475abac4c46"
+# With the webhook receiver running, status is only polled this often, in case a callback is lost
+WEBHOOK_FALLBACK_INTERVAL = int(os.environ.get("CCSUITE_WEBHOOK_FALLBACK_INTERVAL", "30"))
+# A create answered with HTTP 429 is retried this many times, after the tuner's backoff
+CREATE_RETRIES = 5
+# How often a process without the receiver looks for callbacks relayed through the job queue
+RELAY_INTERVAL = 1.0
+
+_http = None
+
+
+class LeonardoError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _error(message, e, api_key):
+    status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+    if status_code == 429:
+        autotune.tuner_for(api_key).throttled()
+    return LeonardoError(f"{message}: {e}", status_code)
+
+
+def _client():
+    # Created lazily on the loop thread; shared by every request in the process
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _http
+
+
+def _headers(api_key, json_body=False):
+    headers = {
+        "accept": "application/json",
+        "authorization": f"Bearer {api_key}"
+    }
+    if json_body:
+        headers["content-type"] = "application/json"
+    return headers
+
+
+async def create_image_async(prompt, api_key, num_images=2):
+    payload = {
+        "width": 1472,
+        "height": 832,
+        "modelId": MODEL_ID,
+        "num_images": num_images,
+        "prompt": prompt,
+        "ultra": False,
+        "styleUUID": STYLE_UUID,
+        "enhancePrompt": False
+    }
+    try:
+        with metrics.span("leonardo.create"):
+            response = await _client().post(f"{API_BASE}/generations", json=payload,
+                                            headers=_headers(api_key, json_body=True))
+            response.raise_for_status()
+            result = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise _error("Error creating image", e, api_key) from e
+
+    if 'sdGenerationJob' not in result:
+        raise LeonardoError(f"Error creating image: {result.get('error', 'Unknown error')}")
+    metrics.record_leonardo_credits(result)
+    return result
+
+
+async def get_images_async(generation_id, api_key):
+    try:
+        with metrics.span("leonardo.status"):
+            response = await _client().get(f"{API_BASE}/generations/{generation_id}", headers=_headers(api_key))
+            response.raise_for_status()
+            return response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise _error("Error getting images", e, api_key) from e
+
+
+async def wait_for_generation_async(generation_id, api_key, timeout=60, interval=None):
+    # Wait until the generation is COMPLETE and return its image dicts; interval=None polls at the tuned rate
+    with metrics.span("leonardo.wait"):
+        if webhooks.start_receiver():
+            return await _wait_for_callback(generation_id, api_key, timeout)
+        if webhooks.relay_active():
+            return await _wait_for_callback(generation_id, api_key, timeout, relayed=True)
+        return await _poll(generation_id, api_key, timeout, interval)
+
+
+def _check_status(generation_id, status):
+    generation = status.get('generations_by_pk') or {}
+    if generation.get('status') == 'COMPLETE':
+        return generation.get('generated_images', [])
+    if generation.get('status') == 'FAILED':
+        raise LeonardoError(f"Generation {generation_id} failed")
+    return None
+
+
+async def _poll(generation_id, api_key, timeout, interval):
+    tuner = autotune.tuner_for(api_key)
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        try:
+            images = _check_status(generation_id, await get_images_async(generation_id, api_key))
+        except LeonardoError as e:
+            # A throttled status check is retried after the (now longer) interval
+            if e.status_code != 429:
+                raise
+            images = None
+        if images is not None:
+            return images
+        await asyncio.sleep(interval or tuner.poll_interval)
+    raise LeonardoError(f"Generation {generation_id} timed out after {timeout}s")
+
+
+async def _wait_for_callback(generation_id, api_key, timeout, relayed=False):
+    # relayed: another process owns the receiver, so its callbacks are read from the job queue
+    loop = asyncio.get_running_loop()
+    notifications = asyncio.Queue()
+    if not relayed:
+        webhooks.subscribe(generation_id, lambda status, images: loop.call_soon_threadsafe(
+            notifications.put_nowait, (status, images)))
+    deadline = time.time() + timeout
+    next_check = time.time() + WEBHOOK_FALLBACK_INTERVAL
+    try:
+        while True:
+            now = time.time()
+            if now < min(next_check, deadline):
+                wait = min(next_check, deadline) - now
+                if relayed:
+                    await asyncio.sleep(min(RELAY_INTERVAL, wait))
+                    notification = await asyncio.to_thread(webhooks.relayed, generation_id)
+                else:
+                    try:
+                        notification = await asyncio.wait_for(notifications.get(), wait)
+                    except asyncio.TimeoutError:
+                        notification = None
+                if notification is not None:
+                    status, images = notification
+                    if status == 'FAILED':
+                        raise LeonardoError(f"Generation {generation_id} failed")
+                    if status == 'COMPLETE' and images:
+                        return images
+                continue
+            # Fallback status request in case the callback was lost; always made once more before timing out
+            try:
+                images = _check_status(generation_id, await get_images_async(generation_id, api_key))
+            except LeonardoError as e:
+                if e.status_code != 429:
+                    raise
+                images = None
+            if images is not None:
+                return images
+            if time.time() >= deadline:
+                raise LeonardoError(f"Generation {generation_id} timed out after {timeout}s")
+            next_check = time.time() + WEBHOOK_FALLBACK_INTERVAL
+    finally:
+        if not relayed:
+            webhooks.forget(generation_id)
+
+
+async def generate_async(prompt, api_key, num_images=2, timeout=60, interval=None, variant=None):
+    """Creates a generation and waits for its images.
+
+    An identical request already in flight (same prompt, key, image count and
+    variant) is joined instead of submitted again. Callers that want distinct
+    images for the same prompt pass a different variant per slot.
+    """
+    key = make_key(normalize(prompt), api_key, num_images, MODEL_ID, STYLE_UUID, variant)
+    return await leonardo_calls.do_async(
+        key, lambda: _generate_async(prompt, api_key, num_images, timeout, interval))
+
+
+async def _generate_async(prompt, api_key, num_images, timeout, interval):
+    tuner = autotune.tuner_for(api_key)
+    attempt = 0
+    while True:
+        queued = await tuner.acquire()
+        start = time.monotonic()
+        generation_id = None
+        try:
+            result = await create_image_async(prompt, api_key, num_images=num_images)
+            generation_id = result['sdGenerationJob']['generationId']
+            images = await wait_for_generation_async(generation_id, api_key, timeout=timeout, interval=interval)
+        except LeonardoError as e:
+            if e.status_code != 429:
+                tuner.release(queued, time.monotonic() - start, error="error")
+                raise
+            # tuner.throttled() already counted the 429; the slot is freed for the backoff
+            tuner.release(queued)
+            if generation_id is not None or attempt >= CREATE_RETRIES:
+                raise
+            attempt += 1
+            metrics.inc("ccsuite_leonardo_create_retries_total")
+            await asyncio.sleep(tuner.backoff(attempt))
+            continue
+        except BaseException:
+            tuner.release(queued)
+            raise
+        tuner.release(queued, time.monotonic() - start, images=len(images))
+        return {"prompt": prompt, "generation_id": generation_id, "images": images}
+
+
+def submit(coro):
+    """Runs a coroutine from this module on the shared loop and returns a Future."""
+    return event_loop.submit(coro)
+
+
+# Blocking wrappers for thread-based callers (pipeline stages, batch workers)
+
+def create_image(prompt, api_key, num_images=2):
+    return event_loop.run(create_image_async(prompt, api_key, num_images=num_images))
+
+
+def get_images(generation_id, api_key):
+    return event_loop.run(get_images_async(generation_id, api_key))
+
+
+def wait_for_generation(generation_id, api_key, timeout=60, interval=None):
+    return event_loop.run(wait_for_generation_async(generation_id, api_key, timeout=timeout, interval=interval))
+
+
+def generate(prompt, api_key, num_images=2, timeout=60, interval=None):
+    return event_loop.run(generate_async(prompt, api_key, num_images=num_images, timeout=timeout, interval=interval))
+
+
+class SubmissionQueue:
+    """Submits prompts to Leonardo as they arrive; generations run on the shared event loop.
+
+    max_workers caps how many generations this queue keeps in flight at once;
+    with None, only the key's tuned process-wide limit applies.
+    Each submit() returns a Future resolving to the dict returned by generate().
+    """
+
+    def __init__(self, api_key, max_workers=None, num_images=2, timeout=60, interval=None):
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.num_images = num_images
+        self.timeout = timeout
+        self.interval = interval
+        self.futures = []
+        self._semaphore = None
+
+    async def _limited(self, prompt):
+        if self.max_workers is None:
+            return await generate_async(prompt, self.api_key, self.num_images, self.timeout, self.interval)
+        # Semaphore is created on the loop thread so it binds to the shared loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            return await generate_async(prompt, self.api_key, self.num_images, self.timeout, self.interval)
+
+    def submit(self, prompt):
+        future = submit(self._limited(prompt))
+        self.futures.append(future)
+        return future
+
+    def as_completed(self):
+        return as_completed(list(self.futures))
+
+    def close(self, wait=True):
+        if wait:
+            for future in list(self.futures):
+                try:
+                    future.result()
+                except Exception:
+                    pass
+        else:
+            for future in self.futures:
+                future.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(wait=exc[0] is None)
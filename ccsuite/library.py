@@ -0,0 +1,241 @@
+"""Local library of generated content with full-text search.
+
+Every run of the content pages (script, image prompts, thumbnail ideas,
+titles, description) is recorded in one SQLite file with its topic, style,
+duration, the model behind each artifact and when it was made:
+
+    runs       one row per generated video
+    artifacts  one row per text artifact of a run
+    search     FTS5 index over topic, style and artifact text (porter
+               stemming), kept in step with artifacts on every insert
+    topics     FTS5 index over each run's topic and style
+
+search() ranks artifacts by bm25, similar_runs() finds past runs whose topic
+and style are closest to a new one (so a video can start from an earlier
+script instead of a fresh generation), and diff() compares an artifact
+across two runs.
+
+The file is CCSUITE_LIBRARY if set, otherwise ~/.ccsuite/library.db;
+CCSUITE_LIBRARY=off disables recording.
+
+The library is shared by every user of a deployment, so the Library page only
+deletes runs the current browser session recorded (remember_runs() keeps
+their ids in session state); CCSUITE_ADMIN_TOKEN, once entered, allows
+deleting any run.
+"""
+import difflib
+import hmac
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+# Artifact fields of a content result, in the order pages show them
+KINDS = ("script", "image_prompts", "thumbnails", "titles", "description")
+# Session state key holding the ids of runs this browser session recorded
+OWNED_KEY = "library_owned_runs"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def match_query(text, prefix=True, any_term=False):
+    """FTS5 query for free text: each word quoted (so user input is never FTS syntax), the last one as a prefix."""
+    terms = _TOKEN.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if prefix:
+        quoted[-1] += "*"
+    return (" OR " if any_term else " ").join(quoted)
+
+
+def _lines(text):
+    # Every line newline-terminated, so the last lines of the two sides never run together
+    return [line + "\n" for line in (text or "").splitlines()]
+
+
+class ContentLibrary:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                style TEXT NOT NULL DEFAULT '',
+                duration REAL,
+                source TEXT,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_created ON runs (created DESC);
+            CREATE TABLE IF NOT EXISTS artifacts (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+                kind TEXT NOT NULL,
+                model TEXT,
+                content TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id, kind);
+            CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+                topic, style, kind UNINDEXED, content, tokenize = 'porter unicode61'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS topics USING fts5(topic, style, tokenize = 'porter unicode61');
+        """)
+
+    def _conn(self):
+        # Connections are per thread, as in jobqueue.SQLiteQueue
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def record(self, result, source=None, models=None):
+        """Stores a content result ({"topic", "style", "duration", *KINDS}); returns the new run id."""
+        return self.record_many([result], source=source, models=models)[0]
+
+    def record_many(self, results, source=None, models=None):
+        """record() for many results in one transaction.
+
+        models maps kind to model name; a result's own "models" entry takes precedence.
+        """
+        conn = self._conn()
+        run_ids = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for result in results:
+                run_id = uuid.uuid4().hex
+                now = time.time()
+                topic, style = result["topic"], result.get("style") or ""
+                cursor = conn.execute(
+                    "INSERT INTO runs (id, topic, style, duration, source, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, topic, style, result.get("duration"), source, now))
+                conn.execute("INSERT INTO topics (rowid, topic, style) VALUES (?, ?, ?)",
+                             (cursor.lastrowid, topic, style))
+                for kind in KINDS:
+                    content = result.get(kind)
+                    if not content:
+                        continue
+                    cursor = conn.execute(
+                        "INSERT INTO artifacts (run_id, kind, model, content, created) VALUES (?, ?, ?, ?, ?)",
+                        (run_id, kind, (result.get("models") or models or {}).get(kind), content, now))
+                    conn.execute("INSERT INTO search (rowid, topic, style, kind, content) VALUES (?, ?, ?, ?, ?)",
+                                 (cursor.lastrowid, topic, style, kind, content))
+                run_ids.append(run_id)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return run_ids
+
+    def search(self, text, kind=None, limit=20):
+        """Best matching artifacts for free text, each with a highlighted snippet."""
+        query = match_query(text)
+        if query is None:
+            return []
+        kind_filter = " AND a.kind = ?" if kind else ""
+        params = [query] + ([kind] if kind else []) + [limit]
+        rows = self._conn().execute(
+            "SELECT a.run_id, r.topic, r.style, a.kind, a.model, r.created, "
+            "snippet(search, 3, '**', '**', ' … ', 16) AS snippet, bm25(search) AS score "
+            "FROM search JOIN artifacts a ON a.id = search.rowid JOIN runs r ON r.id = a.run_id "
+            "WHERE search MATCH ?" + kind_filter + " ORDER BY score LIMIT ?",
+            params)
+        return [dict(row) for row in rows]
+
+    def similar_runs(self, topic, style="", limit=5):
+        """Past runs closest to a topic (and style), best first."""
+        query = match_query(f"{topic} {style}", prefix=False, any_term=True)
+        if query is None:
+            return []
+        # bm25 weighs topic words three times as much as style words
+        rows = self._conn().execute(
+            "SELECT r.id AS run_id, r.topic, r.style, r.duration, r.created, bm25(topics, 3.0, 1.0) AS score "
+            "FROM topics JOIN runs r ON r.rowid = topics.rowid WHERE topics MATCH ? ORDER BY score LIMIT ?",
+            (query, limit))
+        return [dict(row) for row in rows]
+
+    def get_run(self, run_id):
+        """The run's fields plus one key per stored artifact kind, or None."""
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run["models"] = {}
+        for artifact in conn.execute("SELECT kind, model, content FROM artifacts WHERE run_id = ?", (run_id,)):
+            run[artifact["kind"]] = artifact["content"]
+            run["models"][artifact["kind"]] = artifact["model"]
+        return run
+
+    def recent(self, limit=20):
+        rows = self._conn().execute("SELECT * FROM runs ORDER BY created DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def delete_run(self, run_id):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM search WHERE rowid IN (SELECT id FROM artifacts WHERE run_id = ?)", (run_id,))
+            conn.execute("DELETE FROM topics WHERE rowid = (SELECT rowid FROM runs WHERE id = ?)", (run_id,))
+            conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def diff(self, run_a, run_b, kind="script", context=3):
+        """Unified diff of one artifact between two runs ("" when identical or missing in both)."""
+        a, b = self.get_run(run_a) or {}, self.get_run(run_b) or {}
+        return "".join(difflib.unified_diff(
+            _lines(a.get(kind)), _lines(b.get(kind)),
+            fromfile=f"{a.get('topic', run_a)} ({run_a[:8]})", tofile=f"{b.get('topic', run_b)} ({run_b[:8]})",
+            n=context))
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+def default_path():
+    return os.environ.get("CCSUITE_LIBRARY") or os.path.join(os.path.expanduser("~"), ".ccsuite", "library.db")
+
+
+def remember_runs(run_ids):
+    """Marks runs as recorded by the current browser session, so its Library page may delete them."""
+    import streamlit as st
+
+    owned = st.session_state.get(OWNED_KEY) or set()
+    st.session_state[OWNED_KEY] = owned | set(run_ids)
+    return run_ids
+
+
+def can_delete(run_id, owned_runs, admin_token=None):
+    """Whether a session that recorded owned_runs may delete run_id; the admin token unlocks every run."""
+    expected = os.environ.get("CCSUITE_ADMIN_TOKEN")
+    if expected and admin_token and hmac.compare_digest(admin_token, expected):
+        return True
+    return run_id in (owned_runs or ())
+
+
+def open_library(path=None):
+    """The library at path (default CCSUITE_LIBRARY or ~/.ccsuite/library.db), or None when it is switched off."""
+    path = path or default_path()
+    if path.lower() == "off":
+        return None
+    with _libraries_lock:
+        if path not in _libraries:
+            _libraries[path] = ContentLibrary(path)
+        return _libraries[path]
@@ -0,0 +1,31 @@
+"""The one instrumented, coalesced path for non-streaming chat completions.
+
+Every non-streaming completion (content, longform, image_suite, the blueprint
+recommendation) goes through chat(); identical completions already in
+flight (another tab, another batch worker) are joined rather than repeated,
+see ccsuite.singleflight.
+"""
+from ccsuite import metrics
+from ccsuite.singleflight import make_key, normalize, openai_calls
+
+
+def chat(client, stage, model, prompt, max_tokens, system=None, **options):
+    """The message content of one completion; system is an optional system message, and options
+    (e.g. response_format) go to the API as-is."""
+    key = make_key(getattr(client, "api_key", None), model, system, normalize(prompt), max_tokens, options)
+    return openai_calls.do(key, _complete, client, stage, model, prompt, max_tokens, system, **options)
+
+
+def _complete(client, stage, model, prompt, max_tokens, system=None, **options):
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    with metrics.span("openai.chat", stage=stage):
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            **options
+        )
+    metrics.record_openai_usage(getattr(response, "usage", None), stage, model)
+    return response.choices[0].message.content
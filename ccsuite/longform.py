@@ -0,0 +1,153 @@
+"""Long-form scripts: an outline first, then every section in parallel.
+
+A single completion capped at 1500 tokens cannot hold a 7-10 minute script
+(~150 spoken words per minute), and decoding it is one long sequential
+wait. Here one small structured call plans the video (headings, key points
+and a style brief shared by every section), the timeline is split so the
+sections add up to exactly the requested duration, and each section is
+written by its own concurrent call sized to its share of the word count.
+Wall time then tracks the longest section rather than the whole script.
+
+The stitched script uses the "[mm:ss-mm:ss] Heading" markers of
+generated_content.txt, so parse_script() and every later stage read it the
+same way as a single-call script. It carries no closing "[End]" line; one a
+section writer adds anyway is dropped, so it is never narrated or shown.
+"""
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+
+from ccsuite import metrics
+from ccsuite.llm import chat
+
+# Durations from this many minutes up no longer fit one 1500-token completion
+LONG_FORM_MINUTES = 7
+WORDS_PER_MINUTE = 150
+INTRO_SECONDS = 30
+OUTRO_SECONDS = 30
+END_MARKER = re.compile(r"\s*\[End\]\s*$", re.IGNORECASE)
+
+OUTLINE_SCHEMA = {
+    "name": "script_outline",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "style_brief": {"type": "string"},
+            "sections": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "heading": {"type": "string"},
+                        "key_points": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["heading", "key_points"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["style_brief", "sections"],
+        "additionalProperties": False
+    }
+}
+
+
+def _timestamp(seconds):
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def main_section_count(duration):
+    # Roughly one main section per minute between the intro and the outro
+    return max(2, round(duration - (INTRO_SECONDS + OUTRO_SECONDS) / 60))
+
+
+def plan_timeline(headings, duration):
+    """Start/end seconds for each heading: fixed intro and outro, the rest split evenly."""
+    total = int(duration * 60)
+    middle = len(headings) - 2
+    intro = min(INTRO_SECONDS, total // 4)
+    outro = min(OUTRO_SECONDS, total // 4)
+    bounds = [0, intro]
+    for i in range(1, middle + 1):
+        bounds.append(intro + (total - intro - outro) * i // middle)
+    bounds.append(total)
+    return [(heading, bounds[i], bounds[i + 1]) for i, heading in enumerate(headings)]
+
+
+def generate_outline(topic, duration, style, client=None, model="gpt-4o"):
+    client = client or openai
+    sections = main_section_count(duration)
+    prompt = (
+        f"You are planning a {duration}-minute YouTube video script.\n"
+        f"- Topic: {topic}\n"
+        f"- Style: {style}\n"
+        f"Return an outline with exactly {sections + 2} sections: an introduction, {sections} main sections and a conclusion. "
+        "Give each section a short heading and 2-4 key points (facts, examples or questions it must cover), "
+        "with no overlap between sections.\n"
+        "Also write a style brief of 2-3 sentences describing tone, vocabulary and how the host addresses viewers, "
+        "so separate writers can keep one consistent voice."
+    )
+    content = chat(client, "outline", model, prompt, 800,
+                   response_format={"type": "json_schema", "json_schema": OUTLINE_SCHEMA})
+    outline = json.loads(content)
+    if len(outline["sections"]) < 3:
+        raise ValueError(f"Outline for '{topic}' has only {len(outline['sections'])} sections")
+    return outline
+
+
+def generate_section(topic, outline, index, start, end, client=None, model="gpt-4o"):
+    client = client or openai
+    sections = outline["sections"]
+    section = sections[index]
+    words = max(40, (end - start) * WORDS_PER_MINUTE // 60)
+    if index == 0:
+        position = "This is the introduction: hook the viewer and say what the video covers."
+    elif index == len(sections) - 1:
+        position = "This is the conclusion: wrap up and end with a call to subscribe."
+    else:
+        position = f"It follows '{sections[index - 1]['heading']}' and leads into '{sections[index + 1]['heading']}'."
+    prompt = (
+        f"You are a professional scriptwriter for a YouTube video about '{topic}'.\n"
+        f"Style brief: {outline['style_brief']}\n"
+        f"Video outline: {' | '.join(s['heading'] for s in sections)}\n"
+        f"Write only the section '{section['heading']}'. {position}\n"
+        f"Cover: {'; '.join(section['key_points'])}\n"
+        f"Length: about {words} words of narration at a normal speaking pace.\n"
+        "Start with one visual cue in parentheses on its own line, e.g. (Host on Screen), then the narration. "
+        "No heading, timestamps or notes."
+    )
+    # ~1.4 tokens per word plus headroom so the section is never cut off
+    text = chat(client, "section", model, prompt, words * 2 + 100)
+    return f"[{_timestamp(start)}-{_timestamp(end)}] {section['heading']}\n\n{END_MARKER.sub('', text.strip())}"
+
+
+def stream_long_script(topic, duration, style, client=None, model="gpt-4o", workers=8):
+    """Yields (index, total, section_text) as each section finishes, after planning the outline."""
+    outline = generate_outline(topic, duration, style, client=client, model=model)
+    timeline = plan_timeline([s["heading"] for s in outline["sections"]], duration)
+    executor = ThreadPoolExecutor(max_workers=min(workers, len(timeline)), thread_name_prefix="section")
+    try:
+        futures = {
+            executor.submit(generate_section, topic, outline, i, start, end, client=client, model=model): i
+            for i, (_, start, end) in enumerate(timeline)
+        }
+        for future in as_completed(futures):
+            yield futures[future], len(timeline), future.result()
+    finally:
+        # A failed section (or a caller that stops early) drops the sections not yet started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def generate_long_script(topic, duration, style, client=None, model="gpt-4o", workers=8, on_section=None):
+    """The full script, sections stitched in order; on_section(index, total, text) runs as each one completes."""
+    with metrics.span("longform.script", duration=str(duration)):
+        sections = {}
+        for index, total, text in stream_long_script(topic, duration, style, client=client, model=model,
+                                                     workers=workers):
+            sections[index] = text
+            if on_section:
+                on_section(index, total, text)
+    return "\n\n".join([topic] + [sections[i] for i in sorted(sections)])
@@ -0,0 +1,72 @@
+"""Append-only manifests for generated images.
+
+Each image is recorded once, as it is produced, into three files in the
+run directory:
+
+    canva_bulk_import.csv   Image,Caption rows for Canva's bulk import
+    images.jsonl            one JSON object per image with its metadata
+    image_urls.txt          one source URL per line
+
+Downloads are served straight from these files, so a rerun never rebuilds
+them and recording an image costs one appended line per file.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+CSV_NAME = "canva_bulk_import.csv"
+JSONL_NAME = "images.jsonl"
+URLS_NAME = "image_urls.txt"
+CSV_HEADER = ["Image", "Caption"]
+
+
+def prompt_hash(prompt):
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12] if prompt else None
+
+
+class Manifest:
+    def __init__(self, directory):
+        self.directory = directory
+        self.csv_path = os.path.join(directory, CSV_NAME)
+        self.jsonl_path = os.path.join(directory, JSONL_NAME)
+        self.urls_path = os.path.join(directory, URLS_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, filename, caption, url=None, prompt=None, **metadata):
+        """Appends one image; extra keyword arguments (generation_id, sha256, timings...) go to the JSONL."""
+        record = dict(metadata, image=filename, caption=caption, url=url,
+                      prompt_hash=prompt_hash(prompt), recorded_at=round(time.time(), 3))
+        row = io.StringIO()
+        csv.writer(row).writerow([filename, caption])
+        with self._lock:
+            # Each line goes out in one write so a crash never leaves half a row behind
+            new_csv = not os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                if new_csv:
+                    csv.writer(f).writerow(CSV_HEADER)
+                f.write(row.getvalue())
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            if url:
+                with open(self.urls_path, "a", encoding="utf-8") as f:
+                    f.write(url + "\n")
+        return record
+
+    def records(self):
+        if not os.path.exists(self.jsonl_path):
+            return
+        with open(self.jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self):
+        if not os.path.exists(self.jsonl_path):
+            return 0
+        with open(self.jsonl_path, "rb") as f:
+            return sum(1 for _ in f)
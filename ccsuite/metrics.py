@@ -0,0 +1,299 @@
+"""Process-wide timing spans, counters and cache statistics.
+
+Everything recorded here is shared by all sessions in the Streamlit process,
+which is what capacity planning needs. Metrics can be read three ways:
+snapshot() for the sidebar debug panel, render_prometheus() / the optional
+HTTP endpoint for scraping, and a JSONL event log when CCSUITE_METRICS_LOG
+points at a file.
+
+The endpoint listens on 127.0.0.1 unless CCSUITE_METRICS_HOST names another
+interface (e.g. 0.0.0.0 for a scraper on another host). Log lines are
+appended by one writer thread, so an instrumented call never waits on the
+disk.
+"""
+import atexit
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) for the span latency histogram
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_server = None
+_log_queue = queue.SimpleQueue()
+_log_writer = None
+
+
+def _reset_after_fork():
+    # The writer thread does not survive a fork; the child starts its own on first use
+    global _log_queue, _log_writer
+    _log_queue = queue.SimpleQueue()
+    _log_writer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _log(kind, name, value, labels):
+    path = os.environ.get("CCSUITE_METRICS_LOG")
+    if not path:
+        return
+    entry = {"ts": round(time.time(), 3), "kind": kind, "name": name, "value": value}
+    entry.update(labels)
+    _log_queue.put((path, json.dumps(entry, default=str) + "\n"))
+    if _log_writer is None:
+        _start_log_writer()
+
+
+def _start_log_writer():
+    global _log_writer
+    with _lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_write_log, name="metrics-log", daemon=True)
+            _log_writer.start()
+
+
+def _append(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def _write_log():
+    log_queue = _log_queue
+    while True:
+        # Everything queued meanwhile goes out in one write per file; flush_log() queues (None, event)
+        batch, flushed = {}, []
+        item = log_queue.get()
+        while True:
+            path, line = item
+            if path is None:
+                flushed.append(line)
+            else:
+                batch.setdefault(path, []).append(line)
+            try:
+                item = log_queue.get_nowait()
+            except queue.Empty:
+                break
+        for path, lines in batch.items():
+            try:
+                _append(path, lines)
+            except OSError:
+                pass
+        for event in flushed:
+            event.set()
+
+
+def flush_log(timeout=5.0):
+    """Waits (up to timeout seconds) until log lines queued so far are written."""
+    if _log_writer is None:
+        return
+    written = threading.Event()
+    _log_queue.put((None, written))
+    written.wait(timeout)
+
+
+atexit.register(flush_log)
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    _log("counter", name, value, labels)
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+        hist["count"] += 1
+        hist["sum"] += seconds
+        hist["max"] = max(hist["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+    _log("span", name, round(seconds, 4), labels)
+
+
+@contextmanager
+def span(name, **labels):
+    # Times the enclosed block; failures are counted with an error label
+    start_time = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        observe("ccsuite_span_seconds", time.perf_counter() - start_time, span=name, status=status, **labels)
+
+
+def record_openai_usage(usage, stage, model=None):
+    # usage is the `usage` object of a chat completion (or the final streamed chunk)
+    if usage is None:
+        return
+    labels = {"stage": stage, "model": model or "unknown"}
+    inc("ccsuite_openai_prompt_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, **labels)
+    inc("ccsuite_openai_completion_tokens_total", getattr(usage, "completion_tokens", 0) or 0, **labels)
+
+
+def record_leonardo_credits(result):
+    job = (result or {}).get("sdGenerationJob") or {}
+    cost = job.get("apiCreditCost")
+    if cost is not None:
+        inc("ccsuite_leonardo_credits_total", cost)
+
+
+def record_cache(cache, hit):
+    inc("ccsuite_cache_lookups_total", cache=cache)
+    if hit:
+        inc("ccsuite_cache_hits_total", cache=cache)
+
+
+def cached(cache_decorator, cache):
+    """Wraps a caching decorator such as st.cache_data so its hit rate is tracked.
+
+    A call counts as a hit when the cached body did not run.
+    """
+    def decorate(fn):
+        local = threading.local()
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            local.missed = True
+            return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def lookup(*args, **kwargs):
+            local.missed = False
+            result = cached_fn(*args, **kwargs)
+            record_cache(cache, hit=not local.missed)
+            return result
+
+        return lookup
+    return decorate
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(value, buckets=list(value["buckets"])) for key, value in _histograms.items()}
+    return counters, histograms
+
+
+def span_summary():
+    # Rows for the debug panel: one per span name, slowest total first
+    _, histograms = snapshot()
+    rows = {}
+    for (name, labels), hist in histograms.items():
+        span_name = dict(labels).get("span", name)
+        row = rows.setdefault(span_name, {"span": span_name, "count": 0, "total_s": 0.0, "max_s": 0.0, "errors": 0})
+        row["count"] += hist["count"]
+        row["total_s"] += hist["sum"]
+        row["max_s"] = max(row["max_s"], hist["max"])
+        if dict(labels).get("status") == "error":
+            row["errors"] += hist["count"]
+    for row in rows.values():
+        row["avg_s"] = row["total_s"] / row["count"] if row["count"] else 0.0
+    return sorted(rows.values(), key=lambda row: row["total_s"], reverse=True)
+
+
+def cache_hit_rates():
+    counters, _ = snapshot()
+    rates = {}
+    for (name, labels), value in counters.items():
+        if name == "ccsuite_cache_lookups_total":
+            cache = dict(labels)["cache"]
+            hits = counters.get(("ccsuite_cache_hits_total", labels), 0)
+            rates[cache] = (hits, value)
+    return rates
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    pairs = []
+    for k, v in items:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{k}="{v}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus():
+    counters, histograms = snapshot()
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in zip(BUCKETS, hist["buckets"]):
+                lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port=None, host=None):
+    """Serves /metrics in Prometheus text format; safe to call on every rerun.
+
+    The port defaults to CCSUITE_METRICS_PORT; nothing is started if neither is set.
+    The host defaults to CCSUITE_METRICS_HOST, or 127.0.0.1.
+    """
+    global _server
+    port = port or os.environ.get("CCSUITE_METRICS_PORT")
+    if not port:
+        return None
+    host = host or os.environ.get("CCSUITE_METRICS_HOST") or "127.0.0.1"
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -0,0 +1,204 @@
+"""Perceptual fingerprints and a near-duplicate index for generated images.
+
+Every image is reduced to two 64-bit hashes:
+
+    dHash   sign of the horizontal gradient of a 9x8 grayscale thumbnail
+    pHash   sign of the 8x8 lowest DCT frequencies of a 32x32 thumbnail,
+            relative to their median
+
+Both are computed for a whole stack of thumbnails at once with NumPy (the
+DCT is two matrix products), so hashing is dominated by decoding the files.
+Two images are near-duplicates when both hashes differ in at most
+`threshold` bits. DuplicateIndex keeps the hashes in flat uint64 columns and
+compares each chunk of new images against all of them with one vectorized
+XOR + popcount, so indexing thousands of images takes a fraction of a second.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 8
+# Fingerprints compared against the index per vectorized step in add_many()
+CHUNK = 512
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+_BIT_WEIGHTS = (1 << np.arange(63, -1, -1, dtype=np.uint64)).astype(np.uint64)
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(values):
+        return np.bitwise_count(values)
+else:  # NumPy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        return _POP8[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+
+
+def _pack(bits):
+    # (N, 64) booleans -> (N,) uint64, most significant bit first
+    return (bits.reshape(len(bits), 64).astype(np.uint64) * _BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+
+
+def dhash(gray):
+    """dHash of a stack of (N, 8, 9) grayscale arrays."""
+    gray = np.asarray(gray, dtype=np.int16)
+    return _pack(gray[:, :, 1:] > gray[:, :, :-1])
+
+
+def phash(gray):
+    """pHash of a stack of (N, 32, 32) grayscale arrays."""
+    gray = np.asarray(gray, dtype=np.float64)
+    low = (_DCT @ gray @ _DCT.T)[:, :_HASH_SIZE, :_HASH_SIZE].reshape(len(gray), -1)
+    # The DC term only measures brightness, so it is left out of the median
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack(low > median)
+
+
+def _thumbnail(image, size):
+    from PIL import Image
+
+    # reducing_gap lets Pillow shrink large images by integer factors before resampling
+    return np.asarray(image.convert("L").resize(size, Image.BILINEAR, reducing_gap=2.0))
+
+
+def _thumbnails(image):
+    from PIL import Image
+
+    if isinstance(image, Image.Image):
+        return _thumbnail(image, (_HASH_SIZE + 1, _HASH_SIZE)), _thumbnail(image, (_DCT_SIZE, _DCT_SIZE))
+    with Image.open(image) as img:
+        img.draft("L", (_DCT_SIZE * 2, _DCT_SIZE * 2))  # JPEG decodes straight to a small size
+        return _thumbnail(img, (_HASH_SIZE + 1, _HASH_SIZE)), _thumbnail(img, (_DCT_SIZE, _DCT_SIZE))
+
+
+def fingerprint(images, workers=4):
+    """(N, 2) uint64 array of [dHash, pHash] for PIL images or file paths.
+
+    Files are decoded on `workers` threads; Pillow releases the GIL while decoding.
+    """
+    images = list(images)
+    if not images:
+        return np.empty((0, 2), dtype=np.uint64)
+    if workers > 1 and len(images) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phash") as executor:
+            thumbs = list(executor.map(_thumbnails, images))
+    else:
+        thumbs = [_thumbnails(image) for image in images]
+    small, large = zip(*thumbs)
+    return np.stack([dhash(np.stack(small)), phash(np.stack(large))], axis=1)
+
+
+def hamming(a, b):
+    """Bitwise distance between uint64 hashes; broadcasts like any NumPy operation."""
+    return _popcount(np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64)))
+
+
+def _distances(stored, fps):
+    # (len(fps), N) worst of the dHash and pHash distances; stored is (2, N), one row per hash
+    return np.maximum(hamming(stored[0][None], fps[:, 0, None]), hamming(stored[1][None], fps[:, 1, None]))
+
+
+class DuplicateIndex:
+    """Clusters fingerprints as they arrive; each new image joins the cluster of its nearest match."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.keys = []
+        self._hashes = np.empty((2, 0), dtype=np.uint64)
+        self._clusters = np.empty(0, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def nearest(self, fp):
+        """(index, distance) of the closest stored image, or (None, None) when the index is empty."""
+        if not self._size:
+            return None, None
+        distances = _distances(self._hashes[:, :self._size], np.asarray(fp, dtype=np.uint64).reshape(1, 2))[0]
+        index = int(distances.argmin())
+        return index, int(distances[index])
+
+    def add(self, key, fp):
+        """Stores fp under key and returns the key it duplicates, or None if it is new."""
+        return self.add_many([key], [fp])[0]
+
+    def add_many(self, keys, fps):
+        """add() for many fingerprints, comparing each chunk against the index in one step."""
+        fps = np.asarray(fps, dtype=np.uint64).reshape(-1, 2)
+        keys = list(keys)
+        self._reserve(self._size + len(fps))
+        duplicates = []
+        for start in range(0, len(fps), CHUNK):
+            chunk = fps[start:start + CHUNK]
+            base = self._size
+            # Nearest match among everything already stored and among earlier members of the chunk
+            within = _distances(chunk.T, chunk).astype(np.int16)
+            within[np.triu_indices(len(chunk))] = 64 + 1
+            nearest = within.argmin(axis=1) + base
+            distance = within.min(axis=1)
+            if base:
+                to_index = _distances(self._hashes[:, :base], chunk)
+                stored = to_index.argmin(axis=1)
+                stored_distance = to_index.min(axis=1)
+                closer = stored_distance <= distance
+                nearest = np.where(closer, stored, nearest)
+                distance = np.where(closer, stored_distance, distance)
+
+            self._hashes[:, base:base + len(chunk)] = chunk.T
+            clusters = self._clusters
+            for i, (index, dist) in enumerate(zip(nearest.tolist(), distance.tolist())):
+                duplicate = dist <= self.threshold
+                # An earlier member of this chunk already has its cluster by now
+                clusters[base + i] = clusters[index] if duplicate else base + i
+                self.keys.append(keys[start + i])
+                duplicates.append(self.keys[index] if duplicate else None)
+            self._size += len(chunk)
+        return duplicates
+
+    def _reserve(self, size):
+        if size <= self._hashes.shape[1]:
+            return
+        # Grow geometrically so appending thousands of images stays linear
+        capacity = max(64, size, self._hashes.shape[1] * 2)
+        hashes = np.zeros((2, capacity), dtype=np.uint64)
+        clusters = np.zeros(capacity, dtype=np.int64)
+        hashes[:, :self._size] = self._hashes[:, :self._size]
+        clusters[:self._size] = self._clusters[:self._size]
+        self._hashes, self._clusters = hashes, clusters
+
+    def clusters(self):
+        """Groups of keys with at least two near-identical members, largest first."""
+        groups = {}
+        for key, cluster in zip(self.keys, self._clusters[:self._size].tolist()):
+            groups.setdefault(cluster, []).append(key)
+        return sorted((keys for keys in groups.values() if len(keys) > 1), key=len, reverse=True)
+
+
+def split_duplicates(index, records, workers=4):
+    """Fingerprints saved image records ({"path": ...}) into index; returns (new, duplicates).
+
+    Each record gains a "phash" hex string and, for duplicates, "duplicate_of" (the earlier path).
+    """
+    fps = fingerprint([record["path"] for record in records], workers=workers)
+    new, duplicates = [], []
+    for record, fp, duplicate_of in zip(records, fps, index.add_many([r["path"] for r in records], fps)):
+        record["phash"] = f"{int(fp[1]):016x}"
+        if duplicate_of is None:
+            new.append(record)
+        else:
+            record["duplicate_of"] = duplicate_of
+            duplicates.append(record)
+    return new, duplicates
@@ -0,0 +1,258 @@
+import argparse
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+from zipfile import ZipFile
+
+from ccsuite import leonardo, metrics
+from ccsuite.clients import get_client
+from ccsuite.content import generate_script
+from ccsuite.downloads import download_to_file
+from ccsuite.prompts import stream_image_prompts
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a streaming pipeline.
+
+    fn takes a single item and returns an iterable of output items, which
+    are pushed to the next stage as soon as they are produced.
+    """
+
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+class Pipeline:
+    """Runs stages concurrently with bounded queues between them.
+
+    Every stage gets its own worker threads, so while one item is being
+    downloaded the next can be polling and the one after that submitting.
+    Progress is reported as (stage, kind, payload) tuples on self.events.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.events = queue.Queue()
+        self.errors = []
+        self.counts = {stage.name: 0 for stage in stages}
+        self.busy_time = {stage.name: 0.0 for stage in stages}
+        self.stop_event = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self, items):
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(index, remaining), name=f"{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+        feeder = threading.Thread(target=self._feed, args=(items,), name="feeder", daemon=True)
+        feeder.start()
+        self._threads.append(feeder)
+        return self
+
+    def _feed(self, items):
+        for item in items:
+            if not self._put(self.queues[0], item):
+                break
+        self.queues[0].put(_DONE)
+
+    def _put(self, q, item):
+        # Blocks while the downstream queue is full, but gives up once stopped
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _work(self, index, remaining):
+        stage = self.stages[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                inbox.put(_DONE)  # let sibling workers see it too
+                break
+            if self.stop_event.is_set():
+                continue
+
+            start_time = time.time()
+            status = "ok"
+            try:
+                for output in stage.fn(item):
+                    with self._lock:
+                        self.counts[stage.name] += 1
+                    self.events.put((stage.name, "item", output))
+                    if outbox is not None and not self._put(outbox, output):
+                        break
+            except Exception as e:
+                status = "error"
+                self.errors.append((stage.name, item, e))
+                self.events.put((stage.name, "error", e))
+            finally:
+                elapsed = time.time() - start_time
+                metrics.observe("ccsuite_span_seconds", elapsed, span=f"pipeline.{stage.name}", status=status)
+                with self._lock:
+                    self.busy_time[stage.name] += elapsed
+
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            self.events.put((stage.name, "done", None))
+            if outbox is not None:
+                outbox.put(_DONE)
+            else:
+                self.events.put((None, "finished", None))
+
+    def iter_events(self):
+        # Yields events until the final stage has drained
+        while True:
+            event = self.events.get()
+            if event[1] == "finished":
+                return
+            yield event
+
+    def cancel(self):
+        self.stop_event.set()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+
+def content_stages(out_dir, leonardo_api_key, client=None, num_images=2, thumbnail_size=(320, 180),
+                   poll_interval=None, timeout=120, submit_workers=1, poll_workers=8, download_workers=4):
+    image_dir = os.path.join(out_dir, "images")
+    thumb_dir = os.path.join(out_dir, "thumbnails")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(thumb_dir, exist_ok=True)
+    zip_path = os.path.join(out_dir, "images.zip")
+    manifest_path = os.path.join(out_dir, "manifest.csv")
+
+    def script_stage(job):
+        script = generate_script(job["topic"], job["duration"], job["style"], client=client)
+        with open(os.path.join(out_dir, "script.txt"), "w", encoding="utf-8") as f:
+            f.write(script)
+        yield dict(job, script=script)
+
+    def prompt_stage(job):
+        for index, item in enumerate(stream_image_prompts(job["script"], client=client)):
+            yield {"prompt_index": index + 1, "section": item["section"], "prompt": item["prompt"]}
+
+    def submit_stage(record):
+        # Hands the generation to the shared event loop, where the key's tuner decides when it gets a slot;
+        # the prompt index as variant keeps two sections with the same prompt as two generations
+        future = leonardo.submit(leonardo.generate_async(record["prompt"], leonardo_api_key, num_images=num_images,
+                                                         timeout=timeout, interval=poll_interval,
+                                                         variant=record["prompt_index"]))
+        yield dict(record, generation=future)
+
+    def poll_stage(record):
+        result = record.pop("generation").result()
+        for image_index, img in enumerate(result["images"], start=1):
+            yield dict(record, generation_id=result["generation_id"], image_index=image_index, url=img['url'])
+
+    def download_stage(record):
+        filename = f"prompt_{record['prompt_index']:02d}_image_{record['image_index']}.png"
+        path = os.path.join(image_dir, filename)
+        result = download_to_file(record["url"], path)
+        yield dict(record, filename=filename, path=path, sha256=result["sha256"])
+
+    def thumbnail_stage(record):
+        from PIL import Image
+
+        thumb_path = os.path.join(thumb_dir, record["filename"])
+        with Image.open(record["path"]) as img:
+            img.thumbnail(thumbnail_size)
+            img.save(thumb_path)
+        yield dict(record, thumbnail=thumb_path)
+
+    def export_stage(record):
+        # Single worker, so appends to the ZIP and manifest never interleave
+        new_manifest = not os.path.exists(manifest_path)
+        with ZipFile(zip_path, "a") as zip_file:
+            zip_file.write(record["path"], record["filename"])
+        with open(manifest_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_manifest:
+                writer.writerow(["Image", "Caption", "Prompt", "GenerationId", "Url", "Sha256"])
+            writer.writerow([record["filename"], record["section"], record["prompt"],
+                             record["generation_id"], record["url"], record["sha256"]])
+        yield record
+
+    return [
+        Stage("script", script_stage),
+        Stage("prompts", prompt_stage),
+        Stage("submit", submit_stage, workers=submit_workers),
+        Stage("poll", poll_stage, workers=poll_workers),
+        Stage("download", download_stage, workers=download_workers),
+        Stage("thumbnail", thumbnail_stage, workers=2),
+        Stage("export", export_stage),
+    ]
+
+
+def run_content_pipeline(topic, duration, style, out_dir, leonardo_api_key, client=None, queue_size=8, **options):
+    # Starts the script -> prompts -> images pipeline; iterate pipeline.iter_events() for progress
+    os.makedirs(out_dir, exist_ok=True)
+    stages = content_stages(out_dir, leonardo_api_key, client=client, **options)
+    pipeline = Pipeline(stages, queue_size=queue_size)
+    return pipeline.start([{"topic": topic, "duration": duration, "style": style}])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the script-to-images pipeline for one topic.")
+    parser.add_argument("--topic", required=True)
+    parser.add_argument("--duration", type=int, default=5)
+    parser.add_argument("--style", default="Educational")
+    parser.add_argument("--out", default="pipeline_output")
+    parser.add_argument("--num-images", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    leonardo_api_key = os.environ.get("LEONARDO_API_KEY")
+    if not openai_api_key or not leonardo_api_key:
+        parser.error("OPENAI_API_KEY and LEONARDO_API_KEY must be set in the environment")
+
+    start_time = time.time()
+    pipeline = run_content_pipeline(args.topic, args.duration, args.style, args.out, leonardo_api_key,
+                                     client=get_client(openai_api_key), queue_size=args.queue_size,
+                                     num_images=args.num_images)
+    try:
+        for stage, kind, payload in pipeline.iter_events():
+            if kind == "error":
+                print(f"[{stage}] error: {payload}", file=sys.stderr)
+            elif kind == "done":
+                print(f"[{stage}] done ({pipeline.counts[stage]} items)")
+            elif stage == "export":
+                print(f"[export] {payload['filename']}")
+    except KeyboardInterrupt:
+        pipeline.cancel()
+    pipeline.join()
+
+    elapsed = time.time() - start_time
+    print(f"Finished in {elapsed:.1f}s, output in {args.out}")
+    for name, busy in pipeline.busy_time.items():
+        print(f"  {name:<10} busy {busy:7.1f}s")
+    return 1 if pipeline.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import json
+
+import openai
+
+from ccsuite import metrics
+from ccsuite.context import script_digest
+
+IMAGE_PROMPT_SCHEMA = {
+    "name": "image_prompts",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "prompts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "section": {"type": "string"},
+                        "prompt": {"type": "string"}
+                    },
+                    "required": ["section", "prompt"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["prompts"],
+        "additionalProperties": False
+    }
+}
+
+PROMPT_SEPARATOR = "===="
+
+
+def build_image_prompt_request(script):
+    return (
+        "You are a prompt designer for Leonardo AI, specializing in generating detailed image prompts for thumbnails and visuals.\n"
+        "Based on the script outline below, create detailed prompts for each section.\n"
+        "- For the intro and outro, create 1 image prompt each.\n"
+        "- For the main sections, create 1 prompt per section (up to 5 sections).\n"
+        "Each image prompt must fit within 24 tokens and include the following details:\n"
+        "- Camera type, lens, and angle\n"
+        "- Colors, lighting, and objects in the scene\n"
+        "- Style (e.g., photorealistic, cinematic, minimalistic)\n"
+        f"Here is the script outline:\n{script_digest(script, 'image_prompts')}\n"
+        "Return the prompts in script order, each with the section heading it illustrates."
+    )
+
+
+class PromptStreamParser:
+    """Incrementally parses the streamed JSON document described by IMAGE_PROMPT_SCHEMA.
+
+    feed() takes the next text delta and returns every array element of
+    "prompts" that became complete, so callers can act on a prompt before
+    the model has finished writing the rest of the list.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._element_start = None
+        self.done = False
+
+    def feed(self, text):
+        if not text or self.done:
+            return []
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._element_start is not None and self._depth == self._array_depth:
+                        completed.append(self._emit(i))
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._mark_element(i)
+            elif c in '{[':
+                self._mark_element(i)
+                self._depth += 1
+                if self._array_depth is None and c == '[':
+                    self._array_depth = self._depth
+            elif c in '}]':
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if self._element_start is not None and self._depth == self._array_depth:
+                        completed.append(self._emit(i))
+                    elif self._depth < self._array_depth:
+                        self.done = True
+                        break
+
+        # Keep only the unfinished element (if any) so the buffer stays small
+        keep_from = self._element_start if self._element_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        if self._element_start is not None:
+            self._element_start = 0
+        self._pos = len(self._buffer)
+        return completed
+
+    def _mark_element(self, i):
+        if self._array_depth is not None and self._depth == self._array_depth and self._element_start is None:
+            self._element_start = i
+
+    def _emit(self, end):
+        raw = self._buffer[self._element_start:end + 1]
+        self._element_start = None
+        item = json.loads(raw)
+        if isinstance(item, str):
+            item = {"section": "", "prompt": item}
+        return item
+
+
+def stream_image_prompts(script, client=None, model="gpt-4o", max_tokens=1500):
+    # Yields {"section", "prompt"} dicts as soon as each one is complete
+    client = client or openai
+    with metrics.span("openai.chat", stage="image_prompts"):
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": build_image_prompt_request(script)}],
+            max_tokens=max_tokens,
+            response_format={"type": "json_schema", "json_schema": IMAGE_PROMPT_SCHEMA},
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        parser = PromptStreamParser()
+        for chunk in stream:
+            # The final chunk carries usage and no choices
+            if getattr(chunk, "usage", None):
+                metrics.record_openai_usage(chunk.usage, "image_prompts", model)
+            if not chunk.choices:
+                continue
+            for item in parser.feed(chunk.choices[0].delta.content):
+                metrics.inc("ccsuite_image_prompts_total")
+                yield item
+
+
+def join_prompts(prompts):
+    # Legacy ==== format accepted by the CC4C batch generator
+    return f"\n{PROMPT_SEPARATOR}\n".join(p["prompt"] for p in prompts)
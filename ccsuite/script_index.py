@@ -0,0 +1,155 @@
+"""One-pass structural index of a generated video script.
+
+Scripts come back in the shape shown in generated_content.txt:
+
+    [00:00-01:00] Introduction
+    (Host on Screen)
+    "Hello everyone! ..."
+
+parse_script() walks the lines once and returns a ScriptIndex of sections,
+each with its timestamps, heading, visual/speaker cues and narration.
+Scripts without timestamp markers fall back to blank-line separated blocks
+(the old split('\\n\\n') behaviour) with the first line as heading. Results
+are cached by script hash, so every stage that needs the structure shares
+one parse.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 64
+
+_MARKER = re.compile(r"^[#*\s]*\[(\d{1,2}:\d{2}(?::\d{2})?)\s*[-–—]\s*(\d{1,2}:\d{2}(?::\d{2})?)\]\s*(.*?)[*\s]*$")
+_CUE = re.compile(r"^\((.+)\)$")
+_END = re.compile(r"^[#*\s]*\[\s*end\s*\][*\s]*$", re.IGNORECASE)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _seconds(timestamp):
+    seconds = 0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _section(index, heading, start=None, end=None):
+    return {"index": index, "heading": heading, "start": start, "end": end,
+            "start_s": _seconds(start) if start else None, "end_s": _seconds(end) if end else None,
+            "cues": [], "narration": [], "lines": []}
+
+
+def _finish(section):
+    section["narration"] = "\n".join(section["narration"]).strip()
+    section["text"] = "\n".join(section["lines"]).strip()
+    del section["lines"]
+    return section
+
+
+class ScriptIndex:
+    def __init__(self, script, title, sections, timed):
+        self.script = script
+        self.title = title
+        self.sections = sections
+        self.timed = timed
+
+    @property
+    def headings(self):
+        return [section["heading"] for section in self.sections]
+
+    def section_prompts(self, intro=2, per_section=5, outro=2, image_prompts=None):
+        """Heading plus text of each section, repeated per image slot: intro, every middle section, outro.
+
+        image_prompts maps a section heading (lower case) to a written image prompt that replaces its text.
+        """
+        if not self.sections:
+            return []
+        image_prompts = image_prompts or {}
+        texts = [image_prompts.get(section["heading"].lower())
+                 or f"{section['heading']}\n{section['text']}".strip() for section in self.sections]
+        prompts = [texts[0]] * intro
+        for text in texts[1:-1]:
+            prompts.extend([text] * per_section)
+        if len(texts) > 1:
+            prompts.extend([texts[-1]] * outro)
+        return prompts
+
+    def image_slot(self, n, intro=2, per_section=5):
+        """(filename, caption) for the n-th generated image, counting from 0."""
+        middle = max(len(self.sections) - 2, 0)
+        if n < intro:
+            return f"intro_{n + 1}.png", "Intro Section"
+        if n < intro + middle * per_section:
+            section_num = (n - intro) // per_section + 1
+            image_num = (n - intro) % per_section + 1
+            return f"section_{section_num}_image_{image_num}.png", self.sections[section_num]["heading"]
+        return f"outro_{n - (intro + middle * per_section) + 1}.png", "Outro Section"
+
+
+def _parse(script):
+    title = None
+    sections = []
+    current = None
+    timed = False
+    for raw in script.splitlines():
+        line = raw.strip()
+        marker = _MARKER.match(line)
+        if marker:
+            if current is not None:
+                sections.append(_finish(current))
+            timed = True
+            start, end, heading = marker.groups()
+            current = _section(len(sections), heading or f"Section {len(sections) + 1}", start, end)
+            continue
+        if _END.match(line):
+            break
+        if current is None:
+            if line and title is None:
+                title = line.strip("\"'*# ")
+            continue
+        if line:
+            current["lines"].append(line)
+            cue = _CUE.match(line)
+            if cue:
+                current["cues"].append(cue.group(1).strip())
+            else:
+                current["narration"].append(line.strip("\""))
+    if current is not None:
+        sections.append(_finish(current))
+
+    if not timed:
+        # No [mm:ss-mm:ss] markers: blank-line blocks, first line as heading
+        sections = []
+        for block in re.split(r"\n\s*\n", script.strip()):
+            lines = [line.strip() for line in block.splitlines() if line.strip()]
+            if not lines:
+                continue
+            section = _section(len(sections), lines[0].strip("#* "))
+            section["lines"] = lines
+            for line in lines[1:]:
+                cue = _CUE.match(line)
+                if cue:
+                    section["cues"].append(cue.group(1).strip())
+                else:
+                    section["narration"].append(line.strip("\""))
+            sections.append(_finish(section))
+        title = sections[0]["heading"] if sections else None
+    return ScriptIndex(script, title, sections, timed)
+
+
+def parse_script(script):
+    """Returns the cached ScriptIndex for script, parsing it on first use."""
+    key = hashlib.sha1(script.encode("utf-8")).hexdigest()
+    with _lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    index = _parse(script)
+    with _lock:
+        _cache[key] = index
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
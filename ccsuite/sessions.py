@@ -0,0 +1,354 @@
+"""Per-session memory accounting, spill-to-disk and idle-session eviction.
+
+Session state lives as long as the browser tab does, so a tab left open for
+a day keeps its script, prompt batches, image records and duplicate index
+in the server process. Pages call track_session() before touching
+st.session_state; that records the session's script run and an approximate
+size of every state value, and every CHECK_INTERVAL seconds looks at all
+tracked sessions in the process:
+
+    idle for SPILL_IDLE        values of SPILL_MIN_BYTES or more are pickled
+                               to the workspace and replaced by a Spilled
+                               marker; the next track_session() in that
+                               session loads them back before the page runs
+    idle for EVICT_IDLE        the session's state and spill files are
+                               dropped (releasing its workspace runs); the
+                               page starts over with a notice
+    tracked memory above       the least recently used sessions idle for at
+    HIGH_WATERMARK             least PRESSURE_IDLE are spilled until the
+                               total is back under LOW_WATERMARK
+
+A session counts as idle from the end of its last script run: while the run
+that called track_session() is still going, every check moves its last
+activity forward, so a long generation is never spilled or evicted from under
+the page. Thresholds can be set
+with CCSUITE_SESSION_SPILL_IDLE, CCSUITE_SESSION_EVICT_IDLE (seconds) and
+CCSUITE_SESSION_HIGH_WATERMARK_MB. Sizes are estimates (sys.getsizeof over
+containers, nbytes for arrays), good for finding heavy sessions rather than
+exact accounting.
+
+All of this leans on Streamlit internals (the SessionState behind
+st.session_state, Runtime's session manager), checked against the version
+pinned in requirements.txt. If a Streamlit upgrade moves them, the first
+AttributeError switches tracking off for the process: anything already
+spilled is loaded back, a warning is logged, disabled() says why, and the
+pages keep working without spill or eviction.
+"""
+import hashlib
+import io
+import logging
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+
+from ccsuite import metrics
+from ccsuite.workspace import atomic_write, default_root
+
+SPILL_IDLE = int(os.environ.get("CCSUITE_SESSION_SPILL_IDLE", "900"))
+EVICT_IDLE = int(os.environ.get("CCSUITE_SESSION_EVICT_IDLE", str(6 * 3600)))
+HIGH_WATERMARK = int(os.environ.get("CCSUITE_SESSION_HIGH_WATERMARK_MB", "512")) * 2 ** 20
+LOW_WATERMARK = HIGH_WATERMARK * 3 // 4
+PRESSURE_IDLE = 300
+SPILL_MIN_BYTES = 64 * 1024
+CHECK_INTERVAL = 30
+# Containers nested deeper than this are counted by their own size only
+MAX_DEPTH = 6
+
+logger = logging.getLogger("ccsuite.sessions")
+
+_lock = threading.Lock()
+_sessions = {}
+_last_check = 0.0
+_disabled = None
+
+
+class Spilled:
+    """Stands in for a state value that was written to disk."""
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+    def __repr__(self):
+        return f"Spilled({os.path.basename(self.path)}, {self.size} bytes)"
+
+
+class _Session:
+    def __init__(self, session_id, state):
+        self.session_id = session_id
+        self.state = state
+        self.last_seen = time.time()
+        # The thread of the script run that last called track_session()
+        self.run_thread = None
+        self.sizes = {}
+        self.spilled = {}
+        self.evicted = False
+        # Held while values move between memory and disk
+        self.lock = threading.Lock()
+
+    @property
+    def memory_bytes(self):
+        return sum(self.sizes.values())
+
+    @property
+    def spilled_bytes(self):
+        return sum(marker.size for marker in self.spilled.values())
+
+
+def sizeof(value, _seen=None, _depth=0):
+    """Approximate bytes held by value, following containers and plain objects."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+        return sys.getsizeof(value) + (0 if value.base is not None else int(value.nbytes))
+    size = sys.getsizeof(value, 0)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(value, io.BytesIO):
+        return size + value.getbuffer().nbytes
+    if _depth >= MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        return size + sum(sizeof(k, _seen, _depth + 1) + sizeof(v, _seen, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(sizeof(item, _seen, _depth + 1) for item in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return size + sizeof(vars(value), _seen, _depth + 1)
+    return size
+
+
+def disabled():
+    """Why spill and eviction were switched off, or None while they run."""
+    return _disabled
+
+
+def _disable(error):
+    # Streamlit internals moved; stop touching them and give every session its spilled values back
+    global _disabled
+    with _lock:
+        if _disabled is not None:
+            return
+        _disabled = f"{type(error).__name__}: {error}"
+        records = list(_sessions.values())
+        _sessions.clear()
+    logger.warning("Session spill/eviction disabled, Streamlit internals changed: %s", _disabled)
+    metrics.inc("ccsuite_session_tracking_disabled_total")
+    for record in records:
+        if record.spilled:
+            try:
+                _rehydrate(record, record.state)
+            except Exception:
+                logger.exception("Could not restore spilled state for session %s", record.session_id[:8])
+
+
+def _session_exists(session_id):
+    # Disconnected sessions Streamlit still keeps for a reconnect count as existing
+    from streamlit.runtime import Runtime
+
+    manager = getattr(Runtime.instance(), "_session_mgr", None) if Runtime.exists() else None
+    if manager is None:
+        return True
+    return manager.get_session_info(session_id) is not None
+
+
+def spill_dir(session_id):
+    return os.path.join(default_root(), "_spill", session_id)
+
+
+def _last_active(record, now):
+    # A session whose script is still running is in use, however long ago the run started
+    thread = record.run_thread
+    if thread is not None and thread.is_alive():
+        record.last_seen = now
+    return record.last_seen
+
+
+def _measure(record, state):
+    values = state.filtered_state
+    record.sizes = {key: sizeof(value) for key, value in values.items() if not isinstance(value, Spilled)}
+    return values
+
+
+def _rehydrate(record, state):
+    with record.lock:
+        for key, marker in list(record.spilled.items()):
+            try:
+                with open(marker.path, "rb") as f:
+                    state[key] = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                # A lost spill file loses that value; the page re-initializes what is missing
+                del state[key]
+                metrics.inc("ccsuite_session_rehydrate_failures_total")
+            del record.spilled[key]
+            metrics.inc("ccsuite_session_rehydrated_bytes_total", marker.size)
+        shutil.rmtree(spill_dir(record.session_id), ignore_errors=True)
+
+
+def _spill(record, state):
+    with record.lock:
+        for key, value in _measure(record, state).items():
+            size = record.sizes.get(key, 0)
+            if isinstance(value, Spilled) or size < SPILL_MIN_BYTES:
+                continue
+            path = os.path.join(spill_dir(record.session_id), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+            try:
+                with atomic_write(path) as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                # Live resources (workspace runs, clients) stay in memory
+                continue
+            marker = Spilled(path, size)
+            try:
+                state[key] = marker
+            except Exception:
+                # Widget-owned keys cannot be assigned from outside the script
+                os.remove(path)
+                continue
+            record.spilled[key] = marker
+            record.sizes.pop(key)
+            metrics.inc("ccsuite_session_spilled_bytes_total", size)
+
+
+def _evict(record, state):
+    with record.lock:
+        for key in list(state.filtered_state):
+            try:
+                del state[key]
+            except Exception:
+                continue
+        record.sizes = {}
+        record.spilled = {}
+        record.evicted = True
+        shutil.rmtree(spill_dir(record.session_id), ignore_errors=True)
+    metrics.inc("ccsuite_sessions_evicted_total")
+
+
+def enforce(now=None, force=False):
+    """Spills, evicts and forgets sessions as described above; returns (spilled, evicted) counts.
+
+    Runs at most every CHECK_INTERVAL seconds unless force is set.
+    """
+    if _disabled is not None:
+        return 0, 0
+    try:
+        return _enforce(now, force)
+    except AttributeError as e:
+        _disable(e)
+        return 0, 0
+
+
+def _enforce(now, force):
+    global _last_check
+    now = now or time.time()
+    with _lock:
+        if not force and now - _last_check < CHECK_INTERVAL:
+            return 0, 0
+        _last_check = now
+        records = list(_sessions.values())
+
+    spilled = evicted = 0
+    live = []
+    for record in records:
+        state = record.state
+        if not _session_exists(record.session_id):
+            # Streamlit dropped the session; let its state go with it
+            with _lock:
+                _sessions.pop(record.session_id, None)
+            shutil.rmtree(spill_dir(record.session_id), ignore_errors=True)
+            continue
+        idle = now - _last_active(record, now)
+        if idle >= EVICT_IDLE and not record.evicted:
+            _evict(record, state)
+            evicted += 1
+        elif idle >= SPILL_IDLE and record.memory_bytes >= SPILL_MIN_BYTES:
+            _spill(record, state)
+            spilled += 1
+        else:
+            live.append((record, state))
+
+    total = sum(record.memory_bytes for record in records)
+    if total > HIGH_WATERMARK:
+        # Least recently used first, until the total drops under the low watermark
+        for record, state in sorted(live, key=lambda pair: pair[0].last_seen):
+            if total <= LOW_WATERMARK or now - record.last_seen < PRESSURE_IDLE:
+                break
+            before = record.memory_bytes
+            _spill(record, state)
+            total -= before - record.memory_bytes
+            spilled += 1
+    return spilled, evicted
+
+
+def track_session():
+    """Call at the top of a page: restores spilled state, records this session's use and sizes."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if _disabled is not None:
+        return
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    try:
+        _track(ctx, st)
+    except AttributeError as e:
+        _disable(e)
+        return
+    enforce()
+
+
+def _track(ctx, st):
+    # The thread-safe wrapper is rebuilt with every script runner; the SessionState behind it lives with the session
+    state = getattr(ctx.session_state, "_state", ctx.session_state)
+    with _lock:
+        record = _sessions.get(ctx.session_id)
+        if record is None or record.state is not state:
+            record = _sessions[ctx.session_id] = _Session(ctx.session_id, state)
+    record.last_seen = time.time()
+    record.run_thread = threading.current_thread()
+    if record.spilled:
+        _rehydrate(record, state)
+    if record.evicted:
+        record.evicted = False
+        st.info("This session was idle for a long time, so its results were cleared to free memory.")
+    with record.lock:
+        _measure(record, state)
+
+
+def summary():
+    """One row per tracked session, most memory first."""
+    now = time.time()
+    with _lock:
+        records = list(_sessions.values())
+    rows = [{
+        "session": record.session_id[:8],
+        "idle_s": int(now - _last_active(record, now)),
+        "memory_bytes": record.memory_bytes,
+        "spilled_bytes": record.spilled_bytes,
+        "keys": len(record.sizes) + len(record.spilled),
+        "spilled_keys": ", ".join(sorted(record.spilled)),
+    } for record in records]
+    return sorted(rows, key=lambda row: row["memory_bytes"], reverse=True)
+
+
+def key_totals():
+    """Bytes in memory and on disk per session_state key, summed over sessions."""
+    with _lock:
+        records = list(_sessions.values())
+    totals = {}
+    for record in records:
+        for key, size in record.sizes.items():
+            totals.setdefault(key, {"key": key, "sessions": 0, "memory_bytes": 0, "spilled_bytes": 0})
+            totals[key]["sessions"] += 1
+            totals[key]["memory_bytes"] += size
+        for key, marker in record.spilled.items():
+            totals.setdefault(key, {"key": key, "sessions": 0, "memory_bytes": 0, "spilled_bytes": 0})
+            totals[key]["sessions"] += 1
+            totals[key]["spilled_bytes"] += marker.size
+    return sorted(totals.values(), key=lambda row: row["memory_bytes"] + row["spilled_bytes"], reverse=True)
@@ -0,0 +1,114 @@
+"""Single-flight coalescing of identical in-flight provider calls.
+
+When two sessions (or two batch workers) ask for exactly the same
+generation at the same time, only the first caller hits the API; the others
+attach to its pending call and get the same result, or the same exception.
+Nothing is cached: once the call finishes its key is free again, so a retry
+after an error really retries.
+
+Group.do() is for threaded callers (OpenAI completions). If the thread
+running the call leaves without a result (e.g. Streamlit stops its script
+for a rerun), a waiting thread takes over and runs the call itself.
+
+Group.do_async() is for coroutines on the shared event loop (Leonardo
+generations). The call runs as its own task; a waiter that is cancelled
+only detaches, and the task is cancelled once every waiter has gone.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+from ccsuite import metrics
+
+
+def normalize(text):
+    # Whitespace-only differences do not change what a model is asked
+    return " ".join(text.split()) if isinstance(text, str) else text
+
+
+def make_key(*parts):
+    """Stable digest of the parts that identify a call; secrets such as API keys never appear in it."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _Abandoned(Exception):
+    pass
+
+
+class _Call:
+    def __init__(self, pending):
+        self.pending = pending
+        self.waiters = 0
+
+
+class Group:
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs), unless an identical call is already running, then waits for that one."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call(Future())
+            metrics.inc("ccsuite_singleflight_calls_total", group=self.name, role="leader" if leader else "follower")
+            if not leader:
+                try:
+                    return call.pending.result()
+                except _Abandoned:
+                    continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, call)
+                call.pending.set_exception(e)
+                raise
+            except BaseException:
+                # The caller was stopped, not the call: hand it to a waiting thread
+                self._finish(key, call)
+                call.pending.set_exception(_Abandoned())
+                raise
+            self._finish(key, call)
+            call.pending.set_result(result)
+            return result
+
+    async def do_async(self, key, factory):
+        """Awaits factory() once per key; every concurrent waiter shares the task."""
+        # Only touched from the event loop thread, but the lock keeps in_flight() consistent
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(asyncio.ensure_future(factory()))
+                call.pending.add_done_callback(lambda _: self._finish(key, call))
+            call.waiters += 1
+        metrics.inc("ccsuite_singleflight_calls_total", group=self.name, role="leader" if leader else "follower")
+        try:
+            return await asyncio.shield(call.pending)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.pending.done():
+                # Nobody is left to use the result; the next caller starts afresh
+                self._finish(key, call)
+                call.pending.cancel()
+                metrics.inc("ccsuite_singleflight_cancelled_total", group=self.name)
+
+    def _finish(self, key, call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+openai_calls = Group("openai")
+leonardo_calls = Group("leonardo")
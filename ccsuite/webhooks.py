@@ -0,0 +1,202 @@
+"""Local receiver for Leonardo generation-complete callbacks.
+
+Point the Leonardo webhook for your API key at
+http://<host>:<CCSUITE_WEBHOOK_PORT>/leonardo/callback and set
+CCSUITE_WEBHOOK_SECRET to the webhook API key configured there.
+ccsuite.leonardo then waits for the notification instead of polling, and
+only falls back to a status request every fallback interval.
+
+A notification carries the image URLs the app goes on to download, so the
+receiver only listens on 127.0.0.1 unless CCSUITE_WEBHOOK_HOST names
+another interface, and it refuses to listen anywhere else without
+CCSUITE_WEBHOOK_SECRET (generations are then polled as without a port).
+
+Only one process can own the port. The Streamlit process and every
+`python -m ccsuite.worker` process try to; the others find it taken, log
+it once and retry the bind every BIND_RETRY seconds in case the owner
+went away. With a shared CCSUITE_QUEUE the owner posts each callback to
+the queue as a notice, and the other processes wait on those notices
+instead of polling Leonardo; without one they poll.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ccsuite import metrics
+from ccsuite.jobqueue import open_queue
+
+CALLBACK_PATH = "/leonardo/callback"
+# Notifications that arrive before anyone waits on them are kept this long
+RESULT_TTL = 600
+# A process that found the port taken tries to bind it again after this long
+BIND_RETRY = 60
+
+_lock = threading.Lock()
+_subscribers = {}
+_results = {}
+_receiver = None
+_refused = False
+_bind_failed_at = 0.0
+_bind_warned = False
+
+logger = logging.getLogger("ccsuite.webhooks")
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def parse_notification(body):
+    # Returns (generation_id, status, images) from a Leonardo webhook payload
+    data = body.get("data", {}).get("object") or body.get("generations_by_pk") or body
+    generation_id = data.get("id") or data.get("generationId")
+    status = data.get("status") or ("COMPLETE" if body.get("type", "").endswith(".complete") else None)
+    images = data.get("images") or data.get("generated_images") or []
+    return generation_id, status, images
+
+
+def notify(generation_id, status, images):
+    # Hands the result to whoever subscribed to generation_id, or keeps it for a later subscriber
+    now = time.time()
+    with _lock:
+        _results[generation_id] = (now, status, images)
+        for key in [k for k, (ts, _, _) in _results.items() if now - ts > RESULT_TTL]:
+            del _results[key]
+        callbacks = list(_subscribers.get(generation_id, ()))
+    metrics.inc("ccsuite_leonardo_webhooks_total", status=status or "unknown")
+    for callback in callbacks:
+        callback(status, images)
+    queue = _relay_queue()
+    if queue is not None:
+        try:
+            queue.post_notice(_notice_key(generation_id), {"status": status, "images": images})
+        except Exception:
+            logger.exception("Could not relay the callback for generation %s", generation_id)
+
+
+def _relay_queue():
+    # Only a queue shared between processes can carry callbacks to the ones that could not bind the port
+    url = os.environ.get("CCSUITE_QUEUE")
+    if not url or url.startswith("memory://"):
+        return None
+    return open_queue(url)
+
+
+def _notice_key(generation_id):
+    return f"leonardo.callback:{generation_id}"
+
+
+def relayed(generation_id):
+    """(status, images) of a callback another process received for generation_id, or None."""
+    queue = _relay_queue()
+    notice = queue.get_notice(_notice_key(generation_id)) if queue is not None else None
+    if notice is None:
+        return None
+    metrics.inc("ccsuite_leonardo_webhooks_relayed_total")
+    return notice["status"], notice["images"]
+
+
+def relay_active():
+    """True when another process owns the receiver and relays its callbacks through the shared queue."""
+    return _receiver is None and _bind_failed_at > 0 and _relay_queue() is not None
+
+
+def subscribe(generation_id, callback):
+    """Calls callback(status, images) for every notification about generation_id.
+
+    A notification that arrived before subscribing is replayed immediately.
+    Callbacks run on the receiver thread and must not block.
+    """
+    with _lock:
+        _subscribers.setdefault(generation_id, []).append(callback)
+        early = _results.get(generation_id)
+    if early is not None:
+        callback(early[1], early[2])
+
+
+def forget(generation_id):
+    with _lock:
+        _subscribers.pop(generation_id, None)
+        _results.pop(generation_id, None)
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != CALLBACK_PATH:
+            self.send_error(404)
+            return
+        secret = self.server.secret
+        if secret and self.headers.get("Authorization") != f"Bearer {secret}":
+            self.send_error(401)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_error(400, "Invalid JSON")
+            return
+
+        generation_id, status, images = parse_notification(body)
+        if not generation_id:
+            self.send_error(400, "Missing generation id")
+            return
+        notify(generation_id, status, images)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_receiver(port=None, host=None, secret=None):
+    """Starts the callback receiver once per process.
+
+    The port defaults to CCSUITE_WEBHOOK_PORT and the host to
+    CCSUITE_WEBHOOK_HOST or 127.0.0.1. Returns None when no port is set,
+    when a non-loopback host has no secret, or when another process holds
+    the port (see relay_active()).
+    """
+    global _receiver, _refused, _bind_failed_at, _bind_warned
+    port = port or os.environ.get("CCSUITE_WEBHOOK_PORT")
+    if not port:
+        return _receiver
+    host = host or os.environ.get("CCSUITE_WEBHOOK_HOST") or "127.0.0.1"
+    secret = secret or os.environ.get("CCSUITE_WEBHOOK_SECRET")
+    if not secret and host not in LOOPBACK_HOSTS:
+        if not _refused:
+            _refused = True
+            logger.warning("Not starting the Leonardo webhook receiver on %s without CCSUITE_WEBHOOK_SECRET; "
+                           "polling instead", host)
+        return _receiver
+    with _lock:
+        if _receiver is None and time.time() - _bind_failed_at >= BIND_RETRY:
+            try:
+                server = ThreadingHTTPServer((host, int(port)), _CallbackHandler)
+            except OSError as e:
+                _bind_failed_at = time.time()
+                if not _bind_warned:
+                    _bind_warned = True
+                    logger.warning("Leonardo webhook port %s:%s is not available (%s); %s", host, port, e,
+                                   "waiting on callbacks relayed through the job queue" if _relay_queue()
+                                   else "polling instead")
+                return None
+            _bind_failed_at = 0.0
+            server.daemon_threads = True
+            server.secret = secret
+            threading.Thread(target=server.serve_forever, name="leonardo-webhooks", daemon=True).start()
+            _receiver = server
+    return _receiver
+
+
+def receiver_running():
+    return _receiver is not None
+
+
+def stop_receiver():
+    global _receiver, _bind_failed_at, _bind_warned
+    with _lock:
+        server, _receiver = _receiver, None
+        _bind_failed_at, _bind_warned = 0.0, False
+    if server is not None:
+        server.shutdown()
+        server.server_close()
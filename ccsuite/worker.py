@@ -0,0 +1,232 @@
+"""Worker processes for jobs enqueued on ccsuite.jobqueue.
+
+    CCSUITE_QUEUE=sqlite:///data/jobs.db python -m ccsuite.worker --processes 4
+
+Run as many of these as there are cores (or containers sharing the queue
+file); the Streamlit front ends only enqueue jobs and watch their status.
+Keys come from the job's secrets, falling back to OPENAI_API_KEY and
+LEONARDO_API_KEY in the worker's environment.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ccsuite import metrics
+from ccsuite.batch import configure_logging, log_event
+from ccsuite.clients import get_client
+from ccsuite.content import generate_all, generate_recommendation
+from ccsuite.jobqueue import DEFAULT_LEASE, open_queue
+from ccsuite.leonardo import LeonardoError, SubmissionQueue
+from ccsuite.prompts import stream_image_prompts
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def _openai_client(secrets):
+    api_key = secrets.get("openai_api_key") or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("No OpenAI API key in the job or the worker environment")
+    return get_client(api_key)
+
+
+def _leonardo_key(secrets):
+    api_key = secrets.get("leonardo_api_key") or os.environ.get("LEONARDO_API_KEY")
+    if not api_key:
+        raise LeonardoError("No Leonardo API key in the job or the worker environment")
+    return api_key
+
+
+def _collect(queue, report, progress):
+    # Results keep submission order; failures are reported per prompt, not for the whole job
+    results = [None] * len(queue.futures)
+    index = {future: n for n, future in enumerate(queue.futures)}
+    progress["total"] = len(queue.futures)
+    for future in queue.as_completed():
+        n = index[future]
+        try:
+            results[n] = future.result()
+        except Exception as e:
+            # Not only LeonardoError: a network or local error in one generation must not fail the others
+            results[n] = {"prompt": progress["prompts"][n], "images": [], "error": str(e)}
+        progress["done"] += 1
+        report(progress)
+    return results
+
+
+@handler("leonardo.images")
+def run_image_batch(payload, secrets, report):
+    prompts = payload["prompts"]
+    progress = {"done": 0, "total": len(prompts), "prompts": prompts}
+    report(progress)
+    with SubmissionQueue(_leonardo_key(secrets), max_workers=payload.get("concurrency"),
+                         num_images=payload.get("num_images", 2), timeout=payload.get("timeout", 60),
+                         interval=payload.get("interval")) as queue:
+        for prompt in prompts:
+            queue.submit(prompt)
+        return _collect(queue, report, progress)
+
+
+@handler("leonardo.script_images")
+def run_script_images(payload, secrets, report):
+    # Prompts are streamed from the script and submitted as soon as each one is complete
+    progress = {"done": 0, "total": 0, "prompts": []}
+    client = _openai_client(secrets)
+    with SubmissionQueue(_leonardo_key(secrets), max_workers=payload.get("concurrency"),
+                         num_images=payload.get("num_images", 2), timeout=payload.get("timeout", 60),
+                         interval=payload.get("interval")) as queue:
+        for item in stream_image_prompts(payload["script"], client=client):
+            queue.submit(item["prompt"])
+            progress["prompts"].append(item["prompt"])
+            progress["total"] = len(progress["prompts"])
+            report(progress)
+        return _collect(queue, report, progress)
+
+
+@handler("content.generate_all")
+def run_content(payload, secrets, report):
+    prompts = []
+
+    def on_prompt(item):
+        prompts.append(item["prompt"])
+        report({"stage": "prompts", "prompts": prompts})
+
+    report({"stage": "script"})
+    return generate_all(payload["topic"], payload["duration"], payload["style"],
+                        client=_openai_client(secrets), on_prompt=on_prompt)
+
+
+@handler("blueprint.recommendation")
+def run_recommendation(payload, secrets, report):
+    return generate_recommendation(payload["inquiry"], client=_openai_client(secrets))
+
+
+class UnknownJobKind(Exception):
+    pass
+
+
+def run_job(queue, job, worker_id, lease=DEFAULT_LEASE):
+    """Runs one claimed job, renewing its lease until the handler returns."""
+    stop = threading.Event()
+
+    def report(progress):
+        queue.heartbeat(job["id"], worker_id, progress=dict(progress), lease=lease)
+
+    def keep_alive():
+        while not stop.wait(lease / 3):
+            queue.heartbeat(job["id"], worker_id, lease=lease)
+
+    threading.Thread(target=keep_alive, name=f"lease-{job['id'][:8]}", daemon=True).start()
+    log_event("job_started", job=job["id"], kind=job["kind"], attempt=job["attempts"], worker=worker_id)
+    start_time = time.time()
+    try:
+        fn = HANDLERS.get(job["kind"])
+        if fn is None:
+            raise UnknownJobKind(f"No handler for job kind '{job['kind']}'")
+        with metrics.span("worker.job", kind=job["kind"]):
+            result = fn(job["payload"], job.get("secrets") or {}, report)
+    except Exception as e:
+        if queue.fail(job["id"], worker_id, e, retry=not isinstance(e, UnknownJobKind)):
+            log_event("job_failed", logging.ERROR, job=job["id"], kind=job["kind"], error=str(e))
+        else:
+            log_event("job_lost", logging.WARNING, job=job["id"], kind=job["kind"], error=str(e), worker=worker_id)
+    else:
+        if queue.complete(job["id"], worker_id, result):
+            log_event("job_completed", job=job["id"], kind=job["kind"], elapsed=round(time.time() - start_time, 2))
+        else:
+            # The lease ran out and another worker took the job over; its outcome stands
+            log_event("job_lost", logging.WARNING, job=job["id"], kind=job["kind"], worker=worker_id)
+    finally:
+        stop.set()
+
+
+def work(queue_url=None, concurrency=4, kinds=None, lease=DEFAULT_LEASE, idle_sleep=0.5, stop=None):
+    """Claims and runs jobs until stop is set; up to `concurrency` jobs run at once in this process."""
+    queue = open_queue(queue_url)
+    if queue is None:
+        raise ValueError("No queue configured; pass --queue or set CCSUITE_QUEUE")
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    stop = stop or threading.Event()
+    slots = threading.Semaphore(concurrency)
+    log_event("worker_started", worker=worker_id, concurrency=concurrency, kinds=kinds or sorted(HANDLERS))
+
+    def run(job):
+        try:
+            run_job(queue, job, worker_id, lease)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job") as executor:
+        while not stop.is_set():
+            slots.acquire()
+            job = queue.claim(worker_id, kinds=kinds or list(HANDLERS), lease=lease)
+            if job is None:
+                slots.release()
+                stop.wait(idle_sleep)
+                continue
+            executor.submit(run, job)
+    log_event("worker_stopped", worker=worker_id)
+
+
+def _work_process(queue_url, concurrency, kinds, lease, metrics_port=None):
+    configure_logging()
+    # Webhook callbacks received by another process are relayed through this queue (ccsuite.webhooks)
+    os.environ.setdefault("CCSUITE_QUEUE", queue_url)
+    if metrics_port:
+        metrics.start_http_server(metrics_port)
+    try:
+        work(queue_url, concurrency, kinds, lease)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued generation jobs.")
+    parser.add_argument("--queue", default=os.environ.get("CCSUITE_QUEUE"),
+                        help="Queue URL, e.g. sqlite:///data/jobs.db (default: CCSUITE_QUEUE)")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs run at once per process")
+    parser.add_argument("--kinds", nargs="*", help=f"Only run these job kinds (default: {', '.join(sorted(HANDLERS))})")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="Seconds before a job held by a dead worker is handed to another")
+    parser.add_argument("--metrics-port", type=int, help="Serve /metrics here; process n uses this port + n")
+    args = parser.parse_args(argv)
+    if not args.queue or args.queue.startswith("memory://"):
+        parser.error("workers need a shared queue, e.g. --queue sqlite:///data/jobs.db")
+
+    if args.processes <= 1:
+        _work_process(args.queue, args.concurrency, args.kinds, args.lease, args.metrics_port)
+        return 0
+
+    processes = [multiprocessing.Process(target=_work_process, name=f"ccsuite-worker-{n}",
+                                         args=(args.queue, args.concurrency, args.kinds, args.lease,
+                                               args.metrics_port and args.metrics_port + n))
+                 for n in range(args.processes)]
+    for process in processes:
+        process.start()
+    # Stopping the parent (docker stop, systemd) stops every worker; their leases hand jobs on
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Per-session, per-run scratch directories for generated files.
+
+    <root>/<session id>/<run id>/...
+
+Every Streamlit session gets its own directory and every run inside it its
+own subdirectory, so concurrent users never share file names. Directories
+are reference counted: a run is deleted when its last holder releases it
+(or its owning session is garbage collected), and a session directory goes
+with its last run. Directories left behind by a crashed process are swept
+after RUN_TTL.
+
+The root is CCSUITE_WORKSPACE if set. With CCSUITE_WORKSPACE_TMPFS=1 it is
+/dev/shm/ccsuite, a RAM-backed spool that keeps short-lived images off the
+disk. Otherwise it is <tempdir>/ccsuite.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+
+from ccsuite import metrics
+
+RUN_TTL = 24 * 3600
+
+_lock = threading.Lock()
+_refs = {}
+_swept = False
+
+
+def default_root():
+    root = os.environ.get("CCSUITE_WORKSPACE")
+    if root:
+        return root
+    if os.environ.get("CCSUITE_WORKSPACE_TMPFS") and os.path.isdir("/dev/shm"):
+        return "/dev/shm/ccsuite"
+    return os.path.join(tempfile.gettempdir(), "ccsuite")
+
+
+@contextmanager
+def atomic_write(path, mode="wb", **kwargs):
+    """Writes to a temporary sibling of path and renames it into place on success.
+
+    Readers see the old file or the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def acquire(path):
+    with _lock:
+        os.makedirs(path, exist_ok=True)
+        _refs[path] = _refs.get(path, 0) + 1
+
+
+def release(path):
+    with _lock:
+        count = _refs.get(path, 0) - 1
+        if count > 0:
+            _refs[path] = count
+            return
+        _refs.pop(path, None)
+        # Renamed under the lock so a concurrent acquire() recreates a fresh directory
+        doomed = f"{path}.deleting-{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(path, doomed)
+        except OSError:
+            return
+    shutil.rmtree(doomed, ignore_errors=True)
+    metrics.inc("ccsuite_workspace_cleanups_total")
+
+
+def sweep(root=None, max_age=RUN_TTL):
+    # Removes session directories that nothing in this process holds and nobody touched in max_age
+    root = root or default_root()
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        with _lock:
+            held = any(ref == path or ref.startswith(path + os.sep) for ref in _refs)
+        try:
+            if not held and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+class Run:
+    """A run directory; holds a reference on itself and on its session directory."""
+
+    def __init__(self, session_id, prefix="run", root=None):
+        global _swept
+        root = root or default_root()
+        if not _swept:
+            _swept = True
+            sweep(root)
+        self.session_dir = os.path.join(root, session_id)
+        self.path = os.path.join(self.session_dir, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}")
+        acquire(self.session_dir)
+        acquire(self.path)
+        # Released when the run is dropped, e.g. with the Streamlit session that stored it
+        self._finalizer = weakref.finalize(self, Run._release, self.path, self.session_dir)
+
+    @staticmethod
+    def _release(path, session_dir):
+        release(path)
+        release(session_dir)
+
+    def file(self, *parts):
+        path = os.path.join(self.path, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def atomic_write(self, name, mode="wb", **kwargs):
+        return atomic_write(self.file(name), mode, **kwargs)
+
+    def release(self):
+        # Idempotent; also runs automatically when the Run is garbage collected
+        self._finalizer()
+
+
+def session_run(key, new=False, prefix=None):
+    """Returns the Run stored in st.session_state[key], creating one for this browser session.
+
+    new=True releases the previous run (deleting its files) and starts a fresh one.
+    """
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    run = st.session_state.get(key)
+    if run is not None and not new:
+        return run
+    if run is not None:
+        run.release()
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx is not None else f"local-{os.getpid()}"
+    run = Run(session_id, prefix=prefix or key)
+    st.session_state[key] = run
+    return run
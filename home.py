@@ -1,6 +1,8 @@
 import streamlit as st
 import json
+from ccsuite.debug_panel import render_debug_panel
 
 
 st.title("Toolbox")
-st.write("Your 1stop toolbox.")
\ No newline at end of file
+st.write("Your 1stop toolbox.")
+render_debug_panel()
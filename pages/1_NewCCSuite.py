@@ -1,138 +1,138 @@
-import openai
+from datetime import datetime
 import streamlit as st
+from ccsuite.batch_tab import render_batch_tab
+from ccsuite.clients import get_client
+from ccsuite.debug_panel import render_debug_panel
+from ccsuite.library import open_library, remember_runs
+from ccsuite.sessions import track_session
+from ccsuite.content import (
+    artifact_models, format_results, generate_image_prompts, generate_script, generate_thumbnail_ideas,
+    generate_video_metadata
+)
 
-def generate_script(topic, duration, style):
-    prompt = (
-        f"You are a professional scriptwriter for YouTube videos. Based on the following inputs, generate a {duration}-minute script at a normal speaking pace (~750 words).\n"
-        f"The tone and style must match the provided description. Break the script into sections with appropriate headings for clarity.\n"
-        f"- Topic: {topic}\n"
-        f"- Style: {style}\n"
-        f"Ensure the script flows smoothly, keeping viewers engaged from start to finish."
-    )
-    response = openai.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1500
-    )
-    return response.choices[0].message.content
-
-def generate_image_prompts(script):
-    prompt = (
-        "You are a prompt designer for Leonardo AI, specializing in generating detailed image prompts for thumbnails and visuals.\n"
-        "Based on the script below, create detailed prompts for each section.\n"
-        "- For the intro and outro, create 1 image prompt each.\n"
-        "- For the main sections, create 1 prompt per section (up to 5 sections).\n"
-        "Each image prompt must fit within 24 tokens and include the following details:\n"
-        "- Camera type, lens, and angle\n"
-        "- Colors, lighting, and objects in the scene\n"
-        "- Style (e.g., photorealistic, cinematic, minimalistic)\n"
-        f"Here is the script: {script}\n"
-        "Output the prompts in a numbered list, one for each section."
-    )
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=800
-    )
-    return response.choices[0].message.content
-
-def generate_thumbnail_ideas(topic, script):
-    prompt = (
-        "You are an expert in creating catchy YouTube thumbnails. Based on the provided topic and script, suggest 3-5 thumbnail ideas that are engaging, visually appealing, and optimized for clicks.\n"
-        "- Use a few bold words (e.g., 'MUST SEE,' 'SHOCKING FACTS').\n"
-        "- Include emojis if relevant.\n"
-        "- Suggest a brief visual description (e.g., 'A polar bear on thin ice with dramatic lighting').\n"
-        f"Topic: {topic}\n"
-        f"Script: {script}\n"
-        "Output each idea on a new line."
-    )
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500
-    )
-    return response.choices[0].message.content
-
-def generate_video_metadata(topic, script):
-    title_prompt = (
-        "You are a YouTube video title expert. Based on the following topic and script, suggest 3 click-worthy titles that are concise, engaging, and optimized for SEO.\n"
-        f"- Topic: {topic}\n"
-        f"- Script: {script}\n"
-        "Output the titles in a numbered list."
-    )
-    description_prompt = (
-        "You are an expert at writing YouTube video descriptions. Based on the following topic and script, write a compelling description optimized for SEO.\n"
-        "Include:\n"
-        "- A summary of the video.\n"
-        "- Keywords related to the topic.\n"
-        "- A call to action (e.g., 'Subscribe for more!').\n"
-        f"Topic: {topic}\n"
-        f"Script: {script}\n"
-        "Output the description as a paragraph."
-    )
-    title_response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": title_prompt}],
-        max_tokens=200
-    )
-    description_response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": description_prompt}],
-        max_tokens=300
+
+def show_past_run(run):
+    # A library run shown the way a fresh generation is, without calling the API again
+    st.info(f"Reusing content generated for '{run['topic']}' on "
+            f"{datetime.fromtimestamp(run['created']):%Y-%m-%d %H:%M}")
+    for kind, heading in (("script", "Generated Script"), ("image_prompts", "Image Prompts"),
+                          ("thumbnails", "Thumbnail Ideas"), ("titles", "Video Titles"),
+                          ("description", "Video Description")):
+        st.subheader(heading)
+        st.write(run.get(kind) or "")
+    st.download_button(
+        label="Download Results as Text File",
+        data=format_results({kind: run.get(kind) or "" for kind in ("script", "image_prompts", "thumbnails",
+                                                                     "titles", "description")}),
+        file_name="results.txt",
+        mime="text/plain"
     )
-    titles = title_response.choices[0].message.content
-    description = description_response.choices[0].message.content
-    return titles, description
+
 
 # Streamlit App
 st.title("YouTube Content Creation Assistant")
+render_debug_panel()
+# Restores this session's spilled state and accounts its memory before anything reads it
+track_session()
 
 # API Key Input
 api_key = st.text_input("Enter your OpenAI API Key:", type="password")
-if api_key:
-    openai.api_key = api_key
-
-# User Inputs
-topic = st.text_input("Enter your video topic:")
-duration = st.selectbox("Select video duration (minutes):", [3, 5, 7, 10])
-style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous):")
-
-if st.button("Generate Content"):
-    if not api_key:
-        st.error("Please enter your OpenAI API key before proceeding.")
-    else:
-        with st.spinner("Generating script..."):
-            script = generate_script(topic, duration, style)
-            st.subheader("Generated Script")
-            st.write(script)
-
-        with st.spinner("Generating image prompts..."):
-            image_prompts = generate_image_prompts(script)
-            st.subheader("Image Prompts")
-            st.write(image_prompts)
-
-        with st.spinner("Generating thumbnail ideas..."):
-            thumbnails = generate_thumbnail_ideas(topic, script)
-            st.subheader("Thumbnail Ideas")
-            st.write(thumbnails)
-
-        with st.spinner("Generating video metadata..."):
-            titles, description = generate_video_metadata(topic, script)
-            st.subheader("Video Titles")
-            st.write(titles)
-
-            st.subheader("Video Description")
-            st.write(description)
-
-        # Save all results to a text file
-        results = f"Generated Script:\n{script}\n\nImage Prompts:\n{image_prompts}\n\nThumbnail Ideas:\n{thumbnails}\n\nVideo Titles:\n{titles}\n\nVideo Description:\n{description}"
-
-        # Display the download button for the results
-        st.download_button(
-            label="Download Results as Text File",
-            data=results,
-            file_name="results.txt",
-            mime="text/plain"
-        )
+# This key's pooled client; passed explicitly so sessions with different keys never mix
+client = get_client(api_key) if api_key else None
+# Every generated result is recorded here (CCSUITE_LIBRARY=off to disable)
+library = open_library()
+
+single_tab, batch_tab = st.tabs(["Single Topic", "Batch"])
+
+with single_tab:
+    # User Inputs
+    topic = st.text_input("Enter your video topic:")
+    duration = st.selectbox("Select video duration (minutes):", [3, 5, 7, 10])
+    style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous):")
+
+    # Close past matches can be reused instead of generating the whole video again
+    matches = library.similar_runs(topic, style, limit=3) if library is not None and topic else []
+    if matches:
+        with st.expander(f"Similar past videos ({len(matches)})"):
+            for match in matches:
+                text_col, button_col = st.columns([5, 1])
+                minutes = f"{match['duration']:g} min · " if match["duration"] else ""
+                text_col.write(f"**{match['topic']}** · {match['style'] or 'no style'} · {minutes}"
+                               f"{datetime.fromtimestamp(match['created']):%Y-%m-%d}")
+                if button_col.button("Reuse", key=f"reuse_{match['run_id']}"):
+                    st.session_state.reused_run = match["run_id"]
+
+    if st.button("Generate Content"):
+        st.session_state.reused_run = None
+        if not api_key:
+            st.error("Please enter your OpenAI API key before proceeding.")
+        else:
+            with st.spinner("Generating script..."):
+                st.subheader("Generated Script")
+                script_area = st.container()
+                section_slots = []
+
+                def show_section(index, total, text):
+                    # Long scripts arrive section by section, in whatever order they finish
+                    if not section_slots:
+                        section_slots.extend(script_area.empty() for _ in range(total))
+                    section_slots[index].write(text)
+
+                script = generate_script(topic, duration, style, client=client, on_section=show_section)
+                if not section_slots:
+                    script_area.write(script)
+
+            with st.spinner("Generating image prompts..."):
+                st.subheader("Image Prompts")
+                prompt_area = st.container()
+                image_prompts = generate_image_prompts(
+                    script,
+                    on_prompt=lambda item: prompt_area.write(f"**{item['section']}**: {item['prompt']}"),
+                    client=client
+                )
+
+            with st.spinner("Generating thumbnail ideas..."):
+                thumbnails = generate_thumbnail_ideas(topic, script, client=client)
+                st.subheader("Thumbnail Ideas")
+                st.write(thumbnails)
+
+            with st.spinner("Generating video metadata..."):
+                titles, description = generate_video_metadata(topic, script, client=client)
+                st.subheader("Video Titles")
+                st.write(titles)
+
+                st.subheader("Video Description")
+                st.write(description)
+
+            result = {
+                "topic": topic,
+                "duration": duration,
+                "style": style,
+                "script": script,
+                "image_prompts": image_prompts,
+                "thumbnails": thumbnails,
+                "titles": titles,
+                "description": description,
+            }
+            if library is not None:
+                remember_runs([library.record(result, source="NewCCSuite", models=artifact_models(duration))])
+
+            # Save all results to a text file
+            results = format_results(result)
+
+            # Display the download button for the results
+            st.download_button(
+                label="Download Results as Text File",
+                data=results,
+                file_name="results.txt",
+                mime="text/plain"
+            )
+    elif st.session_state.get("reused_run") and library is not None:
+        past_run = library.get_run(st.session_state.reused_run)
+        if past_run is not None:
+            show_past_run(past_run)
+
+with batch_tab:
+    render_batch_tab(api_key, library, "NewCCSuite")
 
 st.caption("Powered by OpenAI GPT-4 and Streamlit")
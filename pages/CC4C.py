@@ -1,9 +1,17 @@
-import requests
 import streamlit as st
 from datetime import datetime
-from io import BytesIO
 from zipfile import ZipFile
 import os, time
+from ccsuite import metrics
+from ccsuite.clients import get_client
+from ccsuite.debug_panel import render_debug_panel
+from ccsuite.downloads import download_all, url_filename
+from ccsuite.fileserver import file_link
+from ccsuite.jobqueue import FAILED, FINISHED, open_queue
+from ccsuite.leonardo import LeonardoError, SubmissionQueue, create_image, wait_for_generation
+from ccsuite.prompts import stream_image_prompts
+from ccsuite.sessions import track_session
+from ccsuite.workspace import session_run
 
 st.title("Leonardo.ai Batch Image Generator")
 
@@ -12,63 +20,45 @@ Leonardo_ai_API = st.text_input("Enter Leonardo API Key", type="password")
 st.sidebar.title("Instructions")
 st.sidebar.markdown("""
 - Enter Leonardo API key
-- Add prompts (separate with ====)
+- Add prompts (separate with ====), or paste a script
+  and stream prompts from it with an OpenAI key
 - Click Generate Images
 - Download individually or as ZIP
 """)
+render_debug_panel()
+# Restores this session's spilled state and accounts its memory before anything reads it
+track_session()
+# With CCSUITE_QUEUE set, generation runs in `python -m ccsuite.worker` processes
+job_queue = open_queue()
+
+
+prompt_source = st.radio("Prompt source", ["Paste prompts", "Stream prompts from script"], horizontal=True)
+
+if prompt_source == "Paste prompts":
+    prompts = st.text_area(
+        "Enter prompts (separate with ====)",
+        height=200,
+        placeholder="Prompt 1\n====\nPrompt 2\n====\nPrompt 3"
+    )
+else:
+    openai_api_key = st.text_input("Enter OpenAI API Key", type="password")
+    script = st.text_area("Paste the video script", height=200)
+
+
+def fetch_images(images, prompt, run_dir):
+    # Streams each image straight to a file in run_dir instead of holding it in memory
+    downloads = [(img['url'], os.path.join(run_dir, url_filename(img['url']))) for img in images]
+    fetched = []
+    for _, result, error in download_all(downloads):
+        if error:
+            st.error(str(error))
+            continue
+        fetched.append((result['path'], prompt))
+    return fetched
 
 
-def create_image(prompt, api_key):
-    url = "https://cloud.leonardo.ai/api/rest/v1/generations"
-    payload = {
-        "width": 1472,
-        "height": 832,
-        "modelId": "6b645e3a-d64f-4341-a6d8-7a3690fbf042",
-        "num_images": 2,
-        "prompt": prompt,
-        "ultra": False,
-        "styleUUID": "111dc692-d470-4eec-b791-3475abac4c46",
-        "enhancePrompt": False
-    }
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "authorization": f"Bearer {api_key}"
-    }
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error creating image: {str(e)}")
-        return None
-
-
-def get_images(generation_id, api_key):
-    url = f"https://cloud.leonardo.ai/api/rest/v1/generations/{generation_id}"
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {api_key}"
-    }
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error getting images: {str(e)}")
-        return None
-
-
-prompts = st.text_area(
-    "Enter prompts (separate with ====)",
-    height=200,
-    placeholder="Prompt 1\n====\nPrompt 2\n====\nPrompt 3"
-)
-
-if st.button("Generate Images") and Leonardo_ai_API:
-    prompt_list = [p.strip() for p in prompts.split('====') if p.strip()]
+def run_pasted_prompts(prompt_list, leonardo_api_key, run_dir):
     total_prompts = len(prompt_list)
-
     generated_images = []
     failed_prompts = []
 
@@ -78,35 +68,128 @@ if st.button("Generate Images") and Leonardo_ai_API:
     for idx, prompt in enumerate(prompt_list):
         status_text.write(f"Processing prompt {idx + 1}/{total_prompts}: {prompt[:50]}...")
 
-        result = create_image(prompt, Leonardo_ai_API)
-        if not result:
+        try:
+            result = create_image(prompt, leonardo_api_key)
+        except LeonardoError as e:
+            st.error(str(e))
             failed_prompts.append(prompt)
             continue
 
         generation_id = result['sdGenerationJob']['generationId']
 
-        # Wait for completion with timeout
-        start_time = time.time()
-        success = False
-
-        while time.time() - start_time < 60:  # 60 second timeout
-            status = get_images(generation_id, Leonardo_ai_API)
-            if status and status['generations_by_pk']['status'] == 'COMPLETE':
-                for img in status['generations_by_pk']['generated_images']:
-                    try:
-                        img_data = BytesIO(requests.get(img['url']).content)
-                        generated_images.append((img_data, prompt))
-                        success = True
-                    except:
-                        continue
-                break
-            time.sleep(2)
-
-        if not success:
+        # Wait for completion with timeout (webhook callback when enabled, else polls at the key's tuned interval)
+        try:
+            images = wait_for_generation(generation_id, leonardo_api_key, timeout=60)
+        except LeonardoError as e:
+            st.error(str(e))
+            images = []
+
+        fetched = fetch_images(images, prompt, run_dir)
+        generated_images.extend(fetched)
+
+        if not fetched:
             failed_prompts.append(prompt)
 
         progress_bar.progress((idx + 1) / total_prompts)
 
+    return generated_images, failed_prompts, status_text
+
+
+def run_streamed_prompts(script, leonardo_api_key, run_dir, client):
+    # Each prompt is submitted to Leonardo as soon as GPT finishes writing it
+    generated_images = []
+    failed_prompts = []
+    prompt_list = st.container()
+
+    with SubmissionQueue(leonardo_api_key) as queue:
+        with st.spinner("Streaming image prompts..."):
+            for idx, item in enumerate(stream_image_prompts(script, client=client)):
+                prompt_list.write(f"{idx + 1}. **{item['section']}** {item['prompt']}")
+                queue.submit(item['prompt'])
+
+        total_prompts = len(queue.futures)
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        for done, future in enumerate(queue.as_completed(), start=1):
+            try:
+                result = future.result()
+            except LeonardoError as e:
+                st.error(str(e))
+                failed_prompts.append(str(e))
+                continue
+            finally:
+                progress_bar.progress(done / total_prompts)
+
+            status_text.write(f"Completed prompt {done}/{total_prompts}: {result['prompt'][:50]}...")
+            generated_images.extend(fetch_images(result['images'], result['prompt'], run_dir))
+
+    return generated_images, failed_prompts, status_text
+
+
+def download_results(results, run_dir):
+    generated_images = []
+    failed_prompts = []
+    for result in results:
+        if result.get('error'):
+            st.error(result['error'])
+            failed_prompts.append(result['prompt'])
+            continue
+        generated_images.extend(fetch_images(result['images'], result['prompt'], run_dir))
+    return generated_images, failed_prompts
+
+
+def run_queued(job_id, run_dir):
+    # The job survives reruns and page reloads; this only watches it until a worker finishes it
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    while True:
+        job = job_queue.get(job_id)
+        progress = job['progress'] or {}
+        if progress.get('total'):
+            progress_bar.progress(progress['done'] / progress['total'])
+        status_text.write(f"Job {job_id[:8]} {job['status']}: {progress.get('done', 0)}/{progress.get('total', '?')} prompts")
+        if job['status'] in FINISHED:
+            break
+        time.sleep(1)
+
+    if job['status'] == FAILED:
+        st.error(f"Job failed: {job['error']}")
+        return [], [], status_text
+    generated_images, failed_prompts = download_results(job['result'], run_dir)
+    return generated_images, failed_prompts, status_text
+
+
+run_clicked = st.button("Generate Images") and Leonardo_ai_API
+if run_clicked and prompt_source == "Stream prompts from script" and not (openai_api_key and script.strip()):
+    st.error("Please enter your OpenAI API key and a script to stream prompts from.")
+    run_clicked = False
+
+outcome = None
+if run_clicked and job_queue is not None:
+    if prompt_source == "Paste prompts":
+        prompt_list = [p.strip() for p in prompts.split('====') if p.strip()]
+        st.session_state.cc4c_job = job_queue.enqueue(
+            "leonardo.images", {"prompts": prompt_list}, secrets={"leonardo_api_key": Leonardo_ai_API})
+    else:
+        st.session_state.cc4c_job = job_queue.enqueue(
+            "leonardo.script_images", {"script": script},
+            secrets={"leonardo_api_key": Leonardo_ai_API, "openai_api_key": openai_api_key})
+elif run_clicked:
+    # A fresh directory per run in this session's workspace; the previous run's files are released
+    run = session_run("cc4c_run", new=True)
+    if prompt_source == "Paste prompts":
+        prompt_list = [p.strip() for p in prompts.split('====') if p.strip()]
+        outcome = run_pasted_prompts(prompt_list, Leonardo_ai_API, run.path)
+    else:
+        outcome = run_streamed_prompts(script, Leonardo_ai_API, run.path, get_client(openai_api_key))
+
+if job_queue is not None and st.session_state.get("cc4c_job"):
+    run = session_run("cc4c_run", new=True)
+    outcome = run_queued(st.session_state.cc4c_job, run.path)
+    del st.session_state.cc4c_job
+
+if outcome is not None:
+    generated_images, failed_prompts, status_text = outcome
     status_text.write("✅ Processing complete!")
 
     if failed_prompts:
@@ -117,21 +200,15 @@ if st.button("Generate Images") and Leonardo_ai_API:
 
         # Display images in grid
         cols = st.columns(3)
-        for idx, (img_data, prompt) in enumerate(generated_images):
+        for idx, (path, prompt) in enumerate(generated_images):
             col = cols[idx % 3]
             with col:
-                st.image(img_data, caption=f"Prompt: {prompt[:30]}...", width=200)
-
-        # Create ZIP file
-        zip_buffer = BytesIO()
-        with ZipFile(zip_buffer, "w") as zip_file:
-            for idx, (img_data, prompt) in enumerate(generated_images):
-                zip_file.writestr(f"image_{idx + 1}.png", img_data.getvalue())
-
-        zip_buffer.seek(0)
-        st.download_button(
-            label="Download All Images (ZIP)",
-            data=zip_buffer,
-            file_name=f"leonardo_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-            mime="application/zip"
-        )
\ No newline at end of file
+                st.image(path, caption=f"Prompt: {prompt[:30]}...", width=200)
+
+        # ZIP is built on disk from the downloaded files, one chunk at a time
+        with metrics.span("zip.build"), run.atomic_write("leonardo_images.zip") as f, ZipFile(f, "w") as zip_file:
+            for idx, (path, prompt) in enumerate(generated_images):
+                zip_file.write(path, f"image_{idx + 1}.png")
+
+        file_link("Download All Images (ZIP)", run.file("leonardo_images.zip"),
+                  f"leonardo_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip", "application/zip")
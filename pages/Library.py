@@ -0,0 +1,89 @@
+import os
+from datetime import datetime
+import streamlit as st
+from ccsuite.debug_panel import render_debug_panel
+from ccsuite.library import KINDS, OWNED_KEY, can_delete, default_path, open_library
+from ccsuite.sessions import track_session
+
+st.title("Content Library")
+
+st.sidebar.title("About")
+st.sidebar.markdown("""
+- Every script, image prompt set, thumbnail idea list, title list and description the content pages generate
+- Search it by topic, style or any phrase in the text
+- Open a past run or compare one artifact across two runs
+""")
+render_debug_panel()
+track_session()
+
+library = open_library()
+if library is None:
+    st.info("The content library is switched off (CCSUITE_LIBRARY=off).")
+    st.stop()
+
+st.caption(f"{library.count()} runs in {default_path()}")
+
+
+def run_label(run):
+    return f"{run['topic']} · {run['style'] or 'no style'} · {datetime.fromtimestamp(run['created']):%Y-%m-%d %H:%M}"
+
+
+query = st.text_input("Search:", placeholder="Topic, style or any phrase")
+kind = st.selectbox("In:", ["everything"] + list(KINDS))
+
+if query:
+    hits = library.search(query, kind=None if kind == "everything" else kind)
+    if not hits:
+        st.caption("No matches.")
+    for hit in hits:
+        with st.container(border=True):
+            st.markdown(f"**{hit['topic']}** · {hit['kind']} · {hit['model'] or 'unknown model'} · "
+                        f"{datetime.fromtimestamp(hit['created']):%Y-%m-%d}")
+            st.markdown(hit["snippet"])
+            if st.button("Open", key=f"open_{hit['run_id']}_{hit['kind']}"):
+                st.session_state.library_run = hit["run_id"]
+    runs = {hit["run_id"]: hit for hit in hits}
+else:
+    runs = {run["id"]: run for run in library.recent(50)}
+
+selected = st.session_state.get("library_run")
+if selected:
+    run = library.get_run(selected)
+    if run is None:
+        st.session_state.library_run = None
+    else:
+        st.subheader(run["topic"])
+        st.caption(run_label(run) + (f" · {run['source']}" if run["source"] else ""))
+        for artifact in KINDS:
+            if run.get(artifact):
+                with st.expander(f"{artifact} ({run['models'].get(artifact) or 'unknown model'})"):
+                    st.text(run[artifact])
+        # Runs are shared by everyone on the deployment: only this session's own runs, or any with the admin token
+        owned = st.session_state.get(OWNED_KEY)
+        admin_token = None
+        if selected not in (owned or ()) and os.environ.get("CCSUITE_ADMIN_TOKEN"):
+            admin_token = st.text_input("Admin token to delete runs of other sessions:", type="password")
+        if can_delete(selected, owned, admin_token):
+            confirmed = st.checkbox("Yes, permanently delete this run", key=f"confirm_delete_{selected}")
+            if st.button("Delete this run", disabled=not confirmed):
+                library.delete_run(selected)
+                st.session_state.library_run = None
+                st.rerun()
+        else:
+            st.caption("Only runs generated in this browser session can be deleted.")
+
+st.subheader("Compare runs")
+choices = list(runs)
+if len(choices) < 2:
+    st.caption("Needs at least two runs in the list above.")
+else:
+    labels = {run_id: run_label(run) for run_id, run in runs.items()}
+    col_a, col_b, col_kind = st.columns([2, 2, 1])
+    run_a = col_a.selectbox("From:", choices, format_func=labels.get, key="diff_a")
+    run_b = col_b.selectbox("To:", choices, index=1, format_func=labels.get, key="diff_b")
+    diff_kind = col_kind.selectbox("Artifact:", KINDS, key="diff_kind")
+    diff = library.diff(run_a, run_b, diff_kind)
+    if diff:
+        st.code(diff, language="diff")
+    else:
+        st.caption("No differences.")
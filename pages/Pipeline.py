@@ -0,0 +1,72 @@
+import streamlit as st
+import os, time
+from datetime import datetime
+from ccsuite.clients import get_client
+from ccsuite.debug_panel import render_debug_panel
+from ccsuite.fileserver import file_link
+from ccsuite.pipeline import run_content_pipeline
+from ccsuite.sessions import track_session
+from ccsuite.workspace import session_run
+
+st.title("Script-to-Images Pipeline")
+
+st.sidebar.title("How it works")
+st.sidebar.markdown("""
+- Script, prompts, image submission, polling,
+  downloads, thumbnails and export all run at once
+- Images start generating while later prompts are still being written
+- Outputs are kept in this session's workspace and offered as downloads
+""")
+render_debug_panel()
+track_session()
+
+openai_api_key = st.text_input("Enter OpenAI API Key:", type="password")
+leonardo_api_key = st.text_input("Enter Leonardo API Key:", type="password")
+
+topic = st.text_input("Enter your video topic:")
+duration = st.slider("Select video duration (minutes):", min_value=1, max_value=10, value=5)
+style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous):")
+
+if st.button("Run Pipeline"):
+    if not openai_api_key or not leonardo_api_key:
+        st.error("Please enter both API keys before proceeding.")
+    elif not topic:
+        st.error("Please enter a topic.")
+    else:
+        # A fresh directory per run in this session's workspace; the previous run's files are released
+        run = session_run("pipeline_run", new=True)
+        out_dir = run.path
+        start_time = time.time()
+        pipeline = run_content_pipeline(topic, duration, style, out_dir, leonardo_api_key,
+                                        client=get_client(openai_api_key))
+
+        stage_status = st.empty()
+        script_area = st.expander("Generated Script", expanded=False)
+        prompt_area = st.expander("Image Prompts", expanded=True)
+        st.subheader("Images")
+        cols = st.columns(3)
+        shown = 0
+
+        for stage, kind, payload in pipeline.iter_events():
+            if kind == "error":
+                st.error(f"{stage}: {payload}")
+            elif kind == "item" and stage == "script":
+                script_area.write(payload["script"])
+            elif kind == "item" and stage == "prompts":
+                prompt_area.write(f"{payload['prompt_index']}. **{payload['section']}** {payload['prompt']}")
+            elif kind == "item" and stage == "export":
+                with cols[shown % 3]:
+                    st.image(payload["thumbnail"], caption=payload["section"][:30])
+                shown += 1
+            stage_status.write(" → ".join(f"{name}: {count}" for name, count in pipeline.counts.items()))
+
+        pipeline.join()
+        st.success(f"✅ Pipeline finished in {time.time() - start_time:.1f}s.")
+
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if os.path.exists(run.file("images.zip")):
+            file_link("Download All Images (ZIP)", run.file("images.zip"), f"pipeline_images_{stamp}.zip", "application/zip")
+        if os.path.exists(run.file("manifest.csv")):
+            file_link("Download Manifest (CSV)", run.file("manifest.csv"), f"pipeline_manifest_{stamp}.csv", "text/csv")
+        if os.path.exists(run.file("script.txt")):
+            file_link("Download Script", run.file("script.txt"), f"pipeline_script_{stamp}.txt", "text/plain")
@@ -0,0 +1,71 @@
+import hmac
+import os
+import streamlit as st
+from ccsuite import sessions
+from ccsuite.debug_panel import render_debug_panel
+
+st.title("Session Memory")
+
+st.sidebar.title("About")
+st.sidebar.markdown(f"""
+- Approximate memory held in session state, per browser session and per state key
+- Sessions idle {sessions.SPILL_IDLE // 60} min are spilled to disk and restored on their next interaction
+- Sessions idle {sessions.EVICT_IDLE // 3600} h are cleared
+- Above {sessions.HIGH_WATERMARK // 2 ** 20} MB in total, the least recently used sessions are spilled first
+""")
+render_debug_panel()
+
+# Set CCSUITE_ADMIN_TOKEN to keep this page from other users of a shared deployment
+admin_token = os.environ.get("CCSUITE_ADMIN_TOKEN")
+if admin_token and not hmac.compare_digest(st.text_input("Admin token:", type="password"), admin_token):
+    st.stop()
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def process_rss():
+    # Resident memory of this process on Linux; None elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+if sessions.disabled():
+    st.warning(f"Spill and eviction are off in this process ({sessions.disabled()}); "
+               "ccsuite.sessions does not match the installed Streamlit version.")
+
+if st.button("Apply idle limits now"):
+    # The same check pages run at most every CHECK_INTERVAL seconds, without waiting for the next one
+    spilled, evicted = sessions.enforce(force=True)
+    st.success(f"Spilled {spilled} and cleared {evicted} sessions")
+
+rows = sessions.summary()
+memory = sum(row["memory_bytes"] for row in rows)
+spilled = sum(row["spilled_bytes"] for row in rows)
+rss = process_rss()
+
+cols = st.columns(4)
+cols[0].metric("Sessions", len(rows))
+cols[1].metric("Session state", format_bytes(memory))
+cols[2].metric("Spilled to disk", format_bytes(spilled))
+cols[3].metric("Process RSS", format_bytes(rss) if rss is not None else "n/a")
+st.progress(min(memory / sessions.HIGH_WATERMARK, 1.0),
+            text=f"{format_bytes(memory)} of the {format_bytes(sessions.HIGH_WATERMARK)} high watermark")
+
+st.subheader("Sessions")
+if rows:
+    st.dataframe(rows, use_container_width=True)
+else:
+    st.caption("No sessions tracked yet.")
+
+st.subheader("By state key")
+totals = sessions.key_totals()
+if totals:
+    st.dataframe(totals, use_container_width=True)
@@ -1,11 +1,10 @@
 import streamlit as st
 import json
-import openai
-import gspread
 import smtplib
 import os
 from email.mime.text import MIMEText
-from oauth2client.service_account import ServiceAccountCredentials
+from ccsuite.blueprint import FAILED, RAN, REUSED, SKIPPED, Blueprint, BlueprintError
+from ccsuite.debug_panel import render_debug_panel
 
 # Single SMTP configuration (removed duplicates)
 SMTP_SERVER = "localhost"
@@ -56,49 +55,21 @@ def load_blueprint(file_path="blueprint1.json"):
         return None
 
 
-# Google Sheets Authentication
-def authenticate_google_sheets(credentials_file, sheet_name):
-    try:
-        # Check if credentials file exists
-        if not os.path.exists(credentials_file):
-            st.error(f"❌ Google Sheets credentials file not found: {credentials_file}")
-            return None
-
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
-        client = gspread.authorize(creds)
-        return client.open(sheet_name).sheet1
-    except Exception as e:
-        st.error(f"❌ Google Sheets authentication failed: {e}")
-        return None
-
-
-# AI Recommendation
-def generate_ai_recommendation(api_key, inquiry):
-    try:
-        openai.api_key = api_key
-        prompt = f"User Inquiry: {inquiry}. Generate a short, personalized recommendation."
-
-        response = openai.chat.completions.create(
-            model="gpt-4-turbo",
-            messages=[{"role": "system", "content": "You are a helpful assistant."},
-                      {"role": "user", "content": prompt}]
-        )
-
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"❌ Failed to generate AI recommendation: {e}")
-        return "Unable to generate recommendation at this time."
-
-
 # Streamlit UI
 st.title("🚀 AI-Powered Form Execution from Blueprint.json")
+render_debug_panel()
 
 # Load Blueprint
 blueprint = load_blueprint()
 
 # Only proceed if blueprint loaded successfully
 if blueprint:
+    try:
+        engine = Blueprint(blueprint)
+    except BlueprintError as e:
+        st.error(f"❌ {e}")
+        engine = None
+
     # Try to extract form fields from the blueprint
     try:
         form_node = next((node for node in blueprint["nodes"] if node["type"] == "trigger"), None)
@@ -131,98 +102,62 @@ if blueprint:
         submit_button = st.form_submit_button("Submit")
 
     # On Submit, Process the Automation
-    if submit_button:
+    if submit_button and engine is not None:
         st.info("✅ Processing Submission...")
 
-        # Save to Google Sheets
-        google_sheet_node = next((node for node in blueprint["nodes"] if node["type"] == "google_sheets"), None)
-        if google_sheet_node:
-            sheet = authenticate_google_sheets("credentials.json", google_sheet_node["config"]["sheetName"])
-            if sheet:
-                try:
-                    # Make sure all required fields exist
-                    if all(field in form_data for field in ["Full Name", "Email", "Inquiry"]):
-                        sheet.append_row([form_data["Full Name"], form_data["Email"], form_data["Inquiry"]])
-                        st.success("📌 Data saved to Google Sheets")
-                    else:
-                        st.error("❌ Missing required form fields for Google Sheets")
-                except Exception as e:
-                    st.error(f"❌ Failed to save to Google Sheets: {e}")
-        else:
-            st.warning("⚠️ Google Sheets node not found in Blueprint.json")
-
-        # Generate AI Recommendation
-        ai_node = next((node for node in blueprint["nodes"] if node["type"] == "openai_api"), None)
-
-        # Initialize ai_recommendation variable to avoid NameError later
-        ai_recommendation = ""
-
-        if ai_node:
-            try:
-                # Try to get API key from secrets
-                try:
-                    api_key = st.secrets["OPENAI_API_KEY"]
-                except Exception as e:
-                    st.error(f"❌ Error accessing OpenAI API key: {e}")
-                    api_key = ""
-
-                if api_key and "Inquiry" in form_data:
-                    ai_recommendation = generate_ai_recommendation(api_key, form_data["Inquiry"])
-                    st.subheader("📌 AI Recommendation")
-                    st.write(ai_recommendation)
-                else:
-                    st.error("🚨 Missing OpenAI API key or inquiry text")
-            except Exception as e:
-                st.error(f"🚨 Error generating AI recommendation: {e}")
-        else:
-            st.error("🚨 AI recommendation node missing in Blueprint.json")
-            # For testing purposes, you might want to continue with a placeholder
-            ai_recommendation = "No AI recommendation available - node missing in Blueprint.json"
-
-        # Send Email
-        email_node = next((node for node in blueprint["nodes"] if node["type"] == "email"), None)
-        if email_node:
-            try:
-                email_body = email_node["config"]["body"]
-
-                # Replace placeholders in email body only if they exist in form_data
-                for placeholder, field in [
-                    ("{{Full Name}}", "Full Name"),
-                    ("{{Inquiry}}", "Inquiry")
-                ]:
-                    if field in form_data:
-                        email_body = email_body.replace(placeholder, form_data[field])
-
-                # Replace AI recommendation placeholder
-                email_body = email_body.replace("{{AI_Recommendation}}", ai_recommendation)
-
-                # Try to get email credentials from secrets
-                # For local development, just use the email from the form
-                to_email = form_data.get("Email", st.secrets["EMAIL_ADDRESS"])
-                # Add a placeholder if email is empty
-                if not to_email or to_email.strip() == "":
-                    to_email = st.secrets["EMAIL_ADDRESS"]
-
-                    # Instead of sending, display the email content as a draft for copy/paste
-                    st.subheader("📧 Email Draft")
-                    st.write("**To:** " + to_email)
-                    st.write("**From:** " + email_node["config"]["fromEmail"])
-                    st.write("**Subject:** " + email_node["config"]["subject"])
-                    st.write("**Body:**")
-                    st.text_area("Email Body (Copy/Paste)", email_body, height=250)
-                    st.success("✅ Email draft created! You can copy and paste the content.")
-                else:
-                    st.error("❌ No recipient email address found")
-            except Exception as e:
-                st.error(f"❌ Error processing email node: {e}")
-            else:
-                st.warning("⚠️ No Email node found in Blueprint.json")
-        else:
-            st.error("Please create a valid Blueprint.json file before continuing.")
-
-            # Display example blueprint structure
-            with st.expander("Example Blueprint.json Structure"):
-                st.code('''{
+        context = {"credentials_file": "credentials.json"}
+        try:
+            context["openai_api_key"] = st.secrets["OPENAI_API_KEY"]
+        except Exception as e:
+            st.error(f"❌ Error accessing OpenAI API key: {e}")
+        try:
+            # Used when the form has no email address
+            context["fallback_email"] = st.secrets["EMAIL_ADDRESS"]
+        except Exception:
+            pass
+
+        results = {result.node.type: result for result in engine.run(form_data, context)}
+        for node_type, missing in [("google_sheets", "⚠️ Google Sheets node not found in Blueprint.json"),
+                                   ("openai_api", "🚨 AI recommendation node missing in Blueprint.json"),
+                                   ("email", "⚠️ No Email node found in Blueprint.json")]:
+            if node_type not in results:
+                st.warning(missing)
+            elif results[node_type].status in (FAILED, SKIPPED):
+                st.error(f"❌ {results[node_type].node.name}: {results[node_type].error}")
+
+        if results.get("google_sheets") and results["google_sheets"].status in (RAN, REUSED):
+            st.success("📌 Data saved to Google Sheets")
+
+        if results.get("openai_api") and results["openai_api"].outputs:
+            st.subheader("📌 AI Recommendation")
+            st.write(results["openai_api"].outputs["AI_Recommendation"])
+
+        if results.get("email") and results["email"].outputs:
+            draft = results["email"].outputs["email_draft"]
+            # Instead of sending, display the email content as a draft for copy/paste
+            st.subheader("📧 Email Draft")
+            st.write("**To:** " + draft["to"])
+            st.write("**From:** " + draft["from"])
+            st.write("**Subject:** " + draft["subject"])
+            st.write("**Body:**")
+            st.text_area("Email Body (Copy/Paste)", draft["body"], height=250)
+            st.success("✅ Email draft created! You can copy and paste the content.")
+
+        with st.expander("Node runs"):
+            # cached: same inputs as an earlier submission; reused: this submission already ran the node
+            st.dataframe([{
+                "node": result.node.name,
+                "type": result.node.type,
+                "cost": result.node.cost,
+                "status": result.status,
+                "ms": round(result.seconds * 1000, 1),
+            } for result in results.values()], use_container_width=True)
+else:
+    st.error("Please create a valid Blueprint.json file before continuing.")
+
+    # Display example blueprint structure
+    with st.expander("Example Blueprint.json Structure"):
+        st.code('''{
               "id": "form-automation-blueprint",
               "name": "Form Automation Blueprint",
               "nodes": [
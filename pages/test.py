@@ -1,26 +1,32 @@
 
-import openai
 import streamlit as st
-
-def generate_script(topic, duration, style):
+from ccsuite import metrics
+from ccsuite.batch_tab import render_batch_tab
+from ccsuite.clients import get_client
+from ccsuite.content import generate_thumbnail_ideas, generate_video_metadata
+from ccsuite.context import script_digest
+from ccsuite.library import open_library, remember_runs
+from ccsuite.llm import chat
+from ccsuite.longform import LONG_FORM_MINUTES, WORDS_PER_MINUTE, generate_long_script
+from ccsuite.debug_panel import render_debug_panel
+
+def generate_script(topic, duration, style, client, on_section=None):
+    if duration >= LONG_FORM_MINUTES:
+        return generate_long_script(topic, duration, style, client=client, on_section=on_section)
     prompt = (
-        f"You are a professional scriptwriter for YouTube videos. Based on the following inputs, generate a {duration}-minute script at a normal speaking pace (~750 words).\n"
+        f"You are a professional scriptwriter for YouTube videos. Based on the following inputs, generate a {duration}-minute script at a normal speaking pace (~{duration * WORDS_PER_MINUTE} words).\n"
         f"The tone and style must match the provided description. Break the script into sections with appropriate headings for clarity.\n"
         f"- Topic: {topic}\n"
         f"- Style: {style}\n"
         f"Ensure the script flows smoothly, keeping viewers engaged from start to finish."
     )
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1500
-    )
-    return response.choices[0].message.content
+    return chat(client, "script", "gpt-4o", prompt, 1500)
 
 
-def generate_image_prompts(script):
+def generate_image_prompts(script, client):
     prompt = (
-        f"Generate image prompts for this script, pre-formatted with ==== between EACH prompt (not sections):\n{script}\n"
+        f"Generate image prompts for this script outline, pre-formatted with ==== between EACH prompt (not sections):\n"
+        f"{script_digest(script, 'image_prompts')}\n"
         "Required for each section:\n"
         "INTRO: 2 prompts\n"
         "MAIN SECTIONS: 5 prompts each\n"
@@ -29,66 +35,12 @@ def generate_image_prompts(script):
         "Format Example:\n"
         "prompt1====\nprompt2====\nprompt3"
     )
-    response = openai.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1500
-    )
-    return response.choices[0].message.content
-
-
-def generate_thumbnail_ideas(topic, script):
-    prompt = (
-        "You are an expert in creating catchy YouTube thumbnails. Based on the provided topic and script, suggest 3-5 thumbnail ideas that are engaging, visually appealing, and optimized for clicks.\n"
-        "- Use a few bold words (e.g., 'MUST SEE,' 'SHOCKING FACTS').\n"
-        "- Include emojis if relevant.\n"
-        "- Suggest a brief visual description (e.g., 'A polar bear on thin ice with dramatic lighting').\n"
-        f"Topic: {topic}\n"
-        f"Script: {script}\n"
-        "Output each idea on a new line."
-    )
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500
-    )
-    return response.choices[0].message.content
-
-def generate_video_metadata(topic, script):
-    title_prompt = (
-        "You are a YouTube video title expert. Based on the following topic and script, suggest 3 click-worthy titles that are concise, engaging, and optimized for SEO.\n"
-        f"- Topic: {topic}\n"
-        f"- Script: {script}\n"
-        "Output the titles in a numbered list."
-    )
-    description_prompt = (
-        "You are an expert at writing YouTube video descriptions. Based on the following topic and script, write a compelling description optimized for SEO.\n"
-        "Include:\n"
-        "- A summary of the video.\n"
-        "- Keywords related to the topic.\n"
-        "- A call to action (e.g., 'Subscribe for more!').\n"
-        f"Topic: {topic}\n"
-        f"Script: {script}\n"
-        "Output the description as a paragraph."
-    )
-    title_response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": title_prompt}],
-        max_tokens=200
-    )
-    description_response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": description_prompt}],
-        max_tokens=300
-    )
-    titles = title_response.choices[0].message.content
-    description = description_response.choices[0].message.content
-    return titles, description
-
+    return chat(client, "image_prompts", "gpt-4", prompt, 1500)
 
 
 # Streamlit App
 st.title("YouTube Content Creation Assistant")
+render_debug_panel()
 
 # Embed Elfsight widget
 st.markdown(
@@ -103,57 +55,84 @@ st.markdown(
 
 # API Key Input
 api_key = st.text_input("Enter your OpenAI API Key:", type="password")
-if api_key:
-    openai.api_key = api_key
-
-# User Inputs
-topic = st.text_input("Enter your video topic:")
-duration = st.slider("Select video duration (minutes):", min_value=1, max_value=10, value=5)
-style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous):")
-
-
-
-if st.button("Generate Content"):
-    st.markdown("""
-        <script src="https://static.elfsight.com/platform/platform.js" async></script>
-        <div class="elfsight-app-094aef79-ae3d-4e33-bbac-e8950bde7316" data-elfsight-app-lazy></div>
-    """, unsafe_allow_html=True)
-
-    if not api_key:
-        st.error("Please enter your OpenAI API key before proceeding.")
-    else:
-        with st.spinner("Generating script..."):
-            script = generate_script(topic, duration, style)
-            st.subheader("Generated Script")
-            st.write(script)
-
-        with st.spinner("Generating image prompts..."):
-            image_prompts = generate_image_prompts(script)
-            st.subheader("Image Prompts")
-            st.write(image_prompts)
-
-        with st.spinner("Generating thumbnail ideas..."):
-            thumbnails = generate_thumbnail_ideas(topic, script)
-            st.subheader("Thumbnail Ideas")
-            st.write(thumbnails)
-
-        with st.spinner("Generating video metadata..."):
-            titles, description = generate_video_metadata(topic, script)
-            st.subheader("Video Titles")
-            st.write(titles)
-
-            st.subheader("Video Description")
-            st.write(description)
-
-        # Save all results to a text file
-        results = f"Generated Script:\n{script}\n\nImage Prompts:\n{image_prompts}\n\nThumbnail Ideas:\n{thumbnails}\n\nVideo Titles:\n{titles}\n\nVideo Description:\n{description}"
-
-        # Display the download button for the results
-        st.download_button(
-            label="Download Results as Text File",
-            data=results,
-            file_name="results.txt",
-            mime="text/plain"
-        )
+client = get_client(api_key) if api_key else None
+library = open_library()
+
+single_tab, batch_tab = st.tabs(["Single Topic", "Batch"])
+
+with single_tab:
+    # User Inputs
+    topic = st.text_input("Enter your video topic:")
+    duration = st.slider("Select video duration (minutes):", min_value=1, max_value=10, value=5)
+    style = st.text_area("Describe your style (e.g., Casual, Educational, Humorous):")
+
+
+
+    if st.button("Generate Content"):
+        st.markdown("""
+            <script src="https://static.elfsight.com/platform/platform.js" async></script>
+            <div class="elfsight-app-094aef79-ae3d-4e33-bbac-e8950bde7316" data-elfsight-app-lazy></div>
+        """, unsafe_allow_html=True)
+
+        if not api_key:
+            st.error("Please enter your OpenAI API key before proceeding.")
+        else:
+            with st.spinner("Generating script..."), metrics.span("page.stage", stage="script"):
+                st.subheader("Generated Script")
+                script_area = st.container()
+                section_slots = []
+
+                def show_section(index, total, text):
+                    # Long scripts arrive section by section, in whatever order they finish
+                    if not section_slots:
+                        section_slots.extend(script_area.empty() for _ in range(total))
+                    section_slots[index].write(text)
+
+                script = generate_script(topic, duration, style, client, on_section=show_section)
+                if not section_slots:
+                    script_area.write(script)
+
+            with st.spinner("Generating image prompts..."), metrics.span("page.stage", stage="image_prompts"):
+                image_prompts = generate_image_prompts(script, client)
+                st.subheader("Image Prompts")
+                st.write(image_prompts)
+
+            with st.spinner("Generating thumbnail ideas..."), metrics.span("page.stage", stage="thumbnails"):
+                thumbnails = generate_thumbnail_ideas(topic, script, client=client)
+                st.subheader("Thumbnail Ideas")
+                st.write(thumbnails)
+
+            with st.spinner("Generating video metadata..."), metrics.span("page.stage", stage="metadata"):
+                titles, description = generate_video_metadata(topic, script, client=client)
+                st.subheader("Video Titles")
+                st.write(titles)
+
+                st.subheader("Video Description")
+                st.write(description)
+
+            if library is not None:
+                run_id = library.record(
+                    {"topic": topic, "duration": duration, "style": style, "script": script,
+                     "image_prompts": image_prompts, "thumbnails": thumbnails, "titles": titles,
+                     "description": description},
+                    source="test",
+                    models={"script": "gpt-4o", "image_prompts": "gpt-4", "thumbnails": "gpt-4o", "titles": "gpt-4o",
+                            "description": "gpt-4o"}
+                )
+                remember_runs([run_id])
+
+            # Save all results to a text file
+            results = f"Generated Script:\n{script}\n\nImage Prompts:\n{image_prompts}\n\nThumbnail Ideas:\n{thumbnails}\n\nVideo Titles:\n{titles}\n\nVideo Description:\n{description}"
+
+            # Display the download button for the results
+            st.download_button(
+                label="Download Results as Text File",
+                data=results,
+                file_name="results.txt",
+                mime="text/plain"
+            )
+
+with batch_tab:
+    render_batch_tab(api_key, library, "test")
 
 st.caption("Powered by OpenAI GPT-4 and Streamlit")
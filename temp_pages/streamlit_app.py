@@ -1,5 +1,9 @@
+import io
 import streamlit as st
 import json
+from ccsuite.associations import open_store
+from ccsuite.fileserver import file_link
+from ccsuite.workspace import session_run
 
 # Set up the sidebar menu
 st.sidebar.title("Cazie's Toolbox")
@@ -23,12 +27,52 @@ if menu_option == "Create Associations":
     st.title("Create Associations")
     st.write("Use memory palace technique to store associations.")
 
+    store = open_store()
+
+    # Item prefixes come from the index, then full-text matches in any field
+    query = st.text_input("Find an association:", placeholder="Start typing an item, image or locus")
+    if query:
+        matches = {row["id"]: row for row in store.lookup(query) + store.search(query)}
+        if matches:
+            st.dataframe([{k: row[k] for k in ("item", "association", "locus")} for row in matches.values()],
+                         use_container_width=True)
+        else:
+            st.caption("No matches.")
+
     # Input form for associations
-    association = st.text_input("Enter something to associate:")
-    if association:
-        # You could save this to a file or JSON
-        st.write(f"Stored: {association}")
-        download_content({"association": association}, "association_data")
+    with st.form("add_association", clear_on_submit=True):
+        association = st.text_input("Enter something to associate:")
+        image = st.text_input("Image or story that stands for it:")
+        locus = st.text_input("Locus (place in your memory palace):")
+        if st.form_submit_button("Store") and association:
+            if store.add(association, image, locus):
+                st.success(f"Stored: {association}")
+            else:
+                st.info(f"Already stored: {association}")
+
+    st.caption(f"{store.count()} associations stored")
+
+    with st.expander("Import / export"):
+        uploaded = st.file_uploader("JSONL file (one association per line) or JSON download:", type=["jsonl", "json"])
+        if uploaded is not None and st.button("Import"):
+            text = io.TextIOWrapper(uploaded, encoding="utf-8-sig")
+            try:
+                if uploaded.name.lower().endswith(".json"):
+                    added, skipped = store.import_json(text)
+                else:
+                    added, skipped = store.import_jsonl(text)
+            except ValueError as e:
+                st.error(f"Could not read {uploaded.name}: {e}")
+                st.stop()
+            st.success(f"Imported {added} associations ({skipped} duplicates or unreadable lines skipped)")
+
+        # Written only when asked for, not serialized again on every rerun
+        if st.button("Prepare JSONL export"):
+            export_path = session_run("association_run", new=True).file("associations.jsonl")
+            store.export_file(export_path)
+            st.session_state.association_export = export_path
+        if st.session_state.get("association_export"):
+            file_link("Download as JSONL", st.session_state.association_export, mime="application/jsonl")
 
 elif menu_option == "Business Apps":
     st.title("Business Apps")
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from ccsuite.associations import AssociationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssociationStore(str(tmp_path / "associations.db"))
+
+
+def test_add_lookup_and_duplicates(store):
+    assert store.add("Rome", "a wolf nursing twins", "kitchen")
+    assert not store.add(" rome ", "a wolf nursing twins")
+    assert store.add("Rosetta Stone", "three scripts on a slab", "hall")
+    assert [row["item"] for row in store.lookup("RO")] == ["Rome", "Rosetta Stone"]
+    assert [row["item"] for row in store.lookup("rom")] == ["Rome"]
+    assert store.lookup("   ") == []
+    with pytest.raises(ValueError):
+        store.add("  ")
+
+
+def test_search_prefix_and_fields(store):
+    store.add("Rome", "a wolf nursing twins", "kitchen")
+    store.add("Paris", "tower of cheese", "kitchen door")
+    assert [row["item"] for row in store.search("wol")] == ["Rome"]
+    assert {row["item"] for row in store.search("kitch")} == {"Rome", "Paris"}
+    # User input is never taken as FTS syntax
+    assert [row["item"] for row in store.search('tower" (')] == ["Paris"]
+    assert store.search("") == []
+
+
+def test_delete_removes_from_index(store):
+    store.add("Rome", "wolf")
+    store.delete(store.lookup("rome")[0]["id"])
+    assert store.search("wolf") == [] and store.count() == 0
+
+
+def test_jsonl_round_trip(store, tmp_path):
+    lines = [json.dumps({"item": f"item {i}", "association": f"image {i}", "locus": "hall"}) for i in range(2500)]
+    lines += ["", "not json", json.dumps({"locus": "no item"}), json.dumps(["a list"]), lines[0]]
+    assert store.import_jsonl(io.StringIO("\n".join(lines) + "\n")) == (2500, 4)
+
+    path = str(tmp_path / "export.jsonl")
+    assert store.export_file(path) == 2500
+    copy = AssociationStore(str(tmp_path / "copy.db"))
+    with open(path, encoding="utf-8") as f:
+        assert copy.import_jsonl(f) == (2500, 0)
+    row = copy.lookup("item 1234")[0]
+    assert (row["association"], row["locus"]) == ("image 1234", "hall")
+
+
+def test_old_indented_download_imports(store, tmp_path):
+    # What download_content() wrote before the store existed
+    path = tmp_path / "association_data.json"
+    path.write_text(json.dumps({"association": "Rome"}, indent=4), encoding="utf-8")
+
+    with open(path, encoding="utf-8") as f:
+        assert store.import_jsonl(f) == (1, 0)
+    with open(path, encoding="utf-8") as f:
+        assert store.import_json(f) == (0, 1)
+    assert store.lookup("rome")[0]["item"] == "Rome"
+
+
+def test_json_list_document(store):
+    data = json.dumps([{"item": "a", "association": "x"}, {"item": "b"}], indent=2)
+    assert store.import_jsonl(io.BytesIO(data.encode("utf-8"))) == (2, 0)
@@ -0,0 +1,18 @@
+import logging
+
+from ccsuite.batch import DEFAULT_DURATION, parse_topic_rows, parse_topics_text
+
+
+def test_csv_rows_carry_duration_and_style():
+    jobs = parse_topics_text("topic,duration,style\nBees,3,Funny\n,4,Calm\nAnts,,\n", duration=7)
+    assert jobs == [{"topic": "Bees", "duration": 3, "style": "Funny"},
+                    {"topic": "Ants", "duration": 7, "style": "Educational"}]
+
+
+def test_bad_durations_fall_back_to_the_default(caplog):
+    rows = [{"Topic": "Bees", "Duration": "5 min"}, {"topic": "Ants", "duration": "-2"},
+            {"topic": "Owls", "duration": "2.5"}, {"topic": "Cats", "duration": "nan"}]
+    with caplog.at_level(logging.WARNING, logger="ccsuite.batch"):
+        jobs = parse_topic_rows(rows)
+    assert [job["duration"] for job in jobs] == [DEFAULT_DURATION, DEFAULT_DURATION, 2, DEFAULT_DURATION]
+    assert [record.fields["topic"] for record in caplog.records] == ["Bees", "Ants", "Cats"]
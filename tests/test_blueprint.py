@@ -0,0 +1,107 @@
+import uuid
+
+import pytest
+
+from bench.fakes import FakeOpenAI
+from ccsuite import blueprint
+from ccsuite.blueprint import CACHED, FAILED, RAN, REUSED, Blueprint, GoogleSheetsAppend, Node
+
+SPEC = {
+    "id": "test-blueprint",
+    "nodes": [
+        {"id": "email1", "type": "email", "config": {"body": "Hello {{Full Name}},\n{{AI_Recommendation}}"}},
+        {"id": "form1", "type": "trigger",
+         "config": {"fields": [{"name": "Full Name"}, {"name": "Email"}, {"name": "Inquiry"}]}},
+        {"id": "sheet1", "type": "google_sheets", "config": {"sheetName": "Leads"}},
+        {"id": "ai1", "type": "openai_api", "config": {"model": "gpt-4-turbo"}},
+    ],
+}
+
+
+class FakeSheet:
+    def __init__(self):
+        self.rows = []
+        self.fail = False
+
+    def append_row(self, row):
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        self.rows.append(row)
+
+
+@pytest.fixture
+def env(monkeypatch):
+    sheet = FakeSheet()
+    monkeypatch.setattr(GoogleSheetsAppend, "_sheet", lambda self, credentials_file: sheet)
+    monkeypatch.delenv("CCSUITE_QUEUE", raising=False)
+    blueprint.memo.clear()
+    blueprint.journal.clear()
+    with FakeOpenAI(first_token_latency=0, token_latency=0) as fake:
+        monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+        # A fresh key per test, so no pooled client points at an earlier fake server
+        yield sheet, fake, {"openai_api_key": uuid.uuid4().hex}
+
+
+def form(inquiry="Which camera should I buy?", **fields):
+    return dict({"Full Name": "Ada", "Email": "ada@example.com", "Inquiry": inquiry}, **fields)
+
+
+def statuses(results):
+    return {result.node.id: result.status for result in results}
+
+
+def test_nodes_wait_for_what_they_read(env):
+    sheet, fake, context = env
+    results = Blueprint(SPEC).run(form(), context)
+    assert [result.node.id for result in results] == ["form1", "ai1", "email1", "sheet1"]
+    assert set(statuses(results).values()) == {RAN}
+    assert "Hello Ada" in results[2].outputs["email_draft"]["body"]
+    assert sheet.rows == [["Ada", "ada@example.com", "Which camera should I buy?"]]
+
+
+def test_memo_shares_recommendations_across_submissions(env):
+    sheet, fake, context = env
+    engine = Blueprint(SPEC)
+    engine.run(form(), context)
+    calls = fake.requests
+    results = engine.run(form("  Which camera   should I buy? ", **{"Full Name": "Grace"}), context)
+    assert statuses(results)["ai1"] == CACHED
+    assert statuses(results)["sheet1"] == RAN
+    assert fake.requests == calls
+    assert len(sheet.rows) == 2
+
+
+def test_journal_reuses_a_retried_submission(env):
+    sheet, fake, context = env
+    engine = Blueprint(SPEC)
+    engine.run(form(), context)
+    results = engine.run(form(), context)
+    assert set(statuses(results).values()) == {REUSED}
+    assert len(sheet.rows) == 1
+
+
+def test_failed_nodes_run_again_on_retry(env):
+    sheet, fake, context = env
+    engine = Blueprint(SPEC)
+    sheet.fail = True
+    results = engine.run(form(), context)
+    assert statuses(results)["sheet1"] == FAILED
+    sheet.fail = False
+    results = engine.run(form(), context)
+    assert statuses(results) == {"form1": REUSED, "ai1": REUSED, "email1": REUSED, "sheet1": RAN}
+    assert len(sheet.rows) == 1
+
+
+def test_empty_form_fields_are_still_appended(env):
+    sheet, fake, context = env
+    results = Blueprint(SPEC).run(form(**{"Full Name": ""}), context)
+    assert statuses(results)["sheet1"] == RAN
+    assert sheet.rows == [["", "ada@example.com", "Which camera should I buy?"]]
+
+
+def test_node_types_must_implement_run():
+    class Incomplete(Node):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete({"type": "incomplete"})
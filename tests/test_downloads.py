@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ccsuite.downloads import DownloadError, download_to_file
+
+# Several download chunks long, so a dropped connection leaves part of it on disk
+IMAGE = bytes(range(256)) * 400
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    # /gzip serves the image gzip-encoded; /flaky drops the first connection half way
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("Range"))
+        if self.path == "/gzip":
+            body = gzip.compress(IMAGE)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        start = int(self.headers["Range"][len("bytes="):-1]) if self.headers.get("Range") else 0
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(IMAGE) - start))
+        self.end_headers()
+        if len(self.server.requests) == 1:
+            self.wfile.write(IMAGE[:len(IMAGE) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(IMAGE[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(httpd, path):
+    return "http://127.0.0.1:%d%s" % (httpd.server_address[1], path)
+
+
+def test_encoded_responses_are_not_checked_against_content_length(server, tmp_path):
+    path = str(tmp_path / "image.png")
+    result = download_to_file(url(server, "/gzip"), path, sha256=hashlib.sha256(IMAGE).hexdigest(), retries=0)
+    assert result["bytes"] == len(IMAGE)
+    with open(path, "rb") as f:
+        assert f.read() == IMAGE
+
+
+def test_dropped_connections_resume_with_a_range_request(server, tmp_path):
+    path = str(tmp_path / "image.png")
+    result = download_to_file(url(server, "/flaky"), path)
+    assert result["sha256"] == hashlib.sha256(IMAGE).hexdigest()
+    assert server.requests[0] is None and server.requests[1].startswith("bytes=")
+
+
+def test_checksum_mismatch_removes_the_file(server, tmp_path):
+    path = str(tmp_path / "image.png")
+    with pytest.raises(DownloadError):
+        download_to_file(url(server, "/gzip"), path, sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,81 @@
+import socket
+
+import pytest
+import requests
+
+from ccsuite import fileserver
+from ccsuite.fileserver import parse_range, sign, verify
+
+DATA = bytes(range(256)) * 16
+
+
+def test_tokens_round_trip_until_they_expire(tmp_path):
+    path = str(tmp_path / "export.zip")
+    token = sign(path, ttl=60, now=1000)
+    assert verify(token, now=1000) == path
+    assert verify(token, now=1200) is None
+
+
+def test_edited_or_malformed_tokens_are_refused(tmp_path):
+    encoded, expires, signature = sign(str(tmp_path / "export.zip"), now=1000).split(".")
+    other = sign("/etc/passwd", now=1000).split(".")[0]
+    assert verify(f"{other}.{expires}.{signature}", now=1000) is None
+    assert verify(f"{encoded}.{int(expires) + 3600}.{signature}", now=1000) is None
+    assert verify("not-a-token", now=1000) is None
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 4095)),
+    ("bytes=-100", (3996, 4095)),
+    ("bytes=4000-9999", (4000, 4095)),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 4096) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=4096-", "bytes=10-5"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 4096)
+
+
+@pytest.fixture
+def served(monkeypatch, tmp_path):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = fileserver.start_server(port=port, host="127.0.0.1")
+    monkeypatch.setenv("CCSUITE_FILES_URL", "http://127.0.0.1:%d" % server.server_address[1])
+    path = tmp_path / "export.zip"
+    path.write_bytes(DATA)
+    yield str(path)
+    fileserver.stop_server()
+
+
+def test_serves_whole_files_and_ranges(served):
+    url = fileserver.file_url(served, "my export.zip")
+    response = requests.get(url)
+    assert response.status_code == 200 and response.content == DATA
+    assert "my%20export.zip" in response.headers["Content-Disposition"]
+
+    response = requests.get(url, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206 and response.content == DATA[100:200]
+    assert response.headers["Content-Range"] == "bytes 100-199/%d" % len(DATA)
+
+    response = requests.head(url)
+    assert response.status_code == 200 and response.headers["Content-Length"] == str(len(DATA))
+
+    response = requests.get(url, headers={"Range": "bytes=%d-" % len(DATA)})
+    assert response.status_code == 416 and response.headers["Content-Range"] == "bytes */%d" % len(DATA)
+
+
+def test_refuses_forged_links_and_missing_files(served, tmp_path):
+    base = fileserver.base_url()
+    assert requests.get(base + "/files/forged.0.sig/x.zip").status_code == 403
+    assert requests.get(fileserver.file_url(str(tmp_path / "gone.zip"))).status_code == 404
+    assert requests.get(base + "/other").status_code == 404
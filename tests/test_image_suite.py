@@ -0,0 +1,59 @@
+from ccsuite.image_suite import image_names, prepare_prompts, written_prompts
+
+SCRIPT = """The Topic
+[00:00-00:30] Introduction
+Welcome.
+[00:30-02:00] The Rise
+It grew.
+[02:00-03:00] The Fall
+It fell.
+[03:00-03:30] Conclusion
+Goodbye.
+"""
+
+
+def test_names_follow_slot_not_position():
+    # Two images per prompt, and slot 2 lost to near-duplicate skipping
+    records = [{"slot": 0}, {"slot": 0}, {"slot": 1}, {"slot": 1}, {"slot": 3}, {"slot": 7}, {"slot": 12}]
+    slot_counts = {}
+    names = image_names(records, SCRIPT, slot_counts)
+    assert names == [
+        ["intro_1.png", "Intro Section"],
+        ["intro_1_2.png", "Intro Section"],
+        ["intro_2.png", "Intro Section"],
+        ["intro_2_2.png", "Intro Section"],
+        ["section_1_image_2.png", "The Rise"],
+        ["section_2_image_1.png", "The Fall"],
+        ["outro_1.png", "Outro Section"],
+    ]
+
+
+def test_names_stay_unique_across_batches():
+    slot_counts = {}
+    first = image_names([{"slot": 4}], SCRIPT, slot_counts)
+    # A regenerated image for the same slot in a later batch
+    second = image_names([{"slot": 4}], SCRIPT, slot_counts)
+    assert first[0][0] == "section_1_image_3.png" and second[0][0] == "section_1_image_3_2.png"
+
+
+def test_written_prompts_match_loose_section_labels():
+    items = [
+        {"section": "Intro", "prompt": "sunrise"},
+        {"section": "the rise", "prompt": "tower"},
+        {"section": "Unknown", "prompt": "ignored"},
+        {"section": "Outro", "prompt": "sunset"},
+    ]
+    assert written_prompts(items, SCRIPT) == {"introduction": "sunrise", "the rise": "tower", "conclusion": "sunset"}
+
+
+def test_written_prompts_fall_back_to_position():
+    items = [{"section": f"Part {n}", "prompt": f"p{n}"} for n in range(4)]
+    assert written_prompts(items, SCRIPT) == {"introduction": "p0", "the rise": "p1", "the fall": "p2", "conclusion": "p3"}
+
+
+def test_prepare_prompts_uses_written_prompts():
+    batches = prepare_prompts(SCRIPT, batch_size=5, image_prompts={"the rise": "tower"})
+    flat = [prompt for batch in batches for prompt in batch]
+    assert len(flat) == 2 + 5 + 5 + 2 and all(len(batch) <= 5 for batch in batches)
+    assert flat[2:7] == ["tower"] * 5
+    assert flat[0].startswith("Introduction") and flat[7].startswith("The Fall")
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from ccsuite import jobqueue
+from ccsuite.jobqueue import DONE, FAILED, QUEUED, RUNNING, JobNotFound, MemoryQueue, SQLiteQueue
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        return MemoryQueue()
+    return SQLiteQueue(str(tmp_path / "jobs.db"))
+
+
+def test_claim_complete(queue):
+    job_id = queue.enqueue("k", {"x": 1}, secrets={"key": "s"})
+    job = queue.claim("w1")
+    assert job["id"] == job_id and job["secrets"] == {"key": "s"} and job["attempts"] == 1
+    assert queue.claim("w2") is None
+    assert queue.complete(job_id, "w1", {"ok": True})
+    done = queue.get(job_id)
+    assert done["status"] == DONE and done["result"] == {"ok": True} and "secrets" not in done
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.enqueue("k", {})
+    queue.claim("w1", lease=0.05)
+    time.sleep(0.1)
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert not queue.heartbeat(job_id, "w1")
+    assert queue.heartbeat(job_id, "w2")
+
+
+def test_late_fail_from_previous_holder_is_ignored(queue):
+    job_id = queue.enqueue("k", {})
+    queue.claim("w1", lease=0.05)
+    time.sleep(0.1)
+    queue.claim("w2")
+
+    assert queue.fail(job_id, "w1", "boom") is False
+    job = queue.get(job_id)
+    assert job["status"] == RUNNING and job["worker"] == "w2"
+    # Nobody else can take the job while w2 holds it
+    assert queue.claim("w3") is None
+
+
+def test_late_complete_does_not_overwrite(queue):
+    job_id = queue.enqueue("k", {})
+    queue.claim("w1", lease=0.05)
+    time.sleep(0.1)
+    queue.claim("w2")
+    assert queue.complete(job_id, "w2", "from w2")
+    assert queue.complete(job_id, "w1", "from w1") is False
+    assert queue.get(job_id)["result"] == "from w2"
+
+
+def test_fail_retries_then_fails(queue):
+    job_id = queue.enqueue("k", {}, secrets={"key": "s"}, max_attempts=2)
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "first")
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["worker"] is None
+    assert queue.claim("w1")["secrets"] == {"key": "s"}
+    assert queue.fail(job_id, "w1", "second")
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and job["error"] == "second"
+
+
+def test_fail_without_retry(queue):
+    job_id = queue.enqueue("k", {})
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "bad", retry=False)
+    assert queue.get(job_id)["status"] == FAILED
+
+
+def test_unknown_job(queue):
+    with pytest.raises(JobNotFound):
+        queue.get("missing")
+    with pytest.raises(JobNotFound):
+        queue.wait("missing", timeout=0.1)
+    with pytest.raises(JobNotFound):
+        queue.complete("missing", "w1", None)
+
+
+def test_wait_returns_when_finished(queue):
+    job_id = queue.enqueue("k", {})
+    job = queue.claim("w1")
+
+    def finish():
+        time.sleep(0.05)
+        queue.complete(job["id"], "w1", 42)
+
+    threading.Thread(target=finish).start()
+    assert queue.wait(job_id, timeout=5, interval=0.01)["result"] == 42
+
+
+def test_notices_replace_and_expire(queue, monkeypatch):
+    assert queue.get_notice("n") is None
+    queue.post_notice("n", {"status": "PENDING"})
+    queue.post_notice("n", {"status": "COMPLETE", "images": [{"url": "u"}]})
+    assert queue.get_notice("n") == {"status": "COMPLETE", "images": [{"url": "u"}]}
+    monkeypatch.setattr(jobqueue, "NOTICE_TTL", 0)
+    time.sleep(0.01)
+    assert queue.get_notice("n") is None
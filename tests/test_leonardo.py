@@ -0,0 +1,61 @@
+import pytest
+
+from bench.fakes import FakeLeonardo
+from ccsuite import autotune, leonardo
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    # Outcomes the tuner records per generation, and the 429s counted through throttled()
+    outcomes, throttles = [], []
+    record, throttled = autotune.Tuner._record, autotune.Tuner.throttled
+
+    def recording(self, queued, latency, images, error):
+        outcomes.append(error)
+        record(self, queued, latency, images, error)
+
+    def counting(self):
+        throttles.append(1)
+        throttled(self)
+
+    monkeypatch.setattr(autotune.Tuner, "_record", recording)
+    monkeypatch.setattr(autotune.Tuner, "throttled", counting)
+    monkeypatch.setattr(autotune.Tuner, "backoff", lambda self, attempt: 0.01)
+    return outcomes, throttles
+
+
+def throttle_creates(monkeypatch, times):
+    # The first `times` creates are answered with HTTP 429 before reaching the fake
+    create = leonardo.create_image_async
+    calls = []
+
+    async def flaky(prompt, api_key, num_images=2):
+        calls.append(prompt)
+        if len(calls) <= times:
+            autotune.tuner_for(api_key).throttled()
+            raise leonardo.LeonardoError("Error creating image: 429 Too Many Requests", 429)
+        return await create(prompt, api_key, num_images=num_images)
+
+    monkeypatch.setattr(leonardo, "create_image_async", flaky)
+    return calls
+
+
+def test_throttled_create_is_retried_and_counted_once(monkeypatch, recorded):
+    outcomes, throttles = recorded
+    calls = throttle_creates(monkeypatch, 2)
+    with FakeLeonardo(complete_after=0.05, image_size=(8, 8)) as fake:
+        monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+        result = leonardo.generate("a prompt", "retry-key", num_images=1, timeout=5, interval=0.05)
+    assert len(result["images"]) == 1 and len(calls) == 3
+    assert len(throttles) == 2 and outcomes == [None]
+    assert autotune.tuner_for("retry-key").in_flight == 0
+
+
+def test_create_gives_up_after_the_retries(monkeypatch, recorded):
+    outcomes, throttles = recorded
+    calls = throttle_creates(monkeypatch, leonardo.CREATE_RETRIES + 1)
+    with pytest.raises(leonardo.LeonardoError) as error:
+        leonardo.generate("a prompt", "give-up-key", num_images=1, timeout=5)
+    assert error.value.status_code == 429
+    assert len(calls) == len(throttles) == leonardo.CREATE_RETRIES + 1 and outcomes == []
+    assert autotune.tuner_for("give-up-key").in_flight == 0
@@ -0,0 +1,84 @@
+import pytest
+
+from ccsuite.library import ContentLibrary, can_delete, match_query, open_library
+
+
+@pytest.fixture
+def library(tmp_path):
+    return ContentLibrary(str(tmp_path / "library.db"))
+
+
+def result(topic, style="Educational", script="", **artifacts):
+    return dict({"topic": topic, "style": style, "duration": 5, "script": script}, **artifacts)
+
+
+def test_match_query_quotes_user_input():
+    assert match_query('bees AND "wasps') == '"bees" "AND" "wasps"*'
+    assert match_query("bees wasps", prefix=False, any_term=True) == '"bees" OR "wasps"'
+    assert match_query(" -- ") is None
+
+
+def test_record_and_get_run(library):
+    run_id = library.record(result("Honey Bees", script="Bees dance.", titles="Why bees dance"),
+                            source="batch", models={"script": "gpt-4"})
+    run = library.get_run(run_id)
+    assert run["topic"] == "Honey Bees" and run["source"] == "batch"
+    assert run["script"] == "Bees dance." and run["titles"] == "Why bees dance"
+    assert run["models"] == {"script": "gpt-4", "titles": None}
+    assert "thumbnails" not in run
+    assert library.count() == 1 and library.get_run("missing") is None
+
+
+def test_search_stems_matches_prefixes_and_filters_by_kind(library):
+    bees = library.record(result("Honey Bees", script="The hive keeps dancing all summer.", titles="Dancing bees"))
+    library.record(result("Deep Sea", script="Anglerfish glow in the dark."))
+    hits = library.search("danced")
+    assert {hit["run_id"] for hit in hits} == {bees} and len(hits) == 2
+    assert "**" in hits[0]["snippet"]
+    assert [hit["kind"] for hit in library.search("danc", kind="titles")] == ["titles"]
+    assert library.search("volcano") == [] and library.search("!!") == []
+
+
+def test_similar_runs_weigh_topic_over_style(library):
+    by_topic = library.record(result("Volcanoes of Iceland", style="Calm"))
+    by_style = library.record(result("Coral Reefs", style="Volcanoes"))
+    library.record(result("Jazz History"))
+    runs = library.similar_runs("Icelandic volcanoes", "Funny")
+    assert [run["run_id"] for run in runs] == [by_topic, by_style]
+
+
+def test_delete_run_removes_it_from_search(library):
+    run_id = library.record(result("Honey Bees", script="Bees dance."))
+    library.delete_run(run_id)
+    assert library.get_run(run_id) is None and library.count() == 0
+    assert library.search("bees") == [] and library.similar_runs("bees") == []
+
+
+def test_diff_compares_one_artifact(library):
+    a = library.record(result("Bees", script="Line one\nLine two"))
+    b = library.record(result("Bees", script="Line one\nLine 2"))
+    diff = library.diff(a, b)
+    assert "-Line two\n" in diff and "+Line 2\n" in diff
+    assert library.diff(a, a) == "" and library.diff(a, b, kind="titles") == ""
+
+
+def test_open_library_can_be_switched_off(tmp_path):
+    assert open_library("off") is None
+    path = str(tmp_path / "shared.db")
+    assert open_library(path) is open_library(path)
+
+
+def test_only_owned_runs_can_be_deleted(monkeypatch):
+    monkeypatch.delenv("CCSUITE_ADMIN_TOKEN", raising=False)
+    assert can_delete("run-a", {"run-a"})
+    assert not can_delete("run-b", {"run-a"})
+    assert not can_delete("run-a", None)
+    # Without a configured admin token no token unlocks other sessions' runs
+    assert not can_delete("run-b", {"run-a"}, admin_token="")
+
+
+def test_admin_token_unlocks_every_run(monkeypatch):
+    monkeypatch.setenv("CCSUITE_ADMIN_TOKEN", "s3cret")
+    assert can_delete("run-b", set(), admin_token="s3cret")
+    assert not can_delete("run-b", set(), admin_token="guess")
+    assert not can_delete("run-b", set())
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+from ccsuite.content import generate_recommendation
+from ccsuite.llm import chat
+
+
+class RecordingClient:
+    api_key = "llm-test"
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Try a mirrorless camera."))],
+                               usage=None)
+
+
+def test_recommendation_keeps_its_system_message():
+    client = RecordingClient()
+    assert generate_recommendation("Which camera?", client=client) == "Try a mirrorless camera."
+    messages = client.calls[0]["messages"]
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert "Which camera?" in messages[1]["content"]
+
+
+def test_chat_sends_an_optional_system_message():
+    client = RecordingClient()
+    chat(client, "test", "gpt-4o", "hello", 10)
+    chat(client, "test", "gpt-4o", "hello", 10, system="Answer in French.")
+    assert [len(call["messages"]) for call in client.calls] == [1, 2]
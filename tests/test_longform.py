@@ -0,0 +1,35 @@
+import json
+from types import SimpleNamespace
+
+from ccsuite.longform import generate_long_script
+from ccsuite.script_index import parse_script
+
+OUTLINE = {"style_brief": "Warm and curious.", "sections": [
+    {"heading": "Intro", "key_points": ["hook"]},
+    {"heading": "How Bees Talk", "key_points": ["waggle dance"]},
+    {"heading": "Conclusion", "key_points": ["subscribe"]},
+]}
+
+
+class StubClient:
+    # Answers the outline call with OUTLINE and every section call with narration ending in [End]
+    api_key = "longform-test"
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, response_format=None):
+        if response_format:
+            content = json.dumps(OUTLINE)
+        else:
+            content = "(Host on Screen)\n\"Narration for " + messages[0]["content"].split("'")[3] + ".\"\n\n[End]\n"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def test_long_scripts_carry_no_end_marker():
+    script = generate_long_script("Bees", 3, "Educational", client=StubClient())
+    assert "[End]" not in script
+    assert script.startswith("Bees\n\n[00:00-00:30] Intro")
+    index = parse_script(script)
+    assert index.headings == ["Intro", "How Bees Talk", "Conclusion"]
+    assert index.sections[-1]["text"].rstrip().endswith("Narration for Conclusion.\"")
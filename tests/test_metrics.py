@@ -0,0 +1,61 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from ccsuite import metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def no_server(monkeypatch):
+    monkeypatch.delenv("CCSUITE_METRICS_HOST", raising=False)
+    yield
+    with metrics._lock:
+        server, metrics._server = metrics._server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+def test_endpoint_binds_loopback_by_default(no_server):
+    assert metrics.start_http_server(free_port()).server_address[0] == "127.0.0.1"
+
+
+def test_wider_binding_is_opt_in(no_server, monkeypatch):
+    monkeypatch.setenv("CCSUITE_METRICS_HOST", "0.0.0.0")
+    assert metrics.start_http_server(free_port()).server_address[0] == "0.0.0.0"
+
+
+def test_log_lines_are_written_off_the_calling_thread(monkeypatch, tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("CCSUITE_METRICS_LOG", str(path))
+    release = threading.Event()
+    append = metrics._append
+
+    def slow_disk(path, lines):
+        release.wait(5)
+        append(path, lines)
+
+    monkeypatch.setattr(metrics, "_append", slow_disk)
+    start = time.perf_counter()
+    metrics.inc("ccsuite_test_log_total", stage="a")
+    with metrics.span("test.log"):
+        pass
+    # Neither call waited for the disk, and other threads can still take the metrics lock
+    assert time.perf_counter() - start < 1
+    with metrics._lock:
+        pass
+    release.set()
+    metrics.flush_log()
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(e["kind"], e["name"]) for e in entries] == [("counter", "ccsuite_test_log_total"),
+                                                         ("span", "ccsuite_span_seconds")]
+    assert entries[0]["stage"] == "a" and entries[1]["span"] == "test.log"
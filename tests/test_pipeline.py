@@ -0,0 +1,34 @@
+import os
+
+from bench.fakes import FakeLeonardo, FakeOpenAI
+from ccsuite import autotune, leonardo
+from ccsuite.clients import get_client
+from ccsuite.pipeline import run_content_pipeline
+
+
+def test_pipeline_generations_run_through_the_tuner(monkeypatch, tmp_path):
+    seen = []
+    original = autotune.Tuner.release
+
+    def release(self, queued, latency=None, images=0, error=None):
+        seen.append((latency is not None, images, error))
+        return original(self, queued, latency, images, error)
+
+    monkeypatch.setattr(autotune.Tuner, "release", release)
+    with FakeOpenAI(first_token_latency=0, token_latency=0) as openai_fake, \
+            FakeLeonardo(complete_after=0.1, image_size=(16, 9)) as leonardo_fake:
+        monkeypatch.setenv("OPENAI_BASE_URL", openai_fake.base_url)
+        monkeypatch.setattr(leonardo, "API_BASE", leonardo_fake.url)
+        pipeline = run_content_pipeline("Bees", 1, "Educational", str(tmp_path), "pipeline-test-key",
+                                        client=get_client("pipeline-test-openai"), num_images=2,
+                                        poll_interval=0.05)
+        list(pipeline.iter_events())
+        pipeline.join()
+
+    assert pipeline.errors == []
+    prompts = pipeline.counts["submit"]
+    assert prompts > 0 and pipeline.counts["export"] == 2 * prompts
+    # Every generation took and returned one of the key's tuned slots
+    assert seen == [(True, 2, None)] * prompts
+    assert autotune.tuner_for("pipeline-test-key").in_flight == 0
+    assert len(os.listdir(tmp_path / "images")) == 2 * prompts
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from ccsuite.prompts import PromptStreamParser, join_prompts
+
+DOC = json.dumps({"prompts": [
+    {"section": "Intro", "prompt": 'A "quoted" sunrise, {braces} and [brackets]'},
+    {"section": "Middle", "prompt": "Escaped backslash \\ and unicode \u00e9"},
+    {"section": "Outro", "prompt": "Sunset"},
+]})
+
+
+def feed_in_chunks(text, size):
+    parser = PromptStreamParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, len(DOC)])
+def test_any_chunking_yields_the_same_items(size):
+    parser, items = feed_in_chunks(DOC, size)
+    assert items == json.loads(DOC)["prompts"]
+    assert parser.done
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    parser = PromptStreamParser()
+    first_end = DOC.index("}, {") + 1
+    assert parser.feed(DOC[:first_end - 1]) == []
+    assert [item["section"] for item in parser.feed(DOC[first_end - 1:first_end])] == ["Intro"]
+    assert [item["section"] for item in parser.feed(DOC[first_end:])] == ["Middle", "Outro"]
+
+
+def test_string_items_and_trailing_text():
+    parser = PromptStreamParser()
+    assert parser.feed('{"prompts": ["one", "two"]} trailing') == [
+        {"section": "", "prompt": "one"}, {"section": "", "prompt": "two"}]
+    assert parser.done and parser.feed('["more"]') == []
+
+
+def test_empty_and_none_deltas():
+    parser = PromptStreamParser()
+    assert parser.feed(None) == [] and parser.feed("") == []
+
+
+def test_join_prompts():
+    assert join_prompts([{"prompt": "a"}, {"prompt": "b"}]) == "a\n====\nb"
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from ccsuite import sessions
+
+
+class FakeState(dict):
+    # Stands in for Streamlit's SessionState; moved=True mimics an upgrade that renamed filtered_state
+    moved = False
+
+    @property
+    def filtered_state(self):
+        if self.moved:
+            raise AttributeError("'SessionState' object has no attribute 'filtered_state'")
+        return dict(self)
+
+
+@pytest.fixture
+def state(monkeypatch, tmp_path):
+    monkeypatch.setenv("CCSUITE_WORKSPACE", str(tmp_path))
+    monkeypatch.setattr(sessions, "_sessions", {})
+    monkeypatch.setattr(sessions, "_disabled", None)
+    state = FakeState(script="x" * sessions.SPILL_MIN_BYTES, small=1)
+    record = sessions._Session("session-1", state)
+    sessions._measure(record, state)
+    record.last_seen = time.time() - sessions.SPILL_IDLE - 1
+    sessions._sessions[record.session_id] = record
+    return state
+
+
+def test_idle_sessions_spill_and_come_back(state):
+    assert sessions.enforce(force=True) == (1, 0)
+    assert isinstance(state["script"], sessions.Spilled) and state["small"] == 1
+    record = sessions._sessions["session-1"]
+    sessions._rehydrate(record, state)
+    assert state["script"] == "x" * sessions.SPILL_MIN_BYTES and not record.spilled
+
+
+def test_running_sessions_are_not_idle(state):
+    # A page run that started long ago and is still going must keep its state
+    record = sessions._sessions["session-1"]
+    finished = threading.Event()
+    record.run_thread = threading.Thread(target=finished.wait)
+    record.run_thread.start()
+    try:
+        assert sessions.enforce(force=True) == (0, 0)
+        assert state["script"] == "x" * sessions.SPILL_MIN_BYTES
+        assert sessions.summary()[0]["idle_s"] == 0
+    finally:
+        finished.set()
+        record.run_thread.join()
+    # Idle time now runs from the last check that saw the run going
+    assert sessions.enforce(now=time.time() + sessions.SPILL_IDLE - 1, force=True) == (0, 0)
+    assert sessions.enforce(now=time.time() + sessions.SPILL_IDLE + 1, force=True) == (1, 0)
+
+
+def test_moved_internals_disable_spilling_and_restore_state(state, caplog):
+    sessions.enforce(force=True)
+    state.moved = True
+    sessions._sessions["session-1"].last_seen = time.time() - sessions.EVICT_IDLE - 1
+    assert sessions.enforce(force=True) == (0, 0)
+    assert "filtered_state" in sessions.disabled()
+    assert state["script"] == "x" * sessions.SPILL_MIN_BYTES
+    assert sessions.summary() == []
+    assert "disabled" in caplog.text
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bench.fakes import FakeLeonardo
+from ccsuite import leonardo
+from ccsuite.singleflight import Group, make_key, normalize
+
+
+def test_concurrent_identical_calls_share_one_run():
+    group = Group("test")
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 5 and len(calls) == 1
+    assert group.in_flight() == 0
+
+
+def test_errors_are_shared_but_not_cached():
+    group = Group("test")
+    with pytest.raises(ValueError):
+        group.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert group.do("k", lambda: "retried") == "retried"
+
+
+def test_keys_ignore_whitespace_but_not_variant():
+    assert make_key(normalize("a  prompt\n"), 1) == make_key(normalize("a prompt"), 1)
+    assert make_key("a prompt", 1, None) != make_key("a prompt", 1, 0)
+    assert make_key("a prompt", 1, 0) != make_key("a prompt", 1, 1)
+
+
+def test_async_waiters_share_a_task():
+    group = Group("test")
+    started = []
+
+    async def factory():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    async def main():
+        return await asyncio.gather(*(group.do_async("k", factory) for _ in range(4)))
+
+    assert asyncio.run(main()) == [1, 1, 1, 1]
+
+
+def generations(monkeypatch, variants):
+    with FakeLeonardo(complete_after=0.1, image_size=(8, 8)) as fake:
+        monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+        futures = [leonardo.submit(leonardo.generate_async("same section text", "key", num_images=1, timeout=10,
+                                                           interval=0.05, variant=variant))
+                   for variant in variants]
+        results = [future.result() for future in futures]
+    return {result["generation_id"] for result in results}
+
+
+def test_leonardo_identical_prompts_coalesce_without_variant(monkeypatch):
+    assert len(generations(monkeypatch, [None] * 5)) == 1
+
+
+def test_leonardo_variant_keeps_slots_separate(monkeypatch):
+    assert len(generations(monkeypatch, range(5))) == 5
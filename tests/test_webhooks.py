@@ -0,0 +1,101 @@
+import logging
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from bench.fakes import FakeLeonardo
+from ccsuite import leonardo, webhooks
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(autouse=True)
+def no_receiver(monkeypatch):
+    for name in ("CCSUITE_WEBHOOK_PORT", "CCSUITE_WEBHOOK_HOST", "CCSUITE_WEBHOOK_SECRET", "CCSUITE_QUEUE"):
+        monkeypatch.delenv(name, raising=False)
+    webhooks.stop_receiver()
+    yield
+    webhooks.stop_receiver()
+
+
+def test_receiver_binds_loopback_by_default():
+    server = webhooks.start_receiver(port=free_port())
+    assert server.server_address[0] == "127.0.0.1"
+
+
+def test_receiver_refuses_public_host_without_secret():
+    assert webhooks.start_receiver(port=free_port(), host="0.0.0.0") is None
+    server = webhooks.start_receiver(port=free_port(), host="0.0.0.0", secret="s")
+    assert server is not None and server.secret == "s"
+
+
+def test_callback_wait_checks_status_before_timing_out(monkeypatch):
+    # No webhook is ever delivered and the generation finishes between the last fallback check and the deadline
+    monkeypatch.setenv("CCSUITE_WEBHOOK_PORT", str(free_port()))
+    monkeypatch.setattr(leonardo, "WEBHOOK_FALLBACK_INTERVAL", 0.6)
+    with FakeLeonardo(complete_after=0.8, image_size=(8, 8)) as fake:
+        monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+        result = leonardo.generate("a prompt", "key", num_images=1, timeout=1.0)
+    assert len(result["images"]) == 1
+
+
+@pytest.fixture
+def other_process_receiver():
+    # The same callback handler bound in "another process": this one then finds the port taken
+    server = ThreadingHTTPServer(("127.0.0.1", 0), webhooks._CallbackHandler)
+    server.secret = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_taken_port_falls_back_to_polling(monkeypatch, caplog, other_process_receiver):
+    monkeypatch.setenv("CCSUITE_WEBHOOK_PORT", str(other_process_receiver))
+    with caplog.at_level(logging.WARNING, logger="ccsuite.webhooks"):
+        assert webhooks.start_receiver() is None
+        assert webhooks.start_receiver() is None
+    assert len(caplog.records) == 1 and "polling" in caplog.text
+    assert not webhooks.relay_active()
+    with FakeLeonardo(complete_after=0.2, image_size=(8, 8)) as fake:
+        monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+        result = leonardo.generate("a prompt", "key", num_images=1, timeout=5, interval=0.05)
+    assert len(result["images"]) == 1
+
+
+def test_callbacks_are_relayed_through_the_queue(monkeypatch, tmp_path, other_process_receiver):
+    monkeypatch.setenv("CCSUITE_WEBHOOK_PORT", str(other_process_receiver))
+    monkeypatch.setenv("CCSUITE_QUEUE", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(leonardo, "RELAY_INTERVAL", 0.05)
+    callback_url = f"http://127.0.0.1:{other_process_receiver}{webhooks.CALLBACK_PATH}"
+    with FakeLeonardo(complete_after=0.3, image_size=(8, 8), callback_url=callback_url) as fake:
+        monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+        result = leonardo.generate("a prompt", "key", num_images=1, timeout=10)
+        assert webhooks.relay_active()
+        # Only the create request reached Leonardo; the images came from the relayed callback
+        assert fake.callbacks_sent == 1 and fake.requests == 1
+    assert len(result["images"]) == 1
+
+
+def test_delivered_callback_replaces_polling(monkeypatch):
+    def run(**fake_options):
+        with FakeLeonardo(complete_after=0.5, image_size=(8, 8), **fake_options) as fake:
+            monkeypatch.setattr(leonardo, "API_BASE", fake.url)
+            result = leonardo.generate("a prompt", "key", num_images=2, timeout=10, interval=0.05)
+        return result, fake
+
+    _, polling_fake = run()
+    port = free_port()
+    monkeypatch.setenv("CCSUITE_WEBHOOK_PORT", str(port))
+    assert webhooks.start_receiver() is not None
+    received, fake = run(callback_url=f"http://127.0.0.1:{port}{webhooks.CALLBACK_PATH}")
+    assert fake.callbacks_sent == 1
+    assert [image["id"] for image in received["images"]] == [f"{received['generation_id']}-{n}" for n in range(2)]
+    # The create request only: the images came with the callback, not from a status request
+    assert fake.requests == 1 < polling_fake.requests
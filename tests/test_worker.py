@@ -0,0 +1,35 @@
+from concurrent.futures import Future, as_completed
+
+import httpx
+
+from ccsuite.leonardo import LeonardoError
+from ccsuite.worker import _collect
+
+
+class FinishedQueue:
+    # Stands in for leonardo.SubmissionQueue with generations that already finished
+    def __init__(self, outcomes):
+        self.futures = []
+        for outcome in outcomes:
+            future = Future()
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+            self.futures.append(future)
+
+    def as_completed(self):
+        return as_completed(self.futures)
+
+
+def test_collect_reports_every_failure_per_prompt():
+    prompts = ["a", "b", "c"]
+    queue = FinishedQueue([{"prompt": "a", "images": [1]}, LeonardoError("throttled", 429),
+                           httpx.ConnectError("refused")])
+    reports = []
+    results = _collect(queue, lambda progress: reports.append(dict(progress)),
+                       {"done": 0, "total": 3, "prompts": prompts})
+    assert results[0] == {"prompt": "a", "images": [1]}
+    assert results[1] == {"prompt": "b", "images": [], "error": "throttled"}
+    assert results[2] == {"prompt": "c", "images": [], "error": "refused"}
+    assert reports[-1]["done"] == 3